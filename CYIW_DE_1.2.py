@@ -1,14 +1,17 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, simpledialog
+from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 import matplotlib.pyplot as plt
-import numpy as np
-import math
+import functools
 import re
 import scipy.stats as stats
 import pandas as pd  # Für Excel-Export
+import cyiw_kern as kern
+from cyiw_ansichten import EditorFenster, MarkierungsFenster, frage_gruppenregel
+from cyiw_stufen import Profilraum
 
 # ===========================
 # Konstanten für Deutsch
+KUERZEL = "de"   # für cyiw_kern (Prozesse, Kalibrierung, Frequenzliste)
 K_KONSONANTEN = "bcdfghjklmnpqrstvwxyzß"
 G_KONSONANTEN = "BCDFGHJKLMNPQRSTVWXYZẞ"
 K_VOKALE = "aeiouäöü"
@@ -21,72 +24,107 @@ SONSTIGES = "„*¤/(`),;:-_\"'’“«—»[<’>]”–@\r\n\t{}"
 # (optional) Ersetzungen
 ERSATZ_TABELLE = {"'": "’"}
 
-# ===========================
-def berechne_statistik(text):
-    for alt, neu in ERSATZ_TABELLE.items():
-        text = text.replace(alt, neu)
-
-    satzmuster = r'[.!?…|]+'
-    saetze_liste = [s.strip() for s in re.split(satzmuster, text) if s.strip()]
-    saetze = len(saetze_liste)
+# Kapitelüberschriften für "Buch laden" (ganze Zeilen) und Seitenvorschübe
+KAPITEL_MUSTER = r'^[ \t]*(?:(?i:kapitel)[ \t]+[^\n]{1,60}|[IVXLCDM]+\.?)[ \t]*$|\f'
 
-    wortmuster = r'\b\w+(?:[’]\w+)?\b'
-    woerter_liste = re.findall(wortmuster, text)
-    woerter = len(woerter_liste)
+# Abkürzungen, hinter denen ein Punkt keinen Satz beendet (z. B., d. h., Dr. Meier)
+ABKUERZUNGEN = ("z", "b", "d", "h", "u", "a", "o", "ä", "v", "s", "vgl", "bzw", "ca", "ggf", "evtl",
+                "inkl", "zzgl", "bspw", "sog", "dr", "prof", "hr", "fr", "nr", "st", "abs", "abb", "bd",
+                "hl", "geb", "gest")
+MONATE = ("januar", "jänner", "februar", "märz", "april", "mai", "juni", "juli", "august",
+          "september", "oktober", "november", "dezember")
+SATZGRENZEN = kern.satzgrenzen(ABKUERZUNGEN, MONATE)
 
-    vokale = K_VOKALE + G_VOKALE
-    silben = sum(sum(1 for c in w if c in vokale) for w in woerter_liste)
+# einmal beim Laden kompiliert (zaehle_text läuft pro Satzblock)
+VOKALE = frozenset(K_VOKALE + G_VOKALE)
+WORTMUSTER = re.compile(r'\b\w+(?:[’]\w+)?\b')
+KEINE_GRAPHEME = re.compile(r'[\s' + re.escape(SATZENDE + SONSTIGES) + ']')
 
-    text_ohne_zeichen = re.sub(r'[\s' + re.escape(SATZENDE + SONSTIGES) + ']', '', text)
-    grapheme = len(text_ohne_zeichen)
+# ===========================
+# Silben: jede Vokalgruppe ist eine Silbe, innerhalb einer Gruppe trennen
+# die Trennmuster. Zwei Vokale gehören zu zwei Silben (The-a-ter), außer
+# Diphthongen und Dehnungen (ei, au, eu, äu, ie, aa, ee, oo …); die
+# übrigen Muster sind Ausnahmen davon (Fei-er, Mu-se-um, Fa-mi-li-en,
+# be-ei-len). y zählt nur zwischen Konsonanten als Vokal (Typ, System).
+# Wo zwischen Konsonanten getrennt wird, ändert die Silbenzahl nicht.
+SILBENVOKALE = "aeiouäöüy"
+DIPHTHONGE = ("aa", "ee", "oo", "ai", "ei", "au", "eu", "äu", "ie", "ay", "ey", "ou")
+SILBENMUSTER = ([v + "1" + w for v in SILBENVOKALE for w in SILBENVOKALE]
+                + [d[0] + "2" + d[1] for d in DIPHTHONGE]
+                + ["qu2" + v for v in SILBENVOKALE]
+                + ["e2au", "ei3e", "ai3e", "e3um.", "ä3um.", "i3en.", "schi4en.", ".wi4en.", "ili3e.",
+                   "i3ent", "di4ent", ".be3e", ".be4er", ".be4et", ".be3au", ".be3un", ".be3ur",
+                   ".ge3e", ".ge3ur", ".ko3o"])
+TRENNMUSTER = kern.Trennmuster(SILBENMUSTER)
+SILBEN_CACHE = 1 << 16   # Wortformen; Fließtext trifft fast immer schon gezählte
+
+def ist_silbenvokal(wort, i):
+    if wort[i] != "y":
+        return wort[i] in VOKALE
+    return not (i and wort[i - 1] in VOKALE or i + 1 < len(wort) and wort[i + 1] in VOKALE)
+
+@functools.lru_cache(maxsize=SILBEN_CACHE)
+def zaehle_silben(wort):
+    wort = wort.lower()
+    punkte = TRENNMUSTER.punkte(wort)
+    silben, davor = 0, False
+    for i in range(len(wort)):
+        vokal = ist_silbenvokal(wort, i)
+        if vokal and (not davor or punkte[i] % 2):
+            silben += 1
+        davor = vokal
+    return silben
 
-    asl = (woerter / saetze) if saetze else 0.0
-    awl = (grapheme / woerter) if woerter else 0.0
+# ===========================
+# Rohzählungen eines Textes (lassen sich über Satzblöcke aufsummieren)
+def zaehle_text(text, benoetigt=None):
+    # benoetigt: nur diese Rohzählungen ermitteln (None = alle)
+    benoetigt = set(kern.ZAEHLUNGEN if benoetigt is None else benoetigt)
 
-    flesch = 206.835 - 1.015 * asl - 84.6 * (silben / woerter) if woerter and saetze else 0.0
-    amstad = 180 - asl - 58.5 * (silben / woerter) if woerter and saetze else 0.0
+    for alt, neu in ERSATZ_TABELLE.items():
+        text = text.replace(alt, neu)
 
-    i_bar = (silben / woerter) if woerter else 0.0
-    j_bar = (woerter / saetze) if saetze else 0.0
-    tuldava = i_bar * math.log(j_bar) if j_bar > 0 else 0.0
+    saetze = SATZGRENZEN.zaehle(text) if "Sätze" in benoetigt else 0
 
-    lange_worte = sum(1 for w in woerter_liste if len(w) > 6)
-    lix = asl + (lange_worte / woerter * 100) if woerter and saetze else 0.0
+    woerter_liste = WORTMUSTER.findall(text)
+    silben_pro_wort = []
+    if benoetigt & kern.SILBENZAEHLUNGEN:
+        silben_pro_wort = [zaehle_silben(w) for w in woerter_liste]
 
-    ms = (sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) >= 3) / woerter * 100) if woerter else 0.0
-    iw = (lange_worte / woerter * 100) if woerter else 0.0
-    es = (sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) == 1) / woerter * 100) if woerter else 0.0
+    text_ohne_zeichen = ""
+    if "Grapheme" in benoetigt:
+        text_ohne_zeichen = KEINE_GRAPHEME.sub('', text)
 
-    wstf1 = 0.1935 * ms + 0.1672 * asl + 0.1297 * iw - 0.0327 * es - 0.875
-    wstf2 = 0.2007 * ms + 0.1682 * asl + 0.1373 * iw - 2.779
-    wstf3 = 0.2963 * ms + 0.1905 * asl - 1.1144
-    wstf4 = 0.2656 * asl + 0.2744 * ms - 1.693
+    zaehlungen = {
+        "Sätze": saetze,
+        "Wörter": len(woerter_liste),
+        "Silben": sum(silben_pro_wort),
+        "Grapheme": len(text_ohne_zeichen),
+        "LangeWörter": sum(1 for w in woerter_liste if len(w) > 6),
+        "Mehrsilber": sum(1 for spw in silben_pro_wort if spw >= 3),
+        "Einsilber": sum(1 for spw in silben_pro_wort if spw == 1),
+        "WörterÜber3": sum(1 for w in woerter_liste if len(w) > 3)
+    }
+    # Wortfolge für die Wortschatz-Indizes (nur auf Anfrage)
+    if "Wortfolge" in benoetigt:
+        zaehlungen["Wortfolge"] = [w.lower() for w in woerter_liste]
+    return {k: v for k, v in zaehlungen.items() if k in benoetigt}
 
-    nre = 1.599 * es - 1.015 * asl - 31.517
+# ===========================
+# Ausgegebene Werte in dieser Reihenfolge (Formeln: Register in cyiw_kern)
+INDEX_LISTE = ["Sätze", "Wörter", "Silben", "Grapheme", "ASL", "AWL", "Flesch", "Amstad",
+               "Tuldava", "Lix", "WSTF1", "WSTF2", "WSTF3", "WSTF4", "NRE", "GunningFog",
+               "TTR", "MTLD", "Hapax"]
+kern.kalibrierter_flesch(KUERZEL, INDEX_LISTE)
+kern.eigene_formeln(KUERZEL, INDEX_LISTE)
+kern.frequenzbaender(KUERZEL, INDEX_LISTE)
 
-# === Gunning-Fog Index ===
-    silben_pro_wort = [sum(1 for c in w if c in vokale) for w in woerter_liste]
-    lange_worte_gf = sum(1 for spw in silben_pro_wort if spw >= 3)
-    gunning_fog = 0.4 * (asl + 100 * (lange_worte_gf / woerter)) if woerter else 0.0
+def berechne_indizes(zaehlungen, indizes=INDEX_LISTE):
+    return kern.berechne_indizes(zaehlungen, indizes)
 
-    return {
-        "Sätze": saetze,
-        "Wörter": woerter,
-        "Silben": silben,
-        "Grapheme": grapheme,
-        "ASL": round(asl, 2),
-        "AWL": round(awl, 2),
-        "Flesch": round(flesch, 2),
-        "Amstad": round(amstad, 2),
-        "Tuldava": round(tuldava, 2),
-        "Lix": round(lix, 2),
-        "WSTF1": round(wstf1, 2),
-        "WSTF2": round(wstf2, 2),
-        "WSTF3": round(wstf3, 2),
-        "WSTF4": round(wstf4, 2),
-        "NRE": round(nre, 2),
-        "GunningFog": round(gunning_fog, 2)
-    }
+def berechne_statistik(text, indizes=INDEX_LISTE):
+    zaehlungen = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, benoetigt=kern.benoetigte_zaehlungen(indizes))
+    return berechne_indizes(zaehlungen, indizes)
 
 # ===========================
 # Tooltip-Klasse für Buttons
@@ -129,7 +167,14 @@ class MainGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("CYIW ⋅ Calculate Your Index Well ⋅ German 1.2")
-        self.texts = {}
+        self.texts = kern.Textablage(K_VOKALE + K_KONSONANTEN)
+        self.ergebnisse = {}
+        self.intervalle = {}
+        self.zaehlungen = {}   # Rohzählungen für neue Fassungen (ohne Wortfolge)
+        self.stufen = {}       # Schwierigkeitsstufe pro Text (k-Means)
+        self.gruppenregel = None   # Gruppen nach Ordner, Dateimuster oder Metadaten
+        self.mit_ki = tk.BooleanVar(value=False)
+        self.nur_ergebnisse = tk.BooleanVar(value=False)
         self.create_widgets()
 
     def create_widgets(self):
@@ -141,6 +186,10 @@ class MainGUI:
         btn_laden.pack(side='left', padx=5)
         ToolTip(btn_laden, "TXT laden")
 
+        btn_buch = tk.Button(button_frame, text="📚", command=self.lade_buch, font=("Arial", 20), width=2, height=1)
+        btn_buch.pack(side='left', padx=5)
+        ToolTip(btn_buch, "Buch laden und in Kapitel teilen")
+
         btn_liniendiagramm = tk.Button(button_frame, text="📈", command=self.zeige_liniendiagramm, font=("Arial", 20), width=2, height=1)
         btn_liniendiagramm.pack(side='left', padx=5)
         ToolTip(btn_liniendiagramm, "Liniendiagramm")
@@ -152,6 +201,14 @@ class MainGUI:
         btn_korrelation = tk.Button(button_frame, text="🔢", command=self.zeige_korrelation, font=("Arial", 20), width=2, height=1)
         btn_korrelation.pack(side='left', padx=5)
         ToolTip(btn_korrelation, "Korrelationsmatrix")
+
+        btn_markierung = tk.Button(button_frame, text="🖍️", command=self.zeige_markierung, font=("Arial", 20), width=2, height=1)
+        btn_markierung.pack(side='left', padx=5)
+        ToolTip(btn_markierung, "Schwierige Stellen markieren")
+
+        btn_editor = tk.Button(button_frame, text="✏️", command=self.zeige_editor, font=("Arial", 20), width=2, height=1)
+        btn_editor.pack(side='left', padx=5)
+        ToolTip(btn_editor, "Editor mit Live-Auswertung")
         
         btn_excel = tk.Button(button_frame, text="🗒️", command=self.export_excel, font=("Arial", 20), width=2, height=1)
         btn_excel.pack(side='left', padx=5)
@@ -160,11 +217,36 @@ class MainGUI:
         btn_speichern = tk.Button(button_frame, text="📜", command=self.speichere_ausgabe, font=("Arial", 20), width=2, height=1)
         btn_speichern.pack(side='left', padx=5)
         ToolTip(btn_speichern, "Als TXT speichern")
+
+        btn_sitzung = tk.Button(button_frame, text="💾", command=self.speichere_sitzung, font=("Arial", 20), width=2, height=1)
+        btn_sitzung.pack(side='left', padx=5)
+        ToolTip(btn_sitzung, "Sitzung speichern")
+
+        btn_sitzung_laden = tk.Button(button_frame, text="📂", command=self.lade_sitzung, font=("Arial", 20), width=2, height=1)
+        btn_sitzung_laden.pack(side='left', padx=5)
+        ToolTip(btn_sitzung_laden, "Sitzung laden")
         
+        btn_stufen = tk.Button(button_frame, text="🧩", command=self.bilde_stufen, font=("Arial", 20), width=2, height=1)
+        btn_stufen.pack(side='left', padx=5)
+        ToolTip(btn_stufen, "Schwierigkeitsstufen bilden (k-Means)")
+
+        btn_gruppen = tk.Button(button_frame, text="🗂️", command=self.bilde_gruppen, font=("Arial", 20), width=2, height=1)
+        btn_gruppen.pack(side='left', padx=5)
+        ToolTip(btn_gruppen, "Gruppen bilden (Ordner, Dateimuster, Metadaten)")
+
         btn_reset = tk.Button(button_frame, text="♻️", command=self.reset_ausgabe, font=("Arial", 20), width=2, height=1)
         btn_reset.pack(side='left', padx=5)
         ToolTip(btn_reset, "Zurücksetzen")
 
+        chk_ki = tk.Checkbutton(button_frame, text="KI", variable=self.mit_ki, font=("Arial", 12))
+        chk_ki.pack(side='left', padx=10)
+        ToolTip(chk_ki, "Bootstrap-Konfidenzintervalle (95 %) berechnen")
+
+        chk_ablage = tk.Checkbutton(button_frame, text="Nur Ergebnisse", variable=self.nur_ergebnisse,
+                                    command=lambda: self.texts.setze_modus(self.nur_ergebnisse.get()), font=("Arial", 12))
+        chk_ablage.pack(side='left', padx=10)
+        ToolTip(chk_ablage, "Texte aus Dateien nicht im Speicher halten, bei Bedarf neu lesen")
+
         self.ausgabe_text = scrolledtext.ScrolledText(self.root, width=100, height=30)
         self.ausgabe_text.pack(padx=10, pady=10)
 
@@ -172,18 +254,84 @@ class MainGUI:
     def lade_datei(self):
         filepath = filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
         if filepath:
-            with open(filepath, "r", encoding="utf-8") as f:
-                text = f.read()
+            text = kern.lies_datei(filepath, K_VOKALE + K_KONSONANTEN)
             kapitel = filepath.split("/")[-1]
-            self.texts[kapitel] = text
+            alt = self.alte_fassung(kapitel)
+            self.texts.ablegen(kapitel, text, filepath)
             self.ausgabe_text.insert(tk.END, f"'{kapitel}' geladen.\n")
-            self.analysiere_text(kapitel, text)
+            self.analysiere_text(kapitel, text, alt)
+
+    def lade_buch(self):
+        filepath = filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
+        if not filepath:
+            return
+        muster = simpledialog.askstring("Buch laden", "Kapitelüberschriften (regulärer Ausdruck):",
+                                        initialvalue=KAPITEL_MUSTER)
+        if not muster:
+            return
+        text = kern.lies_datei(filepath, K_VOKALE + K_KONSONANTEN)
+        try:
+            kapitel_liste = kern.kapitel_positionen(text, muster)
+        except re.error as e:
+            self.ausgabe_text.insert(tk.END, f"\nUngültiges Muster: {e}\n")
+            return
+        buch = filepath.split("/")[-1]
+        self.ausgabe_text.insert(tk.END, f"'{buch}' geladen: {len(kapitel_liste)} Kapitel.\n")
+        ergebnisse = kern.berechne_parallel(berechne_statistik, [text[von:bis] for _, von, bis in kapitel_liste])
+        for (titel, von, bis), ergebnis in zip(kapitel_liste, ergebnisse):
+            kapitel = f"{buch} ⋅ {titel}"
+            kapiteltext = text[von:bis]
+            self.texts.ablegen(kapitel, kapiteltext, filepath, von)
+            self.zaehlungen.pop(kapitel, None)
+            self.zeige_ergebnisse(kapitel, kapiteltext, ergebnis)
+
+    def analysiere_text(self, kapitel, text, alt=None):
+        # neue Fassung eines bekannten Textes: nur geänderte Satzblöcke zählen
+        benoetigt = kern.benoetigte_zaehlungen(INDEX_LISTE)
+        vorher = self.ergebnisse.get(kapitel)
+        if alt is not None and kapitel in self.zaehlungen:
+            zaehlungen, geaendert = kern.ueberarbeite(alt, text, zaehle_text, self.zaehlungen[kapitel], benoetigt)
+            self.ausgabe_text.insert(tk.END, f"Neue Fassung: {geaendert} Satzblöcke neu gezählt.\n")
+        else:
+            zaehlungen = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, benoetigt=benoetigt)
+        self.zaehlungen[kapitel] = {k: v for k, v in zaehlungen.items() if k != "Wortfolge"}
+        self.zeige_ergebnisse(kapitel, text, berechne_indizes(zaehlungen))
+        if alt is not None and vorher:
+            self.zeige_unterschiede(vorher, self.ergebnisse[kapitel])
+
+    def alte_fassung(self, kapitel):
+        # None, wenn der Text neu ist oder seine Datei schon überschrieben wurde
+        try:
+            return self.texts.get(kapitel)
+        except (OSError, ValueError):
+            return None
+
+    # Text neu lesen (Modus "Nur Ergebnisse"); None mit Hinweis, wenn die
+    # Datei seit dem Laden verändert wurde oder fehlt
+    def lies_text(self, kapitel):
+        try:
+            return self.texts[kapitel]
+        except (OSError, ValueError) as e:
+            self.ausgabe_text.insert(tk.END, f"\n'{kapitel}': Datei verändert/fehlt ({e})\n")
+            return None
+
+    def zeige_unterschiede(self, vorher, nachher):
+        self.ausgabe_text.insert(tk.END, "Änderungen gegenüber der vorigen Fassung:\n")
+        for k, (alt, neu, differenz) in kern.unterschiede(vorher, nachher).items():
+            self.ausgabe_text.insert(tk.END, f"{k}: {alt} → {neu} ({differenz:+})\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
 
-    def analysiere_text(self, kapitel, text):
-        ergebnisse = berechne_statistik(text)
+    def zeige_ergebnisse(self, kapitel, text, ergebnisse):
+        self.ergebnisse[kapitel] = ergebnisse
+        self.intervalle.pop(kapitel, None)
+        intervalle = self.berechne_intervalle(kapitel, text) if self.mit_ki.get() else {}
         self.ausgabe_text.insert(tk.END, f"\nErgebnisse für {kapitel}:\n")
         for k, v in ergebnisse.items():
-            self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
+            if k in intervalle:
+                unten, oben = intervalle[k]
+                self.ausgabe_text.insert(tk.END, f"{k}: {v} [{unten}; {oben}]\n")
+            else:
+                self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
         self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
 
     def speichere_ausgabe(self):
@@ -197,14 +345,30 @@ class MainGUI:
         if not self.texts:
             return
         daten = []
-        for kapitel, text in self.texts.items():
-            stats_dict = berechne_statistik(text)
+        for kapitel in self.texts:
+            stats_dict = dict(self.ergebnis(kapitel))
             stats_dict["Text"] = kapitel
             daten.append(stats_dict)
         df = pd.DataFrame(daten)
         cols = ["Text","Sätze","Wörter","Silben","Grapheme","ASL","AWL",
                 "Flesch","Amstad","Tuldava","Lix","WSTF1","WSTF2","WSTF3","WSTF4","NRE"]
         df = df[cols]
+        if self.stufen:
+            df = df.assign(Stufe=df["Text"].map(self.stufen))
+        if self.mit_ki.get():
+            df = df.join(self.intervall_tabelle(), on="Text")
+        if self.gruppenregel:
+            # Gruppen als eigene Zeilen unter den Texten
+            try:
+                gruppen, ergebnisse = self.gruppen_ergebnisse()
+            except (OSError, ValueError) as e:
+                self.ausgabe_text.insert(tk.END, f"\nFehler beim Excel-Export (Gruppen): {e}\n")
+                return
+            df = df.assign(Gruppe=df["Text"].map(gruppen))
+            zeilen = pd.DataFrame([{"Text": f"Gruppe: {name}", "Gruppe": name, **werte}
+                                   for name, werte in ergebnisse.items()])
+            df = pd.concat([df, zeilen[[c for c in zeilen.columns if c in df.columns or c == "Texte"]]],
+                           ignore_index=True)
         filepath = filedialog.asksaveasfilename(defaultextension=".xlsx")
         if filepath:
             df.to_excel(filepath, index=False)
@@ -217,14 +381,14 @@ class MainGUI:
         kapitel_namen = []
         indices = {"Flesch": [], "Amstad": [], "Tuldava": [], "Lix": [],
                    "WSTF1": [], "WSTF2": [], "WSTF3": [], "WSTF4": [], "NRE": []}
-        for kapitel, text in self.texts.items():
-            stats_dict = berechne_statistik(text)
-            kapitel_namen.append(kapitel)
+        for kapitel in self.texts:
+            stats_dict = self.ergebnis(kapitel)
+            kapitel_namen.append(self.beschriftung(kapitel))
             for key in indices:
                 indices[key].append(stats_dict[key])
         plt.figure(figsize=(12, 6))
         for key, values in indices.items():
-            plt.plot(kapitel_namen, values, marker="o", label=key)
+            plt.errorbar(kapitel_namen, values, yerr=self.fehlerbalken(key, values), marker="o", capsize=3, label=key)
         plt.xticks(rotation=45, ha="right")
         plt.ylabel("Indexwert")
         plt.title("Textschwierigkeit pro Kapitel")
@@ -241,15 +405,15 @@ class MainGUI:
         if not index1 or not index2:
             return
         x_vals, y_vals = [], []
-        for _, text in self.texts.items():
-            stats_dict = berechne_statistik(text)
+        for _ in self.texts:
+            stats_dict = self.ergebnis(_)
             if index1 in stats_dict and index2 in stats_dict:
                 x_vals.append(stats_dict[index1])
                 y_vals.append(stats_dict[index2])
         plt.figure(figsize=(8, 6))
         plt.scatter(x_vals, y_vals)
         for i, txt in enumerate(kapitel):
-            plt.annotate(txt, (x_vals[i], y_vals[i]))
+            plt.annotate(self.beschriftung(txt), (x_vals[i], y_vals[i]))
         plt.xlabel(index1)
         plt.ylabel(index2)
         plt.title(f"{index1} vs {index2}")
@@ -261,8 +425,8 @@ class MainGUI:
             return
         indices = ["Flesch","Amstad","Tuldava","Lix","WSTF1","WSTF2","WSTF3","WSTF4","NRE"]
         data = {key: [] for key in indices}
-        for text in self.texts.values():
-            stats_dict = berechne_statistik(text)
+        for kapitel in self.texts:
+            stats_dict = self.ergebnis(kapitel)
             for key in indices:
                 data[key].append(stats_dict[key])
 
@@ -284,11 +448,183 @@ class MainGUI:
             self.ausgabe_text.insert(tk.END, "Sig. (2-tailed)\t" + "\t".join(line_sigs) + "\n")
             self.ausgabe_text.insert(tk.END, "N\t" + "\t".join(line_ns) + "\n")
 
+    def bilde_stufen(self):
+        if len(self.texts) < 2:
+            return
+        anzahl = simpledialog.askinteger("Stufen", "Anzahl der Schwierigkeitsstufen:",
+                                         initialvalue=min(3, len(self.texts)), minvalue=2, maxvalue=len(self.texts))
+        if not anzahl:
+            return
+        kapitel = list(self.texts)
+        raum = Profilraum(kapitel, [self.ergebnis(k) for k in kapitel])
+        self.stufen = raum.bilde_stufen(anzahl, seed=0)
+        self.ausgabe_text.insert(tk.END, f"\nSchwierigkeitsstufen (k-Means über {', '.join(raum.merkmale)}):\n")
+        for stufe in range(1, anzahl + 1):
+            texte = [k for k in kapitel if self.stufen[k] == stufe]
+            self.ausgabe_text.insert(tk.END, f"Stufe {stufe}: {', '.join(texte)}\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    # Beschriftung in Diagrammen: mit Stufe, sobald Stufen gebildet sind
+    def beschriftung(self, kapitel):
+        return f"{kapitel} (Stufe {self.stufen[kapitel]})" if kapitel in self.stufen else kapitel
+
+    def bilde_gruppen(self):
+        if not self.texts:
+            return
+        try:
+            antwort = frage_gruppenregel(self.root)
+        except (OSError, ValueError, re.error) as e:
+            self.ausgabe_text.insert(tk.END, f"\nGruppen: {e}\n")
+            return
+        if antwort is None:
+            return
+        self.gruppenregel, beschreibung = antwort
+        try:
+            gruppen, ergebnisse = self.gruppen_ergebnisse()
+        except (OSError, ValueError) as e:
+            self.gruppenregel = None
+            self.ausgabe_text.insert(tk.END, f"\nGruppen: {e}\n")
+            return
+        self.ausgabe_text.insert(tk.END, f"\nGruppen nach {beschreibung} (aus den summierten Zählungen):\n")
+        for name, werte in ergebnisse.items():
+            texte = [k for k, g in gruppen.items() if g == name]
+            self.ausgabe_text.insert(tk.END, f"\nGruppe {name} ({werte['Texte']} Texte: {', '.join(texte)}):\n")
+            for k, v in werte.items():
+                if k != "Texte":
+                    self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    # Gruppe pro Text und Indizes pro Gruppe für die aktuellen Texte
+    # (Texte, deren Datei verändert wurde oder fehlt, bleiben außen vor)
+    def gruppen_ergebnisse(self):
+        zaehlungen = {}
+        for kapitel in self.texts:
+            z = self.zaehlung(kapitel)
+            if z is not None:
+                zaehlungen[kapitel] = z
+        gruppen = {k: self.gruppenregel(k, self.texts.pfad(k)) for k in zaehlungen}
+        return gruppen, kern.gruppen_indizes(zaehlungen, gruppen, INDEX_LISTE)
+
+    # Rohzählungen eines Textes (ohne Wortfolge), bei Bedarf nachgezählt
+    def zaehlung(self, kapitel):
+        if kapitel not in self.zaehlungen:
+            text = self.lies_text(kapitel)
+            if text is None:
+                return None
+            benoetigt = kern.benoetigte_zaehlungen(INDEX_LISTE) - {"Wortfolge"}
+            self.zaehlungen[kapitel] = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, benoetigt=benoetigt)
+        return self.zaehlungen[kapitel]
+
+    def ergebnis(self, kapitel):
+        if kapitel not in self.ergebnisse:
+            text = self.lies_text(kapitel)
+            if text is None:
+                return {k: float("nan") for k in INDEX_LISTE}
+            self.ergebnisse[kapitel] = berechne_statistik(text)
+        return self.ergebnisse[kapitel]
+
+    def berechne_intervalle(self, kapitel, text=None):
+        if kapitel not in self.intervalle:
+            if text is None:
+                text = self.lies_text(kapitel)
+                if text is None:
+                    return {}
+            self.intervalle[kapitel] = kern.bootstrap_intervalle(text, zaehle_text, INDEX_LISTE)
+        return self.intervalle[kapitel]
+
+    def intervall_tabelle(self):
+        zeilen = {}
+        for kapitel in self.texts:
+            zeilen[kapitel] = {}
+            for key, (unten, oben) in self.berechne_intervalle(kapitel).items():
+                zeilen[kapitel][f"{key} KI unten"] = unten
+                zeilen[kapitel][f"{key} KI oben"] = oben
+        return pd.DataFrame(zeilen).T
+
+    def fehlerbalken(self, key, values):
+        if not self.mit_ki.get():
+            return None
+        unten, oben = [], []
+        for kapitel, v in zip(self.texts, values):
+            u, o = self.berechne_intervalle(kapitel).get(key, (v, v))
+            unten.append(max(0, v - u))
+            oben.append(max(0, o - v))
+        return [unten, oben]
+
+    def waehle_text(self, titel):
+        if not self.texts:
+            return None
+        kapitel = list(self.texts.keys())[-1]
+        if len(self.texts) > 1:
+            kapitel = simpledialog.askstring(titel, "Text auswählen:\n" + "\n".join(self.texts),
+                                             initialvalue=kapitel)
+        return kapitel if kapitel in self.texts else None
+
+    def zeige_markierung(self):
+        kapitel = self.waehle_text("Markierung")
+        if kapitel is None:
+            return
+        text = self.lies_text(kapitel)
+        if text is None:
+            return
+        MarkierungsFenster(self.root, kapitel, text, self.ergebnis(kapitel)["ASL"], zaehle_silben,
+                           SATZGRENZEN)
+
+    def zeige_editor(self):
+        kapitel = self.waehle_text("Editor") if self.texts else "Neuer Text.txt"
+        if kapitel is None:
+            return
+        text = self.lies_text(kapitel) if kapitel in self.texts else ""
+        if text is None:
+            return
+        EditorFenster(self.root, kapitel, text,
+                      zaehle_text, berechne_indizes, self.uebernehme_text)
+
+    def uebernehme_text(self, kapitel, text):
+        alt = self.alte_fassung(kapitel)
+        self.texts.ablegen(kapitel, text)
+        self.ausgabe_text.insert(tk.END, f"'{kapitel}' aus dem Editor übernommen.\n")
+        self.analysiere_text(kapitel, text, alt)
+
     def reset_ausgabe(self):
         # Canvas/Textfeld leeren
         self.ausgabe_text.delete("1.0", tk.END)
         # Gespeicherte Texte löschen
         self.texts.clear()
+        self.ergebnisse.clear()
+        self.intervalle.clear()
+        self.zaehlungen.clear()
+        self.stufen.clear()
+        self.gruppenregel = None
+
+    def speichere_sitzung(self):
+        if not self.texts:
+            return
+        filepath = filedialog.asksaveasfilename(defaultextension=".cyiw", filetypes=[("CYIW-Sitzung","*.cyiw")])
+        if not filepath:
+            return
+        mit_texten = messagebox.askyesno("Sitzung speichern", "Texte mitspeichern?\n(Sonst werden sie bei Bedarf aus den Dateien gelesen.)")
+        try:
+            kern.speichere_sitzung(filepath, KUERZEL, self.texts, self.ergebnisse, self.intervalle, mit_texten,
+                                   self.zaehlungen)
+            self.ausgabe_text.insert(tk.END, f"\nSitzung gespeichert: {filepath}\n")
+        except (OSError, ValueError) as e:
+            self.ausgabe_text.insert(tk.END, f"\nFehler beim Speichern der Sitzung: {e}\n")
+
+    def lade_sitzung(self):
+        filepath = filedialog.askopenfilename(filetypes=[("CYIW-Sitzung","*.cyiw")])
+        if not filepath:
+            return
+        self.reset_ausgabe()
+        try:
+            self.ergebnisse, self.intervalle, self.zaehlungen = kern.lade_sitzung(filepath, KUERZEL, self.texts)
+        except (OSError, ValueError) as e:
+            self.texts.clear()
+            self.ausgabe_text.insert(tk.END, f"Fehler beim Laden der Sitzung: {e}\n")
+            return
+        self.ausgabe_text.insert(tk.END, f"Sitzung '{filepath.split('/')[-1]}' geladen: {len(self.texts)} Texte.\n")
+        for kapitel in self.texts:
+            self.ausgabe_text.insert(tk.END, f"{kapitel}\n")
 
 
 # ===========================
@@ -1,14 +1,17 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, simpledialog
+from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 import matplotlib.pyplot as plt
 import numpy as np
-import math
 import re
 import scipy.stats as stats
 import pandas as pd  # Für Excel-Export
+import cyiw_kern as kern
+from cyiw_ansichten import EditorFenster, MarkierungsFenster, frage_gruppenregel
+from cyiw_stufen import Profilraum
 
 # ===========================
 # Konstanten für Polnisch
+KUERZEL = "pl"   # für cyiw_kern (Prozesse, Kalibrierung, Frequenzliste)
 K_KONSONANTEN = "bcdfghjklłmnńprsśtwyzźż"
 G_KONSONANTEN = "BCDFGHJKLŁMNŃPRSŚTWYZŹŻ"
 K_VOKALE = "aąeęiouyó"
@@ -21,6 +24,9 @@ SONSTIGES = "„”«»\"'’‚—–-–*¤/(`),;:_[]{}<>@ \r\n\t"
 # Ersetzungen – z.B. gerader Apostroph -> typografischer
 ERSATZ_TABELLE = {"'": "’"}
 
+# Kapitelüberschriften für "Buch laden" (ganze Zeilen) und Seitenvorschübe
+KAPITEL_MUSTER = r'^[ \t]*(?:(?i:rozdział)[ \t]+[^\n]{1,60}|[IVXLCDM]+\.?)[ \t]*$|\f'
+
 # Digraph-Option: Basis oder erweiterte Digraph-Behandlung
 DIGRAPH_BASIS = {
     # leer, Standardbehandlung
@@ -35,8 +41,42 @@ DIGRAPH_ERWEITERT = {
     "sz": "š", "Sz": "Š", "SZ": "Š"
 }
 
+# Abkürzungen, hinter denen ein Punkt keinen Satz beendet (np., tzw., ul. Długa),
+# auch in der Schreibung mit ersetzten Digraphen (godz. -> goǳ.)
+ABKUERZUNGEN = ("np", "m", "tzw", "tj", "tzn", "ok", "ul", "al", "pl", "prof", "dr", "mgr", "inż", "hab",
+                "ks", "św", "nr", "wg", "godz", "str", "s", "zob", "por", "gen", "płk", "kpt", "jw", "pt")
+
+def mit_digraphen(wort):
+    for alt, neu in DIGRAPH_ERWEITERT.items():
+        wort = wort.replace(alt, neu)
+    return wort
+
+SATZGRENZEN = kern.satzgrenzen(ABKUERZUNGEN + tuple(mit_digraphen(a) for a in ABKUERZUNGEN))
+
 # ===========================
-def berechne_statistik(text, digraphs=None):
+# Silben zählen: 1 (polnischer) Vokal = 1 Silbe, Ausnahmen für Diphthonge
+DIPHTHONGE = ["ia","ią","ie","ię","iu","Ia","Ią","Ie","Ię","Iu"]
+
+# einmal beim Laden kompiliert (zaehle_text läuft pro Satzblock)
+VOKALE = frozenset(K_VOKALE + G_VOKALE)
+DIPHTHONG = re.compile("|".join(DIPHTHONGE))
+WORTMUSTER = re.compile(r'\b\w+(?:[’]\w+)?\b', flags=re.UNICODE)
+KEINE_GRAPHEME = re.compile(r'[\s' + re.escape(SATZENDE + SONSTIGES) + ']')
+
+def zaehle_silben(wort):
+    # ein Diphthong (zwei Vokale, die sich nicht überlappen) zählt als eine Silbe
+    return zaehle_vokale(wort) - len(DIPHTHONG.findall(wort))
+
+# reine Vokalzählung (für MS, ES und Gunning-Fog)
+def zaehle_vokale(wort):
+    return sum(1 for c in wort if c in VOKALE)
+
+# ===========================
+# Rohzählungen eines Textes (lassen sich über Satzblöcke aufsummieren)
+def zaehle_text(text, digraphs=None, benoetigt=None):
+    # benoetigt: nur diese Rohzählungen ermitteln (None = alle)
+    benoetigt = set(kern.ZAEHLUNGEN if benoetigt is None else benoetigt)
+
     # Digraph-Ersetzungen durchführen, falls aktiviert
     if digraphs:
         for alt, neu in digraphs.items():
@@ -47,86 +87,52 @@ def berechne_statistik(text, digraphs=None):
         text = text.replace(alt, neu)
 
     # Satz- und Worttrennung
-    satzmuster = r'[.!?…|]+'
-    saetze_liste = [s.strip() for s in re.split(satzmuster, text) if s.strip()]
-    saetze = len(saetze_liste)
+    saetze = SATZGRENZEN.zaehle(text) if "Sätze" in benoetigt else 0
 
     # einfache Worterkennung (inkl. optionalem Apostroph-Bestandteil)
-    wortmuster = r'\b\w+(?:[’]\w+)?\b'
-    woerter_liste = re.findall(wortmuster, text, flags=re.UNICODE)
-    woerter = len(woerter_liste)
-
-    # Silben zählen: 1 (polnischer) Vokal = 1 Silbe, Ausnahmen für Diphthonge
-    vokale = K_VOKALE + G_VOKALE
-    diphthonge = ["ia","ią","ie","ię","iu","Ia","Ią","Ie","Ię","Iu"]
-    def zaehle_silben(wort):
-        wort_tmp = wort
-        for diph in diphthonge:
-            wort_tmp = wort_tmp.replace(diph, "°")  # Diphthonge durch ein Zeichen ersetzen
-        return sum(1 for c in wort_tmp if c in vokale or c == "°")
-
-    silben = sum(zaehle_silben(w) for w in woerter_liste)
+    woerter_liste = WORTMUSTER.findall(text)
 
+    # Vokale pro Wort (für MS, ES und Gunning-Fog)
+    vokale_pro_wort = []
+    if benoetigt & {"Mehrsilber", "Einsilber"}:
+        vokale_pro_wort = [zaehle_vokale(w) for w in woerter_liste]
 
     # Grapheme zählen (alle Buchstaben ohne Satzzeichen/Leerzeichen/Ziffern)
-    text_ohne_zeichen = re.sub(r'[\s' + re.escape(SATZENDE + SONSTIGES) + ']', '', text)
-    grapheme = len(text_ohne_zeichen)
-
-    # Längenmaße
-    asl = (woerter / saetze) if saetze else 0.0
-    awl = (grapheme / woerter) if woerter else 0.0
-
-    # Flesch
-    flesch = 206.835 - 1.015 * asl - 84.6 * (silben / woerter) if woerter and saetze else 0.0
-
-    # Amstad
-    amstad = 180 - asl - 58.5 * (silben / woerter) if woerter and saetze else 0.0
+    text_ohne_zeichen = ""
+    if "Grapheme" in benoetigt:
+        text_ohne_zeichen = KEINE_GRAPHEME.sub('', text)
 
-    # Tuldava
-    i_bar = (silben / woerter) if woerter else 0.0
-    j_bar = (woerter / saetze) if saetze else 0.0
-    tuldava = i_bar * math.log(j_bar) if j_bar > 0 else 0.0
-
-    # LIX (lange Worte >6 Zeichen)
-    lange_worte = sum(1 for w in woerter_liste if len(w) > 6)
-    lix = asl + (lange_worte / woerter * 100) if woerter and saetze else 0.0
-
-    # Wiener Sachtextformel (WSTF 1–4)
-    ms = (sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) >= 3) / woerter * 100) if woerter else 0.0
-    iw = (lange_worte / woerter * 100) if woerter else 0.0
-    es = (sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) == 1) / woerter * 100) if woerter else 0.0
-
-    wstf1 = 0.1935 * ms + 0.1672 * asl + 0.1297 * iw - 0.0327 * es - 0.875
-    wstf2 = 0.2007 * ms + 0.1682 * asl + 0.1373 * iw - 2.779
-    wstf3 = 0.2963 * ms + 0.1905 * asl - 1.1144
-    wstf4 = 0.2656 * asl + 0.2744 * ms - 1.693
-
-    # New Reading Ease (NRE)
-    nre = 1.599 * es - 1.015 * asl - 31.517
-
-    # === Gunning-Fog Index ===
-    silben_pro_wort = [sum(1 for c in w if c in vokale) for w in woerter_liste]
-    lange_worte_gf = sum(1 for spw in silben_pro_wort if spw >= 3)  # dreisilbige+ Wörter
-    gunning_fog = 0.4 * (asl + 100 * (lange_worte_gf / woerter)) if woerter else 0.0
-
-    return {
+    zaehlungen = {
         "Sätze": saetze,
-        "Wörter": woerter,
-        "Silben": silben,
-        "Grapheme": grapheme,
-        "ASL": round(asl, 2),
-        "AWL": round(awl, 2),
-        "Flesch": round(flesch, 2),
-        "Amstad": round(amstad, 2),
-        "Tuldava": round(tuldava, 2),
-        "Lix": round(lix, 2),
-        "WSTF1": round(wstf1, 2),
-        "WSTF2": round(wstf2, 2),
-        "WSTF3": round(wstf3, 2),
-        "WSTF4": round(wstf4, 2),
-        "NRE": round(nre, 2),
-        "GunningFog": round(gunning_fog, 2)
+        "Wörter": len(woerter_liste),
+        "Silben": sum(zaehle_silben(w) for w in woerter_liste) if "Silben" in benoetigt else 0,
+        "Grapheme": len(text_ohne_zeichen),
+        "LangeWörter": sum(1 for w in woerter_liste if len(w) > 6),
+        "Mehrsilber": sum(1 for v in vokale_pro_wort if v >= 3),  # dreisilbige+ Wörter
+        "Einsilber": sum(1 for v in vokale_pro_wort if v == 1),
+        "WörterÜber3": sum(1 for w in woerter_liste if len(w) > 3)
     }
+    # Wortfolge für die Wortschatz-Indizes (nur auf Anfrage)
+    if "Wortfolge" in benoetigt:
+        zaehlungen["Wortfolge"] = [w.lower() for w in woerter_liste]
+    return {k: v for k, v in zaehlungen.items() if k in benoetigt}
+
+# ===========================
+# Ausgegebene Werte in dieser Reihenfolge (Formeln: Register in cyiw_kern)
+INDEX_LISTE = ["Sätze", "Wörter", "Silben", "Grapheme", "ASL", "AWL", "Flesch", "Amstad",
+               "Tuldava", "Lix", "WSTF1", "WSTF2", "WSTF3", "WSTF4", "NRE", "GunningFog",
+               "TTR", "MTLD", "Hapax"]
+kern.kalibrierter_flesch(KUERZEL, INDEX_LISTE)
+kern.eigene_formeln(KUERZEL, INDEX_LISTE)
+kern.frequenzbaender(KUERZEL, INDEX_LISTE)
+
+def berechne_indizes(zaehlungen, indizes=INDEX_LISTE):
+    return kern.berechne_indizes(zaehlungen, indizes)
+
+def berechne_statistik(text, digraphs=None, indizes=INDEX_LISTE):
+    zaehlungen = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, digraphs=digraphs,
+                                         benoetigt=kern.benoetigte_zaehlungen(indizes))
+    return berechne_indizes(zaehlungen, indizes)
 
 # ===========================
 # Tooltip-Klasse
@@ -169,7 +175,14 @@ class MainGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("CYIW ⋅ Calculate Your Index Well ⋅ Polish 1.3")
-        self.texts = {}
+        self.texts = kern.Textablage(K_VOKALE + K_KONSONANTEN)
+        self.ergebnisse = {}
+        self.intervalle = {}
+        self.zaehlungen = {}   # Rohzählungen für neue Fassungen (ohne Wortfolge)
+        self.stufen = {}       # Schwierigkeitsstufe pro Text (k-Means)
+        self.gruppenregel = None   # Gruppen nach Ordner, Dateimuster oder Metadaten
+        self.mit_ki = tk.BooleanVar(value=False)
+        self.nur_ergebnisse = tk.BooleanVar(value=False)
         self.use_digraphs = tk.BooleanVar(value=False)  # Checkbox-Variable
         self.create_widgets()
 
@@ -181,6 +194,10 @@ class MainGUI:
         btn_laden.pack(side='left', padx=6)
         ToolTip(btn_laden, "Textdatei laden (TXT)")
 
+        btn_buch = tk.Button(button_frame, text="📚", command=self.lade_buch, font=("Arial", 18), width=3, height=2)
+        btn_buch.pack(side='left', padx=6)
+        ToolTip(btn_buch, "Buch laden und in Kapitel teilen")
+
         btn_liniendiagramm = tk.Button(button_frame, text="📈", command=self.zeige_liniendiagramm, font=("Arial", 18), width=3, height=2)
         btn_liniendiagramm.pack(side='left', padx=6)
         ToolTip(btn_liniendiagramm, "Liniendiagramm")
@@ -192,6 +209,14 @@ class MainGUI:
         btn_korrelation = tk.Button(button_frame, text="🔢", command=self.zeige_korrelation, font=("Arial", 18), width=3, height=2)
         btn_korrelation.pack(side='left', padx=6)
         ToolTip(btn_korrelation, "Korrelationsmatrix")
+
+        btn_markierung = tk.Button(button_frame, text="🖍️", command=self.zeige_markierung, font=("Arial", 18), width=3, height=2)
+        btn_markierung.pack(side='left', padx=6)
+        ToolTip(btn_markierung, "Schwierige Stellen markieren")
+
+        btn_editor = tk.Button(button_frame, text="✏️", command=self.zeige_editor, font=("Arial", 18), width=3, height=2)
+        btn_editor.pack(side='left', padx=6)
+        ToolTip(btn_editor, "Editor mit Live-Auswertung")
         
         btn_excel = tk.Button(button_frame, text="🗒️", command=self.export_excel, font=("Arial", 18), width=3, height=2)
         btn_excel.pack(side='left', padx=6)
@@ -200,17 +225,43 @@ class MainGUI:
         btn_speichern = tk.Button(button_frame, text="📜", command=self.speichere_ausgabe, font=("Arial", 18), width=3, height=2)
         btn_speichern.pack(side='left', padx=6)
         ToolTip(btn_speichern, "Als TXT speichern")
+
+        btn_sitzung = tk.Button(button_frame, text="💾", command=self.speichere_sitzung, font=("Arial", 18), width=3, height=2)
+        btn_sitzung.pack(side='left', padx=6)
+        ToolTip(btn_sitzung, "Sitzung speichern")
+
+        btn_sitzung_laden = tk.Button(button_frame, text="📂", command=self.lade_sitzung, font=("Arial", 18), width=3, height=2)
+        btn_sitzung_laden.pack(side='left', padx=6)
+        ToolTip(btn_sitzung_laden, "Sitzung laden")
         
+        btn_stufen = tk.Button(button_frame, text="🧩", command=self.bilde_stufen, font=("Arial", 18), width=3, height=2)
+        btn_stufen.pack(side='left', padx=6)
+        ToolTip(btn_stufen, "Schwierigkeitsstufen bilden (k-Means)")
+
+        btn_gruppen = tk.Button(button_frame, text="🗂️", command=self.bilde_gruppen, font=("Arial", 18), width=3, height=2)
+        btn_gruppen.pack(side='left', padx=6)
+        ToolTip(btn_gruppen, "Gruppen bilden (Ordner, Dateimuster, Metadaten)")
+
         btn_reset = tk.Button(button_frame, text="♻️", command=self.reset_ausgabe, font=("Arial", 18), width=3, height=2)
         btn_reset.pack(side='left', padx=6)
         ToolTip(btn_reset, "Zurücksetzen")
 
 
         # Checkbox für Digraphen-Behandlung
-        chk_digraph = tk.Checkbutton(button_frame, text="Digraphs", variable=self.use_digraphs, font=("Arial", 12))
+        chk_digraph = tk.Checkbutton(button_frame, text="Digraphs", variable=self.use_digraphs,
+                                     command=self.digraphs_umgeschaltet, font=("Arial", 12))
         chk_digraph.pack(side='left', padx=10)
         ToolTip(chk_digraph, "Spezielle Digraph-Ersetzung ein-/ausschalten")
 
+        chk_ki = tk.Checkbutton(button_frame, text="KI", variable=self.mit_ki, font=("Arial", 12))
+        chk_ki.pack(side='left', padx=10)
+        ToolTip(chk_ki, "Bootstrap-Konfidenzintervalle (95 %) berechnen")
+
+        chk_ablage = tk.Checkbutton(button_frame, text="Nur Ergebnisse", variable=self.nur_ergebnisse,
+                                    command=lambda: self.texts.setze_modus(self.nur_ergebnisse.get()), font=("Arial", 12))
+        chk_ablage.pack(side='left', padx=10)
+        ToolTip(chk_ablage, "Texte aus Dateien nicht im Speicher halten, bei Bedarf neu lesen")
+
         self.ausgabe_text = scrolledtext.ScrolledText(self.root, width=110, height=30)
         self.ausgabe_text.pack(padx=10, pady=8, fill='both', expand=True)
 
@@ -218,32 +269,100 @@ class MainGUI:
     def lade_datei(self):
         filepath = filedialog.askopenfilename(filetypes=[("Text files","*.txt"), ("All files","*.*")])
         if filepath:
-            with open(filepath, "r", encoding="utf-8") as f:
-                text = f.read()
+            text = kern.lies_datei(filepath, K_VOKALE + K_KONSONANTEN)
             kapitel = filepath.split("/")[-1]
-            self.texts[kapitel] = text
+            alt = self.alte_fassung(kapitel)
+            self.texts.ablegen(kapitel, text, filepath)
             self.ausgabe_text.insert(tk.END, f"'{kapitel}' geladen.\n")
-            self.analysiere_text(kapitel, text)
+            self.analysiere_text(kapitel, text, alt)
 
-    def analysiere_text(self, kapitel, text):
-        # Digraph-Ersetzungen durchführen, falls aktiviert
+    def lade_buch(self):
+        filepath = filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
+        if not filepath:
+            return
+        muster = simpledialog.askstring("Buch laden", "Kapitelüberschriften (regulärer Ausdruck):",
+                                        initialvalue=KAPITEL_MUSTER)
+        if not muster:
+            return
+        text = kern.lies_datei(filepath, K_VOKALE + K_KONSONANTEN)
+        try:
+            kapitel_liste = kern.kapitel_positionen(text, muster)
+        except re.error as e:
+            self.ausgabe_text.insert(tk.END, f"\nUngültiges Muster: {e}\n")
+            return
+        buch = filepath.split("/")[-1]
+        self.ausgabe_text.insert(tk.END, f"'{buch}' geladen: {len(kapitel_liste)} Kapitel.\n")
+        ergebnisse = kern.berechne_parallel(berechne_statistik,
+                                            [self.ersetze_digraphs(text[von:bis]) for _, von, bis in kapitel_liste])
+        for (titel, von, bis), ergebnis in zip(kapitel_liste, ergebnisse):
+            kapitel = f"{buch} ⋅ {titel}"
+            kapiteltext = text[von:bis]
+            self.texts.ablegen(kapitel, kapiteltext, filepath, von)
+            self.zaehlungen.pop(kapitel, None)
+            self.zeige_ergebnisse(kapitel, kapiteltext, ergebnis)
+
+    def analysiere_text(self, kapitel, text, alt=None):
+        # neue Fassung eines bekannten Textes: nur geänderte Satzblöcke zählen
+        benoetigt = kern.benoetigte_zaehlungen(INDEX_LISTE)
+        vorher = self.ergebnisse.get(kapitel)
+        if alt is not None and kapitel in self.zaehlungen:
+            zaehlungen, geaendert = kern.ueberarbeite(self.ersetze_digraphs(alt), self.ersetze_digraphs(text),
+                                                      zaehle_text, self.zaehlungen[kapitel], benoetigt)
+            self.ausgabe_text.insert(tk.END, f"Neue Fassung: {geaendert} Satzblöcke neu gezählt.\n")
+        else:
+            zaehlungen = kern.zaehle_in_scheiben(self.ersetze_digraphs(text), zaehle_text, KUERZEL, benoetigt=benoetigt)
+        self.zaehlungen[kapitel] = {k: v for k, v in zaehlungen.items() if k != "Wortfolge"}
+        self.zeige_ergebnisse(kapitel, text, berechne_indizes(zaehlungen))
+        if alt is not None and vorher:
+            self.zeige_unterschiede(vorher, self.ergebnisse[kapitel])
+
+    def alte_fassung(self, kapitel):
+        # None, wenn der Text neu ist oder seine Datei schon überschrieben wurde
+        try:
+            return self.texts.get(kapitel)
+        except (OSError, ValueError):
+            return None
+
+    # Text neu lesen (Modus "Nur Ergebnisse"); None mit Hinweis, wenn die
+    # Datei seit dem Laden verändert wurde oder fehlt
+    def lies_text(self, kapitel):
+        try:
+            return self.texts[kapitel]
+        except (OSError, ValueError) as e:
+            self.ausgabe_text.insert(tk.END, f"\n'{kapitel}': Datei verändert/fehlt ({e})\n")
+            return None
+
+    def zeige_unterschiede(self, vorher, nachher):
+        self.ausgabe_text.insert(tk.END, "Änderungen gegenüber der vorigen Fassung:\n")
+        for k, (alt, neu, differenz) in kern.unterschiede(vorher, nachher).items():
+            self.ausgabe_text.insert(tk.END, f"{k}: {alt} → {neu} ({differenz:+})\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    def digraphs_umgeschaltet(self):
+        # Zählungen, Ergebnisse und Intervalle hängen von der Digraph-Einstellung ab
+        self.zaehlungen.clear()
+        self.ergebnisse.clear()
+        self.intervalle.clear()
+
+    def ersetze_digraphs(self, text):
+        # Digraph-Ersetzungen durchführen, falls aktiviert (dieselbe Tabelle
+        # wie Editor und zaehle_text)
         if self.use_digraphs.get():
-            ersetzungen = {
-                "ch": "ç", "Ch": "Ç", "CH": "Ç",
-                "cz": "č", "Cz": "Č", "CZ": "Č",
-                "dz": "ǳ", "Dz": "ǲ", "DZ": "ǲ",
-                "dź": "ď", "Dź": "Ď",
-                "dż": "ǆ", "Dż": "ǅ",
-                "rz": "ž", "Rz": "Ž", "RZ": "Ž",
-                "sz": "š", "Sz": "Š", "SZ": "Š"
-            }
-            for alt, neu in ersetzungen.items():
+            for alt, neu in DIGRAPH_ERWEITERT.items():
                 text = text.replace(alt, neu)
+        return text
 
-        ergebnisse = berechne_statistik(text)
+    def zeige_ergebnisse(self, kapitel, text, ergebnisse):
+        self.ergebnisse[kapitel] = ergebnisse
+        self.intervalle.pop(kapitel, None)
+        intervalle = self.berechne_intervalle(kapitel, text) if self.mit_ki.get() else {}
         self.ausgabe_text.insert(tk.END, f"\nErgebnisse für {kapitel}:\n")
         for k, v in ergebnisse.items():
-            self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
+            if k in intervalle:
+                unten, oben = intervalle[k]
+                self.ausgabe_text.insert(tk.END, f"{k}: {v} [{unten}; {oben}]\n")
+            else:
+                self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
         self.ausgabe_text.insert(tk.END, "-"*40 + "\n")
 
     def speichere_ausgabe(self):
@@ -257,8 +376,8 @@ class MainGUI:
         if not self.texts:
             return
         daten = []
-        for kapitel, text in self.texts.items():
-            stats_dict = berechne_statistik(text)
+        for kapitel in self.texts:
+            stats_dict = dict(self.ergebnis(kapitel))
             stats_dict["Text"] = kapitel
             daten.append(stats_dict)
         df = pd.DataFrame(daten)
@@ -266,6 +385,22 @@ class MainGUI:
                 "Flesch","Amstad","Tuldava","Lix","WSTF1","WSTF2","WSTF3","WSTF4","NRE","GunningFog"]
         cols = [c for c in cols if c in df.columns]
         df = df[cols]
+        if self.stufen:
+            df = df.assign(Stufe=df["Text"].map(self.stufen))
+        if self.mit_ki.get():
+            df = df.join(self.intervall_tabelle(), on="Text")
+        if self.gruppenregel:
+            # Gruppen als eigene Zeilen unter den Texten
+            try:
+                gruppen, ergebnisse = self.gruppen_ergebnisse()
+            except (OSError, ValueError) as e:
+                self.ausgabe_text.insert(tk.END, f"\nFehler beim Excel-Export (Gruppen): {e}\n")
+                return
+            df = df.assign(Gruppe=df["Text"].map(gruppen))
+            zeilen = pd.DataFrame([{"Text": f"Gruppe: {name}", "Gruppe": name, **werte}
+                                   for name, werte in ergebnisse.items()])
+            df = pd.concat([df, zeilen[[c for c in zeilen.columns if c in df.columns or c == "Texte"]]],
+                           ignore_index=True)
         filepath = filedialog.asksaveasfilename(defaultextension=".xlsx")
         if filepath:
             try:
@@ -280,14 +415,14 @@ class MainGUI:
         kapitel_namen = []
         indices = {"Flesch": [], "Amstad": [], "Tuldava": [], "Lix": [],
                    "WSTF1": [], "WSTF2": [], "WSTF3": [], "WSTF4": [], "NRE": []}
-        for kapitel, text in self.texts.items():
-            stats_dict = berechne_statistik(text)
-            kapitel_namen.append(kapitel)
+        for kapitel in self.texts:
+            stats_dict = self.ergebnis(kapitel)
+            kapitel_namen.append(self.beschriftung(kapitel))
             for key in indices:
                 indices[key].append(stats_dict.get(key, np.nan))
         plt.figure(figsize=(12, 6))
         for key, values in indices.items():
-            plt.plot(kapitel_namen, values, marker="o", label=key)
+            plt.errorbar(kapitel_namen, values, yerr=self.fehlerbalken(key, values), marker="o", capsize=3, label=key)
         plt.xticks(rotation=45, ha="right")
         plt.ylabel("Indexwert")
         plt.title("Textschwierigkeit pro Text")
@@ -304,8 +439,8 @@ class MainGUI:
         if not index1 or not index2:
             return
         x_vals, y_vals = [], []
-        for k, text in self.texts.items():
-            stats = berechne_statistik(text)
+        for k in self.texts:
+            stats = self.ergebnis(k)
             if index1 in stats and index2 in stats:
                 x_vals.append(stats[index1])
                 y_vals.append(stats[index2])
@@ -314,7 +449,7 @@ class MainGUI:
         plt.figure(figsize=(8, 6))
         plt.scatter(x_vals, y_vals)
         for i, txt in enumerate(kapitel):
-            plt.annotate(txt, (x_vals[i], y_vals[i]))
+            plt.annotate(self.beschriftung(txt), (x_vals[i], y_vals[i]))
         plt.xlabel(index1)
         plt.ylabel(index2)
         plt.title(f"{index1} vs {index2}")
@@ -326,8 +461,8 @@ class MainGUI:
             return
         indices = ["Flesch","Amstad","Tuldava","Lix","WSTF1","WSTF2","WSTF3","WSTF4","NRE"]
         data = {key: [] for key in indices}
-        for text in self.texts.values():
-            stats_dict = berechne_statistik(text)
+        for kapitel in self.texts:
+            stats_dict = self.ergebnis(kapitel)
             for key in indices:
                 data[key].append(stats_dict.get(key, np.nan))
         n_texts = len(self.texts)
@@ -350,11 +485,189 @@ class MainGUI:
             self.ausgabe_text.insert(tk.END, "Sig. (2-tailed)\t" + "\t".join(line_sigs) + "\n")
             self.ausgabe_text.insert(tk.END, "N\t" + "\t".join(line_ns) + "\n")
 
+    def bilde_stufen(self):
+        if len(self.texts) < 2:
+            return
+        anzahl = simpledialog.askinteger("Stufen", "Anzahl der Schwierigkeitsstufen:",
+                                         initialvalue=min(3, len(self.texts)), minvalue=2, maxvalue=len(self.texts))
+        if not anzahl:
+            return
+        kapitel = list(self.texts)
+        raum = Profilraum(kapitel, [self.ergebnis(k) for k in kapitel])
+        self.stufen = raum.bilde_stufen(anzahl, seed=0)
+        self.ausgabe_text.insert(tk.END, f"\nSchwierigkeitsstufen (k-Means über {', '.join(raum.merkmale)}):\n")
+        for stufe in range(1, anzahl + 1):
+            texte = [k for k in kapitel if self.stufen[k] == stufe]
+            self.ausgabe_text.insert(tk.END, f"Stufe {stufe}: {', '.join(texte)}\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    # Beschriftung in Diagrammen: mit Stufe, sobald Stufen gebildet sind
+    def beschriftung(self, kapitel):
+        return f"{kapitel} (Stufe {self.stufen[kapitel]})" if kapitel in self.stufen else kapitel
+
+    def bilde_gruppen(self):
+        if not self.texts:
+            return
+        try:
+            antwort = frage_gruppenregel(self.root)
+        except (OSError, ValueError, re.error) as e:
+            self.ausgabe_text.insert(tk.END, f"\nGruppen: {e}\n")
+            return
+        if antwort is None:
+            return
+        self.gruppenregel, beschreibung = antwort
+        try:
+            gruppen, ergebnisse = self.gruppen_ergebnisse()
+        except (OSError, ValueError) as e:
+            self.gruppenregel = None
+            self.ausgabe_text.insert(tk.END, f"\nGruppen: {e}\n")
+            return
+        self.ausgabe_text.insert(tk.END, f"\nGruppen nach {beschreibung} (aus den summierten Zählungen):\n")
+        for name, werte in ergebnisse.items():
+            texte = [k for k, g in gruppen.items() if g == name]
+            self.ausgabe_text.insert(tk.END, f"\nGruppe {name} ({werte['Texte']} Texte: {', '.join(texte)}):\n")
+            for k, v in werte.items():
+                if k != "Texte":
+                    self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    # Gruppe pro Text und Indizes pro Gruppe für die aktuellen Texte
+    # (Texte, deren Datei verändert wurde oder fehlt, bleiben außen vor)
+    def gruppen_ergebnisse(self):
+        zaehlungen = {}
+        for kapitel in self.texts:
+            z = self.zaehlung(kapitel)
+            if z is not None:
+                zaehlungen[kapitel] = z
+        gruppen = {k: self.gruppenregel(k, self.texts.pfad(k)) for k in zaehlungen}
+        return gruppen, kern.gruppen_indizes(zaehlungen, gruppen, INDEX_LISTE)
+
+    # Rohzählungen eines Textes (ohne Wortfolge), bei Bedarf nachgezählt
+    def zaehlung(self, kapitel):
+        if kapitel not in self.zaehlungen:
+            text = self.lies_text(kapitel)
+            if text is None:
+                return None
+            benoetigt = kern.benoetigte_zaehlungen(INDEX_LISTE) - {"Wortfolge"}
+            self.zaehlungen[kapitel] = kern.zaehle_in_scheiben(self.ersetze_digraphs(text), zaehle_text,
+                                                               KUERZEL, benoetigt=benoetigt)
+        return self.zaehlungen[kapitel]
+
+    def ergebnis(self, kapitel):
+        if kapitel not in self.ergebnisse:
+            text = self.lies_text(kapitel)
+            if text is None:
+                return {k: float("nan") for k in INDEX_LISTE}
+            self.ergebnisse[kapitel] = berechne_statistik(self.ersetze_digraphs(text))
+        return self.ergebnisse[kapitel]
+
+    def berechne_intervalle(self, kapitel, text=None):
+        if kapitel not in self.intervalle:
+            if text is None:
+                text = self.lies_text(kapitel)
+                if text is None:
+                    return {}
+            # dieselbe Digraph-Ersetzung wie für den Punktwert (ergebnis, zaehlung)
+            self.intervalle[kapitel] = kern.bootstrap_intervalle(self.ersetze_digraphs(text), zaehle_text,
+                                                                 INDEX_LISTE)
+        return self.intervalle[kapitel]
+
+    def intervall_tabelle(self):
+        zeilen = {}
+        for kapitel in self.texts:
+            zeilen[kapitel] = {}
+            for key, (unten, oben) in self.berechne_intervalle(kapitel).items():
+                zeilen[kapitel][f"{key} KI unten"] = unten
+                zeilen[kapitel][f"{key} KI oben"] = oben
+        return pd.DataFrame(zeilen).T
+
+    def fehlerbalken(self, key, values):
+        if not self.mit_ki.get():
+            return None
+        unten, oben = [], []
+        for kapitel, v in zip(self.texts, values):
+            u, o = self.berechne_intervalle(kapitel).get(key, (v, v))
+            unten.append(max(0, v - u))
+            oben.append(max(0, o - v))
+        return [unten, oben]
+
+    def waehle_text(self, titel):
+        if not self.texts:
+            return None
+        kapitel = list(self.texts.keys())[-1]
+        if len(self.texts) > 1:
+            kapitel = simpledialog.askstring(titel, "Text auswählen:\n" + "\n".join(self.texts),
+                                             initialvalue=kapitel)
+        return kapitel if kapitel in self.texts else None
+
+    def zeige_markierung(self):
+        kapitel = self.waehle_text("Markierung")
+        if kapitel is None:
+            return
+        text = self.lies_text(kapitel)
+        if text is None:
+            return
+        # Gunning-Fog zählt im Polnischen reine Vokale
+        MarkierungsFenster(self.root, kapitel, text, self.ergebnis(kapitel)["ASL"], zaehle_vokale,
+                           SATZGRENZEN)
+
+    def zeige_editor(self):
+        kapitel = self.waehle_text("Editor") if self.texts else "Neuer Text.txt"
+        if kapitel is None:
+            return
+        text = self.lies_text(kapitel) if kapitel in self.texts else ""
+        if text is None:
+            return
+        digraphs = DIGRAPH_ERWEITERT if self.use_digraphs.get() else None
+        zaehle = lambda t: zaehle_text(t, digraphs)
+        EditorFenster(self.root, kapitel, text,
+                      zaehle, berechne_indizes, self.uebernehme_text)
+
+    def uebernehme_text(self, kapitel, text):
+        alt = self.alte_fassung(kapitel)
+        self.texts.ablegen(kapitel, text)
+        self.ausgabe_text.insert(tk.END, f"'{kapitel}' aus dem Editor übernommen.\n")
+        self.analysiere_text(kapitel, text, alt)
+
     def reset_ausgabe(self):
         # Canvas/Textfeld leeren
         self.ausgabe_text.delete("1.0", tk.END)
         # Gespeicherte Texte löschen
         self.texts.clear()
+        self.ergebnisse.clear()
+        self.intervalle.clear()
+        self.zaehlungen.clear()
+        self.stufen.clear()
+        self.gruppenregel = None
+
+    def speichere_sitzung(self):
+        if not self.texts:
+            return
+        filepath = filedialog.asksaveasfilename(defaultextension=".cyiw", filetypes=[("CYIW-Sitzung","*.cyiw")])
+        if not filepath:
+            return
+        mit_texten = messagebox.askyesno("Sitzung speichern", "Texte mitspeichern?\n(Sonst werden sie bei Bedarf aus den Dateien gelesen.)")
+        try:
+            kern.speichere_sitzung(filepath, KUERZEL, self.texts, self.ergebnisse, self.intervalle, mit_texten,
+                                   self.zaehlungen)
+            self.ausgabe_text.insert(tk.END, f"\nSitzung gespeichert: {filepath}\n")
+        except (OSError, ValueError) as e:
+            self.ausgabe_text.insert(tk.END, f"\nFehler beim Speichern der Sitzung: {e}\n")
+
+    def lade_sitzung(self):
+        filepath = filedialog.askopenfilename(filetypes=[("CYIW-Sitzung","*.cyiw")])
+        if not filepath:
+            return
+        self.reset_ausgabe()
+        try:
+            self.ergebnisse, self.intervalle, self.zaehlungen = kern.lade_sitzung(filepath, KUERZEL, self.texts)
+        except (OSError, ValueError) as e:
+            self.texts.clear()
+            self.ausgabe_text.insert(tk.END, f"Fehler beim Laden der Sitzung: {e}\n")
+            return
+        self.ausgabe_text.insert(tk.END, f"Sitzung '{filepath.split('/')[-1]}' geladen: {len(self.texts)} Texte.\n")
+        for kapitel in self.texts:
+            self.ausgabe_text.insert(tk.END, f"{kapitel}\n")
 
 
 # ===========================
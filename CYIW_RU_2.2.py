@@ -1,14 +1,16 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, simpledialog
+from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 import matplotlib.pyplot as plt
-import numpy as np
-import math
 import re
 import scipy.stats as stats
 import pandas as pd   # für Excel-Export
+import cyiw_kern as kern
+from cyiw_ansichten import EditorFenster, MarkierungsFenster, frage_gruppenregel
+from cyiw_stufen import Profilraum
 
 # ===========================
 # Konstanten für Russisch
+KUERZEL = "ru"   # für cyiw_kern (Prozesse, Kalibrierung, Frequenzliste)
 K_KONSONANTEN = "бвгджзйклмнпрстфхцчшщьъ"
 G_KONSONANTEN = "БВГДЖЗЙКЛМНПРСТФХЦЧШЩЬЪ"
 K_VOKALE = "аеёиоуыэюя"
@@ -19,6 +21,24 @@ ZAHLEN = "0123456789"
 SONSTIGES = "„*¤/(`),;:-_\"'’“«—»[<>]\r\n\t{}"
 ERSATZ_TABELLE = {"'": "’"}
 
+# Kapitelüberschriften für "Buch laden" (ganze Zeilen) und Seitenvorschübe
+KAPITEL_MUSTER = r'^[ \t]*(?:(?i:глава)[ \t]+[^\n]{1,60}|[IVXLCDM]+\.?)[ \t]*$|\f'
+
+# Abkürzungen, hinter denen ein Punkt keinen Satz beendet (т. е., т. к., ул. Ленина)
+ABKUERZUNGEN = ("т", "е", "к", "н", "напр", "ср", "см", "проф", "акад", "св", "ул", "пер", "просп",
+                "стр", "рис", "табл", "гл", "ок", "тов", "англ", "лат", "нем", "франц", "греч")
+SATZGRENZEN = kern.satzgrenzen(ABKUERZUNGEN)
+
+# einmal beim Laden kompiliert (zaehle_text läuft pro Satzblock)
+VOKALE = frozenset(K_VOKALE + G_VOKALE)
+WORTMUSTER = re.compile(r'\b\w+(?:’\w+)?\b')
+KEINE_GRAPHEME = re.compile(r'[\s' + re.escape(SATZENDE + SONSTIGES) + ']')
+
+# ===========================
+def zaehle_silben(wort):
+    # 1 Vokal = 1 Silbe
+    return sum(1 for c in wort if c in VOKALE)
+
 # ===========================
 # Parameter für FleschRUS
 MU_RU = 3.21
@@ -29,88 +49,64 @@ C_NEU = (206.835 - MU_RU)/SIGMA_RU*SIGMA_REF + MU_REF
 K_ASL = 1.015 * SIGMA_REF / SIGMA_RU
 K_ASW = 84.6 * SIGMA_REF / SIGMA_RU
 
-def berechne_flesch_rus(asl, silben_pro_wort):
-    return round(C_NEU - K_ASL * asl - K_ASW * silben_pro_wort, 2)
+flesch_rus = kern.registriere_flesch("FleschRUS", C_NEU, K_ASL, K_ASW)
 
 # ===========================
-def berechne_statistik(text):
+# Rohzählungen eines Textes (lassen sich über Satzblöcke aufsummieren)
+def zaehle_text(text, benoetigt=None):
+    # benoetigt: nur diese Rohzählungen ermitteln (None = alle)
+    benoetigt = set(kern.ZAEHLUNGEN if benoetigt is None else benoetigt)
+
     # Zeichen ersetzen
     for alt, neu in ERSATZ_TABELLE.items():
         text = text.replace(alt, neu)
 
-    # Sätze trennen
-    satzmuster = r'[.!?…|]+'
-    sätze = re.split(satzmuster, text)
-    sätze = [s.strip() for s in sätze if s.strip()]
-    saetze = len(sätze)
+    # Sätze zählen
+    sätze = SATZGRENZEN.zaehle(text) if "Sätze" in benoetigt else 0
 
     # Wörter finden
-    wortmuster = r'\b\w+(?:’\w+)?\b'
-    woerter_liste = re.findall(wortmuster, text)
-    woerter = len(woerter_liste)
+    woerter_liste = WORTMUSTER.findall(text)
 
     # Silben zählen (Vokale)
-    vokale = K_VOKALE + G_VOKALE
-    silben = sum(sum(1 for c in w if c in vokale) for w in woerter_liste)
+    silben_pro_wort_liste = []
+    if benoetigt & kern.SILBENZAEHLUNGEN:
+        silben_pro_wort_liste = [zaehle_silben(w) for w in woerter_liste]
 
     # Grapheme zählen (alles außer Satzzeichen und Leerzeichen)
-    text_ohne_punkt = re.sub(r'[\s' + re.escape(SATZENDE + SONSTIGES) + ']', '', text)
-    grapheme = len(text_ohne_punkt)
-
-    # ASL und AWL
-    asl = saetze and woerter / saetze or 0
-    awl = woerter and grapheme / woerter or 0
-
-    # === Lesbarkeitsformeln ===
-    flesch = 206.835 - 1.015 * asl - 84.6 * (silben / woerter) if woerter else 0
-    amstad = 180 - asl - 58.5 * (silben / woerter) if woerter else 0
-    tuldava = (silben / woerter) * math.log(asl) if woerter and saetze else 0
-
-    # LIX
-    lange_worte = sum(1 for w in woerter_liste if len(w) > 6)
-    lix = asl + (lange_worte / woerter * 100) if woerter else 0
-
-    # WSTF
-    ms = sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) >= 3) / woerter * 100 if woerter else 0
-    iw = lange_worte / woerter * 100 if woerter else 0
-    es = sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) == 1) / woerter * 100 if woerter else 0
-    wstf1 = 0.1935 * ms + 0.1672 * asl + 0.1297 * iw - 0.0327 * es - 0.875
-    wstf2 = 0.2007 * ms + 0.1682 * asl + 0.1373 * iw - 2.779
-    wstf3 = 0.2963 * ms + 0.1905 * asl - 1.1144
-    wstf4 = 0.2656 * asl + 0.2744 * ms - 1.693
-
-    # NRE
-    nosw = sum(1 for w in woerter_liste if sum(1 for c in w if c in vokale) == 1) / woerter * 100 if woerter else 0
-    nre = 1.599 * nosw - 1.015 * asl - 31.517
-
-    # Gunning-Fog Index
-    silben_pro_wort_liste = [sum(1 for c in w if c in vokale) for w in woerter_liste]
-    lange_worte_gf = sum(1 for spw in silben_pro_wort_liste if spw >= 3)
-    gunning_fog = 0.4 * (asl + 100 * (lange_worte_gf / woerter)) if woerter else 0.0
-
-    # FleschRUS
-    silben_pro_wort_avg = silben / woerter if woerter else 0
-    flesch_rus = berechne_flesch_rus(asl, silben_pro_wort_avg)
-
-    return {
-        "Sätze": saetze,
-        "Wörter": woerter,
-        "Silben": silben,
-        "Grapheme": grapheme,
-        "ASL": round(asl, 2),
-        "AWL": round(awl, 2),
-        "Flesch": round(flesch, 2),
-        "FleschRUS": flesch_rus,
-        "Amstad": round(amstad, 2),
-        "Tuldava": round(tuldava, 2),
-        "Lix": round(lix, 2),
-        "WSTF1": round(wstf1, 2),
-        "WSTF2": round(wstf2, 2),
-        "WSTF3": round(wstf3, 2),
-        "WSTF4": round(wstf4, 2),
-        "NRE": round(nre, 2),
-        "GunningFog": round(gunning_fog, 2)
+    text_ohne_punkt = ""
+    if "Grapheme" in benoetigt:
+        text_ohne_punkt = KEINE_GRAPHEME.sub('', text)
+
+    zaehlungen = {
+        "Sätze": sätze,
+        "Wörter": len(woerter_liste),
+        "Silben": sum(silben_pro_wort_liste),
+        "Grapheme": len(text_ohne_punkt),
+        "LangeWörter": sum(1 for w in woerter_liste if len(w) > 6),
+        "Mehrsilber": sum(1 for spw in silben_pro_wort_liste if spw >= 3),
+        "Einsilber": sum(1 for spw in silben_pro_wort_liste if spw == 1),
+        "WörterÜber3": sum(1 for w in woerter_liste if len(w) > 3)
     }
+    # Wortfolge für die Wortschatz-Indizes (nur auf Anfrage)
+    if "Wortfolge" in benoetigt:
+        zaehlungen["Wortfolge"] = [w.lower() for w in woerter_liste]
+    return {k: v for k, v in zaehlungen.items() if k in benoetigt}
+
+# ===========================
+# Ausgegebene Werte in dieser Reihenfolge (Formeln: Register in cyiw_kern)
+INDEX_LISTE = ["Sätze", "Wörter", "Silben", "Grapheme", "ASL", "AWL", "Flesch", "FleschRUS",
+               "Amstad", "Tuldava", "Lix", "WSTF1", "WSTF2", "WSTF3", "WSTF4", "NRE", "GunningFog",
+               "PisarekLinear", "PisarekNichtlinear", "TTR", "MTLD", "Hapax"]
+kern.kalibrierter_flesch(KUERZEL, INDEX_LISTE)
+kern.eigene_formeln(KUERZEL, INDEX_LISTE)
+kern.frequenzbaender(KUERZEL, INDEX_LISTE)
+
+def berechne_indizes(zaehlungen, indizes=INDEX_LISTE):
+    return kern.berechne_indizes(zaehlungen, indizes)
+
+def berechne_statistik(text, indizes=INDEX_LISTE):
+    zaehlungen = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, benoetigt=kern.benoetigte_zaehlungen(indizes))
+    return berechne_indizes(zaehlungen, indizes)
 
 # ===========================
 class ToolTip:
@@ -151,7 +147,14 @@ class MainGUI:
             self.root.iconphoto(False, icon)
         except Exception as e:
             print(f"Icon konnte nicht geladen werden: {e}")
-        self.texts = {}
+        self.texts = kern.Textablage(K_VOKALE + K_KONSONANTEN)
+        self.ergebnisse = {}
+        self.intervalle = {}
+        self.zaehlungen = {}   # Rohzählungen für neue Fassungen (ohne Wortfolge)
+        self.stufen = {}       # Schwierigkeitsstufe pro Text (k-Means)
+        self.gruppenregel = None   # Gruppen nach Ordner, Dateimuster oder Metadaten
+        self.mit_ki = tk.BooleanVar(value=False)
+        self.nur_ergebnisse = tk.BooleanVar(value=False)
         self.create_widgets()
 
     def create_widgets(self):
@@ -162,6 +165,10 @@ class MainGUI:
         b1.pack(side="left", padx=5)
         ToolTip(b1, "TXT laden")
 
+        b9 = tk.Button(button_frame, text="📚", command=self.lade_buch, font=("Arial", 20), width=2, height=1)
+        b9.pack(side="left", padx=5)
+        ToolTip(b9, "Buch laden und in Kapitel teilen")
+
         b3 = tk.Button(button_frame, text="📈", command=self.zeige_liniendiagramm, font=("Arial", 20), width=2, height=1)
         b3.pack(side="left", padx=5)
         ToolTip(b3, "Liniendiagramm")
@@ -174,6 +181,14 @@ class MainGUI:
         b5.pack(side="left", padx=5)
         ToolTip(b5, "Korrelationsmatrix")
 
+        b7 = tk.Button(button_frame, text="🖍️", command=self.zeige_markierung, font=("Arial", 20), width=2, height=1)
+        b7.pack(side="left", padx=5)
+        ToolTip(b7, "Schwierige Stellen markieren")
+
+        b8 = tk.Button(button_frame, text="✏️", command=self.zeige_editor, font=("Arial", 20), width=2, height=1)
+        b8.pack(side="left", padx=5)
+        ToolTip(b8, "Editor mit Live-Auswertung")
+
         b6 = tk.Button(button_frame, text="🗒️", command=self.export_excel, font=("Arial", 20), width=2, height=1)
         b6.pack(side="left", padx=5)
         ToolTip(b6, "Als Tabelle speichern")
@@ -182,6 +197,22 @@ class MainGUI:
         b2.pack(side="left", padx=5)
         ToolTip(b2, "Als TXT speichern")
 
+        b10 = tk.Button(button_frame, text="💾", command=self.speichere_sitzung, font=("Arial", 20), width=2, height=1)
+        b10.pack(side="left", padx=5)
+        ToolTip(b10, "Sitzung speichern")
+
+        b11 = tk.Button(button_frame, text="📂", command=self.lade_sitzung, font=("Arial", 20), width=2, height=1)
+        b11.pack(side="left", padx=5)
+        ToolTip(b11, "Sitzung laden")
+
+        b12 = tk.Button(button_frame, text="🧩", command=self.bilde_stufen, font=("Arial", 20), width=2, height=1)
+        b12.pack(side="left", padx=5)
+        ToolTip(b12, "Schwierigkeitsstufen bilden (k-Means)")
+
+        b13 = tk.Button(button_frame, text="🗂️", command=self.bilde_gruppen, font=("Arial", 20), width=2, height=1)
+        b13.pack(side="left", padx=5)
+        ToolTip(b13, "Gruppen bilden (Ordner, Dateimuster, Metadaten)")
+
         btn_reset = tk.Button(button_frame, text="♻️", command=self.reset_ausgabe, font=("Arial", 20), width=2, height=1)
         btn_reset.pack(side='left', padx=5)
         ToolTip(btn_reset, "Zurücksetzen")
@@ -190,6 +221,15 @@ class MainGUI:
         b_info.pack(side="left", padx=5)
         ToolTip(b_info, "Formeln & Legende")
 
+        chk_ki = tk.Checkbutton(button_frame, text="KI", variable=self.mit_ki, font=("Arial", 12))
+        chk_ki.pack(side="left", padx=10)
+        ToolTip(chk_ki, "Bootstrap-Konfidenzintervalle (95 %) berechnen")
+
+        chk_ablage = tk.Checkbutton(button_frame, text="Nur Ergebnisse", variable=self.nur_ergebnisse,
+                                    command=lambda: self.texts.setze_modus(self.nur_ergebnisse.get()), font=("Arial", 12))
+        chk_ablage.pack(side="left", padx=10)
+        ToolTip(chk_ablage, "Texte aus Dateien nicht im Speicher halten, bei Bedarf neu lesen")
+
         self.ausgabe_text = scrolledtext.ScrolledText(self.root, width=100, height=30)
         self.ausgabe_text.pack(padx=10, pady=10)
 
@@ -197,18 +237,84 @@ class MainGUI:
     def lade_datei(self):
         filepath = filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
         if filepath:
-            with open(filepath,"r",encoding="utf-8") as f:
-                text = f.read()
+            text = kern.lies_datei(filepath, K_VOKALE + K_KONSONANTEN)
             kapitel = filepath.split("/")[-1]
-            self.texts[kapitel] = text
+            alt = self.alte_fassung(kapitel)
+            self.texts.ablegen(kapitel, text, filepath)
             self.ausgabe_text.insert(tk.END,f"'{kapitel}' geladen.\n")
-            self.analysiere_text(kapitel,text)
+            self.analysiere_text(kapitel,text, alt)
+
+    def lade_buch(self):
+        filepath = filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
+        if not filepath:
+            return
+        muster = simpledialog.askstring("Buch laden", "Kapitelüberschriften (regulärer Ausdruck):",
+                                        initialvalue=KAPITEL_MUSTER)
+        if not muster:
+            return
+        text = kern.lies_datei(filepath, K_VOKALE + K_KONSONANTEN)
+        try:
+            kapitel_liste = kern.kapitel_positionen(text, muster)
+        except re.error as e:
+            self.ausgabe_text.insert(tk.END, f"\nUngültiges Muster: {e}\n")
+            return
+        buch = filepath.split("/")[-1]
+        self.ausgabe_text.insert(tk.END, f"'{buch}' geladen: {len(kapitel_liste)} Kapitel.\n")
+        ergebnisse = kern.berechne_parallel(berechne_statistik, [text[von:bis] for _, von, bis in kapitel_liste])
+        for (titel, von, bis), ergebnis in zip(kapitel_liste, ergebnisse):
+            kapitel = f"{buch} ⋅ {titel}"
+            kapiteltext = text[von:bis]
+            self.texts.ablegen(kapitel, kapiteltext, filepath, von)
+            self.zaehlungen.pop(kapitel, None)
+            self.zeige_ergebnisse(kapitel, kapiteltext, ergebnis)
+
+    def analysiere_text(self, kapitel, text, alt=None):
+        # neue Fassung eines bekannten Textes: nur geänderte Satzblöcke zählen
+        benoetigt = kern.benoetigte_zaehlungen(INDEX_LISTE)
+        vorher = self.ergebnisse.get(kapitel)
+        if alt is not None and kapitel in self.zaehlungen:
+            zaehlungen, geaendert = kern.ueberarbeite(alt, text, zaehle_text, self.zaehlungen[kapitel], benoetigt)
+            self.ausgabe_text.insert(tk.END, f"Neue Fassung: {geaendert} Satzblöcke neu gezählt.\n")
+        else:
+            zaehlungen = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, benoetigt=benoetigt)
+        self.zaehlungen[kapitel] = {k: v for k, v in zaehlungen.items() if k != "Wortfolge"}
+        self.zeige_ergebnisse(kapitel, text, berechne_indizes(zaehlungen))
+        if alt is not None and vorher:
+            self.zeige_unterschiede(vorher, self.ergebnisse[kapitel])
+
+    def alte_fassung(self, kapitel):
+        # None, wenn der Text neu ist oder seine Datei schon überschrieben wurde
+        try:
+            return self.texts.get(kapitel)
+        except (OSError, ValueError):
+            return None
 
-    def analysiere_text(self, kapitel, text):
-        ergebnisse = berechne_statistik(text)
+    # Text neu lesen (Modus "Nur Ergebnisse"); None mit Hinweis, wenn die
+    # Datei seit dem Laden verändert wurde oder fehlt
+    def lies_text(self, kapitel):
+        try:
+            return self.texts[kapitel]
+        except (OSError, ValueError) as e:
+            self.ausgabe_text.insert(tk.END, f"\n'{kapitel}': Datei verändert/fehlt ({e})\n")
+            return None
+
+    def zeige_unterschiede(self, vorher, nachher):
+        self.ausgabe_text.insert(tk.END, "Änderungen gegenüber der vorigen Fassung:\n")
+        for k, (alt, neu, differenz) in kern.unterschiede(vorher, nachher).items():
+            self.ausgabe_text.insert(tk.END, f"{k}: {alt} → {neu} ({differenz:+})\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    def zeige_ergebnisse(self, kapitel, text, ergebnisse):
+        self.ergebnisse[kapitel] = ergebnisse
+        self.intervalle.pop(kapitel, None)
+        intervalle = self.berechne_intervalle(kapitel, text) if self.mit_ki.get() else {}
         self.ausgabe_text.insert(tk.END,f"\nErgebnisse für {kapitel}:\n")
         for k,v in ergebnisse.items():
-            self.ausgabe_text.insert(tk.END,f"{k}: {v}\n")
+            if k in intervalle:
+                unten, oben = intervalle[k]
+                self.ausgabe_text.insert(tk.END,f"{k}: {v} [{unten}; {oben}]\n")
+            else:
+                self.ausgabe_text.insert(tk.END,f"{k}: {v}\n")
         self.ausgabe_text.insert(tk.END,"-"*30+"\n")
 
     def speichere_ausgabe(self):
@@ -223,9 +329,24 @@ class MainGUI:
         filepath = filedialog.asksaveasfilename(defaultextension=".xlsx")
         if filepath:
             data = {}
-            for kapitel, text in self.texts.items():
-                data[kapitel] = berechne_statistik(text)
+            for kapitel in self.texts:
+                data[kapitel] = self.ergebnis(kapitel)
             df = pd.DataFrame(data).T
+            if self.stufen:
+                df = df.assign(Stufe=pd.Series(self.stufen))
+            if self.mit_ki.get():
+                df = df.join(self.intervall_tabelle())
+            if self.gruppenregel:
+                # Gruppen als eigene Zeilen unter den Texten
+                try:
+                    gruppen, ergebnisse = self.gruppen_ergebnisse()
+                except (OSError, ValueError) as e:
+                    self.ausgabe_text.insert(tk.END, f"\nFehler beim Excel-Export (Gruppen): {e}\n")
+                    return
+                df = df.assign(Gruppe=pd.Series(gruppen))
+                zeilen = pd.DataFrame({f"Gruppe: {name}": {"Gruppe": name, **werte}
+                                       for name, werte in ergebnisse.items()}).T
+                df = pd.concat([df, zeilen])
             df.to_excel(filepath)
 
     def zeige_liniendiagramm(self):
@@ -234,14 +355,14 @@ class MainGUI:
         kapitel_namen = []
         indices = ["Flesch","FleschRUS","Amstad","Tuldava","Lix","WSTF1","WSTF2","WSTF3","WSTF4","NRE"]
         data_dict = {key:[] for key in indices}
-        for kapitel, text in self.texts.items():
-            stats = berechne_statistik(text)
-            kapitel_namen.append(kapitel)
+        for kapitel in self.texts:
+            stats = self.ergebnis(kapitel)
+            kapitel_namen.append(self.beschriftung(kapitel))
             for key in indices:
                 data_dict[key].append(stats[key])
         plt.figure(figsize=(12,6))
         for key, values in data_dict.items():
-            plt.plot(kapitel_namen, values, marker="o", label=key)
+            plt.errorbar(kapitel_namen, values, yerr=self.fehlerbalken(key, values), marker="o", capsize=3, label=key)
         plt.xticks(rotation=45, ha="right")
         plt.ylabel("Indexwert")
         plt.title("Textschwierigkeit pro Kapitel")
@@ -258,15 +379,15 @@ class MainGUI:
         if not index1 or not index2:
             return
         x_vals, y_vals = [], []
-        for k, text in self.texts.items():
-            stats = berechne_statistik(text)
+        for k in self.texts:
+            stats = self.ergebnis(k)
             if index1 in stats and index2 in stats:
                 x_vals.append(stats[index1])
                 y_vals.append(stats[index2])
         plt.figure(figsize=(8,6))
         plt.scatter(x_vals, y_vals)
         for i, txt in enumerate(kapitel):
-            plt.annotate(txt,(x_vals[i],y_vals[i]))
+            plt.annotate(self.beschriftung(txt),(x_vals[i],y_vals[i]))
         plt.xlabel(index1)
         plt.ylabel(index2)
         plt.title(f"{index1} vs {index2}")
@@ -278,8 +399,8 @@ class MainGUI:
             return
         indices = ["Flesch","FleschRUS","Amstad","Tuldava","Lix","WSTF1","WSTF2","WSTF3","WSTF4","NRE"]
         data = {key:[] for key in indices}
-        for text in self.texts.values():
-            stats_dict = berechne_statistik(text)
+        for kapitel in self.texts:
+            stats_dict = self.ergebnis(kapitel)
             for key in indices:
                 data[key].append(stats_dict[key])
         n_texts = len(self.texts)
@@ -302,9 +423,181 @@ class MainGUI:
             self.ausgabe_text.insert(tk.END, "Sig. (2-tailed)\t" + "\t".join(line_sigs) + "\n")
             self.ausgabe_text.insert(tk.END, "N\t" + "\t".join(line_ns) + "\n")
 
+    def bilde_stufen(self):
+        if len(self.texts) < 2:
+            return
+        anzahl = simpledialog.askinteger("Stufen", "Anzahl der Schwierigkeitsstufen:",
+                                         initialvalue=min(3, len(self.texts)), minvalue=2, maxvalue=len(self.texts))
+        if not anzahl:
+            return
+        kapitel = list(self.texts)
+        raum = Profilraum(kapitel, [self.ergebnis(k) for k in kapitel])
+        self.stufen = raum.bilde_stufen(anzahl, seed=0)
+        self.ausgabe_text.insert(tk.END, f"\nSchwierigkeitsstufen (k-Means über {', '.join(raum.merkmale)}):\n")
+        for stufe in range(1, anzahl + 1):
+            texte = [k for k in kapitel if self.stufen[k] == stufe]
+            self.ausgabe_text.insert(tk.END, f"Stufe {stufe}: {', '.join(texte)}\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    # Beschriftung in Diagrammen: mit Stufe, sobald Stufen gebildet sind
+    def beschriftung(self, kapitel):
+        return f"{kapitel} (Stufe {self.stufen[kapitel]})" if kapitel in self.stufen else kapitel
+
+    def bilde_gruppen(self):
+        if not self.texts:
+            return
+        try:
+            antwort = frage_gruppenregel(self.root)
+        except (OSError, ValueError, re.error) as e:
+            self.ausgabe_text.insert(tk.END, f"\nGruppen: {e}\n")
+            return
+        if antwort is None:
+            return
+        self.gruppenregel, beschreibung = antwort
+        try:
+            gruppen, ergebnisse = self.gruppen_ergebnisse()
+        except (OSError, ValueError) as e:
+            self.gruppenregel = None
+            self.ausgabe_text.insert(tk.END, f"\nGruppen: {e}\n")
+            return
+        self.ausgabe_text.insert(tk.END, f"\nGruppen nach {beschreibung} (aus den summierten Zählungen):\n")
+        for name, werte in ergebnisse.items():
+            texte = [k for k, g in gruppen.items() if g == name]
+            self.ausgabe_text.insert(tk.END, f"\nGruppe {name} ({werte['Texte']} Texte: {', '.join(texte)}):\n")
+            for k, v in werte.items():
+                if k != "Texte":
+                    self.ausgabe_text.insert(tk.END, f"{k}: {v}\n")
+        self.ausgabe_text.insert(tk.END, "-"*30 + "\n")
+
+    # Gruppe pro Text und Indizes pro Gruppe für die aktuellen Texte
+    # (Texte, deren Datei verändert wurde oder fehlt, bleiben außen vor)
+    def gruppen_ergebnisse(self):
+        zaehlungen = {}
+        for kapitel in self.texts:
+            z = self.zaehlung(kapitel)
+            if z is not None:
+                zaehlungen[kapitel] = z
+        gruppen = {k: self.gruppenregel(k, self.texts.pfad(k)) for k in zaehlungen}
+        return gruppen, kern.gruppen_indizes(zaehlungen, gruppen, INDEX_LISTE)
+
+    # Rohzählungen eines Textes (ohne Wortfolge), bei Bedarf nachgezählt
+    def zaehlung(self, kapitel):
+        if kapitel not in self.zaehlungen:
+            text = self.lies_text(kapitel)
+            if text is None:
+                return None
+            benoetigt = kern.benoetigte_zaehlungen(INDEX_LISTE) - {"Wortfolge"}
+            self.zaehlungen[kapitel] = kern.zaehle_in_scheiben(text, zaehle_text, KUERZEL, benoetigt=benoetigt)
+        return self.zaehlungen[kapitel]
+
+    def ergebnis(self, kapitel):
+        if kapitel not in self.ergebnisse:
+            text = self.lies_text(kapitel)
+            if text is None:
+                return {k: float("nan") for k in INDEX_LISTE}
+            self.ergebnisse[kapitel] = berechne_statistik(text)
+        return self.ergebnisse[kapitel]
+
+    def berechne_intervalle(self, kapitel, text=None):
+        if kapitel not in self.intervalle:
+            if text is None:
+                text = self.lies_text(kapitel)
+                if text is None:
+                    return {}
+            self.intervalle[kapitel] = kern.bootstrap_intervalle(text, zaehle_text, INDEX_LISTE)
+        return self.intervalle[kapitel]
+
+    def intervall_tabelle(self):
+        zeilen = {}
+        for kapitel in self.texts:
+            zeilen[kapitel] = {}
+            for key, (unten, oben) in self.berechne_intervalle(kapitel).items():
+                zeilen[kapitel][f"{key} KI unten"] = unten
+                zeilen[kapitel][f"{key} KI oben"] = oben
+        return pd.DataFrame(zeilen).T
+
+    def fehlerbalken(self, key, values):
+        if not self.mit_ki.get():
+            return None
+        unten, oben = [], []
+        for kapitel, v in zip(self.texts, values):
+            u, o = self.berechne_intervalle(kapitel).get(key, (v, v))
+            unten.append(max(0, v - u))
+            oben.append(max(0, o - v))
+        return [unten, oben]
+
+    def waehle_text(self, titel):
+        if not self.texts:
+            return None
+        kapitel = list(self.texts.keys())[-1]
+        if len(self.texts) > 1:
+            kapitel = simpledialog.askstring(titel, "Text auswählen:\n" + "\n".join(self.texts),
+                                             initialvalue=kapitel)
+        return kapitel if kapitel in self.texts else None
+
+    def zeige_markierung(self):
+        kapitel = self.waehle_text("Markierung")
+        if kapitel is None:
+            return
+        text = self.lies_text(kapitel)
+        if text is None:
+            return
+        MarkierungsFenster(self.root, kapitel, text, self.ergebnis(kapitel)["ASL"], zaehle_silben,
+                           SATZGRENZEN)
+
+    def zeige_editor(self):
+        kapitel = self.waehle_text("Editor") if self.texts else "Neuer Text.txt"
+        if kapitel is None:
+            return
+        text = self.lies_text(kapitel) if kapitel in self.texts else ""
+        if text is None:
+            return
+        EditorFenster(self.root, kapitel, text,
+                      zaehle_text, berechne_indizes, self.uebernehme_text)
+
+    def uebernehme_text(self, kapitel, text):
+        alt = self.alte_fassung(kapitel)
+        self.texts.ablegen(kapitel, text)
+        self.ausgabe_text.insert(tk.END, f"'{kapitel}' aus dem Editor übernommen.\n")
+        self.analysiere_text(kapitel, text, alt)
+
     def reset_ausgabe(self):
         self.ausgabe_text.delete("1.0", tk.END)
         self.texts.clear()
+        self.ergebnisse.clear()
+        self.intervalle.clear()
+        self.zaehlungen.clear()
+        self.stufen.clear()
+        self.gruppenregel = None
+
+    def speichere_sitzung(self):
+        if not self.texts:
+            return
+        filepath = filedialog.asksaveasfilename(defaultextension=".cyiw", filetypes=[("CYIW-Sitzung","*.cyiw")])
+        if not filepath:
+            return
+        mit_texten = messagebox.askyesno("Sitzung speichern", "Texte mitspeichern?\n(Sonst werden sie bei Bedarf aus den Dateien gelesen.)")
+        try:
+            kern.speichere_sitzung(filepath, KUERZEL, self.texts, self.ergebnisse, self.intervalle, mit_texten,
+                                   self.zaehlungen)
+            self.ausgabe_text.insert(tk.END, f"\nSitzung gespeichert: {filepath}\n")
+        except (OSError, ValueError) as e:
+            self.ausgabe_text.insert(tk.END, f"\nFehler beim Speichern der Sitzung: {e}\n")
+
+    def lade_sitzung(self):
+        filepath = filedialog.askopenfilename(filetypes=[("CYIW-Sitzung","*.cyiw")])
+        if not filepath:
+            return
+        self.reset_ausgabe()
+        try:
+            self.ergebnisse, self.intervalle, self.zaehlungen = kern.lade_sitzung(filepath, KUERZEL, self.texts)
+        except (OSError, ValueError) as e:
+            self.texts.clear()
+            self.ausgabe_text.insert(tk.END, f"Fehler beim Laden der Sitzung: {e}\n")
+            return
+        self.ausgabe_text.insert(tk.END, f"Sitzung '{filepath.split('/')[-1]}' geladen: {len(self.texts)} Texte.\n")
+        for kapitel in self.texts:
+            self.ausgabe_text.insert(tk.END, f"{kapitel}\n")
 
     def zeige_info(self):
         info_text = f"""
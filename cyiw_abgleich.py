@@ -0,0 +1,275 @@
+import functools
+import json
+import math
+import os
+import random
+import tempfile
+
+import cyiw_kern as kern
+import cyiw_stichprobe as stichprobe
+
+# ===========================
+# Abgleich der Zählwege: Referenz ist zaehle_text über den ganzen Text.
+# Jeder schnellere Weg (Satzblöcke, Scheiben, Überarbeitung, Editor,
+# berechne_statistik) muss dieselben Rohzählungen und Indizes liefern.
+# Geprüft wird auf erzeugten Texten mit Randfällen und auf einem
+# Goldkorpus, dessen Ergebnisse einmal gespeichert und bei jedem späteren
+# Lauf verglichen werden. Gemeldet wird jede Abweichung.
+SCHEIBEN_PROZESSE = 3   # Prozesse (je kern.SCHEIBEN_PRO_PROZESS Scheiben) für den Scheibenweg
+AENDERUNG = 5
+LANGE_ZEILE = 200_000   # Zeichen ohne Zeilenumbruch
+SATZZEICHEN = ".!?…|"
+SONSTIGE_ZEICHEN = ",;:-–—„“”«»\"'’()[]*/"
+LEERRAUM = "  \n\t\r "
+ZIFFERN = "0123456789"
+# Buchstaben aller Sprachversionen für Texte mit gemischten Schriften
+MISCHUNG = "abcdefghijklmnopqrstuvwxyzäöüßąćęłńóśźżабвгдеёжзийклмнопрстуфхцчшщъыьэюяґєії"
+
+# ===========================
+# Zählwege: (Sprache, Text, Optionen) -> Rohzählungen
+def zaehler(sprache, optionen, benoetigt):
+    return functools.partial(sprache.zaehle_text, benoetigt=benoetigt, **optionen)
+
+def ganz(sprache, text, optionen, benoetigt):
+    return zaehler(sprache, optionen, benoetigt)(text)
+
+def satzbloecke(sprache, text, optionen, benoetigt):
+    zaehle = zaehler(sprache, optionen, benoetigt)
+    return kern.vereinige_zaehlungen([zaehle("")] + [zaehle(b) for b in kern.satzbloecke(text)])
+
+# der echte Weg über SharedMemory und Prozesspool, schon ab einem Zeichen
+def scheiben(sprache, text, optionen, benoetigt):
+    scheiben_ab = kern.SCHEIBEN_AB
+    kern.SCHEIBEN_AB = 1
+    try:
+        return kern.zaehle_in_scheiben(text, sprache.zaehle_text, sprache.KUERZEL, SCHEIBEN_PROZESSE,
+                                       benoetigt=benoetigt, **optionen)
+    finally:
+        kern.SCHEIBEN_AB = scheiben_ab
+
+# alte Fassung: jeder AENDERUNG-te Satzblock fehlt
+def alte_fassung(text):
+    bloecke = kern.satzbloecke(text)
+    del bloecke[::AENDERUNG]
+    return "".join(bloecke)
+
+def ueberarbeitet(sprache, text, optionen, benoetigt):
+    zaehle = zaehler(sprache, optionen, benoetigt)
+    alt = alte_fassung(text)
+    return kern.ueberarbeite(alt, text, zaehle, zaehle(alt), benoetigt)[0]
+
+# wie im Editor: nur additive Zählungen
+def editor(sprache, text, optionen, benoetigt):
+    bloecke = kern.BlockZaehler(zaehler(sprache, optionen, set(benoetigt) - {"Wortfolge"}), alte_fassung(text))
+    bloecke.aktualisiere(text)
+    return bloecke.summe
+
+VARIANTEN = {
+    "Satzblöcke": satzbloecke,
+    "Scheiben": scheiben,
+    "Überarbeitung": ueberarbeitet,
+    "Editor": editor,
+}
+
+# ===========================
+# erzeugte Texte: feste Randfälle, dann zufällige Mischungen
+def erzeuge_faelle(sprache, anzahl, seed=None):
+    zufall = random.Random(seed)
+    buchstaben = sprache.K_VOKALE + sprache.G_VOKALE + sprache.K_KONSONANTEN + sprache.G_KONSONANTEN
+    abkuerzungen = getattr(sprache, "ABKUERZUNGEN", ())
+
+    def wort(alphabet):
+        return "".join(zufall.choice(alphabet) for _ in range(zufall.randint(1, 12)))
+
+    yield "leer", ""
+    yield "Leerraum", " \n\t \r\n "
+    yield "nur Satzzeichen", "...!?…||. . !"
+    yield "Zahlen", "3.5 und 12.03.2024. Am 3. Mai 1. 2. 3. Kapitel 10.5.ende"
+    yield "Abkürzungen", " ".join(f"{a}. {wort(buchstaben)} {a.upper()}." for a in abkuerzungen) + " Ende."
+    yield "gemischte Schriften", " ".join(wort(MISCHUNG + MISCHUNG.upper()) + zufall.choice(["", ".", ",", "!"])
+                                          for _ in range(300))
+    zeile, laenge = [], 0
+    while laenge < LANGE_ZEILE:
+        zeile.append(wort(buchstaben) + zufall.choice(["", "", "", ".", ",", "?"]))
+        laenge += len(zeile[-1])
+    yield "lange Zeile", " ".join(zeile)
+
+    for i in range(anzahl):
+        # jeder Fall gewichtet die Zeichenarten anders
+        arten = [buchstaben, MISCHUNG, SATZZEICHEN, SONSTIGE_ZEICHEN, LEERRAUM, ZIFFERN]
+        gewichte = [zufall.random() ** 2 for _ in arten]
+        laenge = int(zufall.expovariate(1 / 400))
+        text = "".join(zufall.choice(art) for art in zufall.choices(arten, gewichte, k=laenge))
+        yield f"zufall {i + 1}", text
+
+# ===========================
+# [(Schlüssel, erwartet, erhalten)] für alle abweichenden Werte
+def vergleiche(erwartet, erhalten):
+    abweichungen = []
+    for k in sorted(set(erwartet) | set(erhalten)):
+        a, b = erwartet.get(k), erhalten.get(k)
+        if isinstance(a, list) or isinstance(b, list):
+            gleich = a == b
+            a, b = (f"{len(x)} Wörter" if isinstance(x, list) else x for x in (a, b))
+        elif isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            gleich = a == b or math.isnan(a) and math.isnan(b)
+        else:
+            gleich = a == b
+        if not gleich:
+            abweichungen.append((k, a, b))
+    return abweichungen
+
+def berechne(funktion, *args):
+    try:
+        return funktion(*args)
+    except Exception as e:
+        return {"Fehler": repr(e)}
+
+# Optionen, mit denen eine Sprachversion geprüft wird
+def varianten_optionen(sprache):
+    if hasattr(sprache, "DIGRAPH_ERWEITERT"):
+        return [("", {}), (" (Digraphen)", {"digraphs": sprache.DIGRAPH_ERWEITERT})]
+    return [("", {})]
+
+# Zeilen {Sprache, Fall, Weg, Wert, Referenz, Ergebnis} für einen Text
+def pruefe_text(sprache, fall, text, optionen):
+    benoetigt = set(kern.ZAEHLUNGEN) | kern.benoetigte_zaehlungen(sprache.INDEX_LISTE)
+    referenz = berechne(ganz, sprache, text, optionen, benoetigt)
+    indizes = berechne(sprache.berechne_indizes, referenz) if "Fehler" not in referenz else referenz
+    # Fehler der Referenz selbst (z.B. Division durch 0 bei leerem Text)
+    paare = [("Referenz", {}, {"Fehler": indizes["Fehler"]} if "Fehler" in indizes else {})]
+    for name, weg in VARIANTEN.items():
+        erwartet = referenz
+        if name == "Editor":
+            erwartet = {k: v for k, v in referenz.items() if k != "Wortfolge"}
+        paare.append((name, erwartet, berechne(weg, sprache, text, optionen, benoetigt)))
+    paare.append(("berechne_statistik", indizes, berechne(lambda: sprache.berechne_statistik(text, **optionen))))
+    return [{"Sprache": sprache.KUERZEL, "Fall": fall, "Weg": name, "Wert": k, "Referenz": a, "Ergebnis": b}
+            for name, erwartet, ergebnis in paare for k, a, b in vergleiche(erwartet, ergebnis)]
+
+# Formeln mit bekanntem Ergebnis: (Fall, Index, Zählungen, erwarteter Wert)
+FORMELFAELLE = [
+    ("MTLD lauter verschiedene Wörter", "MTLD", {"Wortfolge": ["das", "ist", "gut", "ja"]}, 4.0),
+    ("MTLD ohne Wörter", "MTLD", {"Wortfolge": []}, 0.0),
+    ("TTR lauter verschiedene Wörter", "TTR", {"Wortfolge": ["das", "ist", "gut", "ja"]}, 1.0),
+]
+
+def pruefe_formeln():
+    zeilen = []
+    for fall, name, zaehlungen, erwartet in FORMELFAELLE:
+        ergebnis = berechne(kern.berechne_indizes, zaehlungen, [name])
+        zeilen.extend({"Sprache": "", "Fall": fall, "Weg": "Formel", "Wert": k, "Referenz": a, "Ergebnis": b}
+                      for k, a, b in vergleiche({name: erwartet}, ergebnis))
+    return zeilen, len(FORMELFAELLE)
+
+# ===========================
+# Stichprobenschätzung (cyiw_stichprobe) auf einem kleinen Korpus aus
+# erzeugten Texten: Fenster, die jede Datei lückenlos überdecken, ergeben
+# genau die Zählungen des ganzen Textes, und der exakte Wert jeder
+# Zählung und jedes Index liegt im Konfidenzintervall der Schätzung.
+# Korpus und Züge sind fest, damit das Ergebnis nicht vom Zufall abhängt.
+SCHAETZUNG_SEED = 1
+SCHAETZUNG_FAELLE = 300       # erzeugte Texte im Korpus
+SCHAETZUNG_DATEI = 24_000     # Zeichen pro Datei (kleinere Reste werden ganz gezählt)
+SCHAETZUNG_ZUEGE = 400
+SCHAETZUNG_KONFIDENZ = 0.999
+
+def schreibe_korpus(sprache, ordner):
+    dateien, teile, laenge = [], [], 0
+    faelle = [text for _, text in erzeuge_faelle(sprache, SCHAETZUNG_FAELLE, SCHAETZUNG_SEED)]
+    for i, text in enumerate(faelle):
+        teile.append(text)
+        laenge += len(text)
+        if laenge >= SCHAETZUNG_DATEI or i == len(faelle) - 1:
+            dateien.append(os.path.join(ordner, f"{len(dateien):03d}.txt"))
+            with open(dateien[-1], "wb") as f:
+                # Satzende hinter jedem Text, damit Dateigrenzen keine Sätze zusammenziehen
+                f.write(". ".join(teile).encode("utf-8"))
+            teile, laenge = [], 0
+    return dateien
+
+def pruefe_schaetzung(sprache, zusatz, optionen):
+    zaehle = zaehler(sprache, optionen, set(kern.ZAEHLUNGEN))
+    berechne = lambda z: sprache.berechne_indizes(z)
+    zeilen = []
+    with tempfile.TemporaryDirectory() as ordner:
+        dateien = schreibe_korpus(sprache, ordner)
+        probe = stichprobe.Stichprobe(dateien, zaehle, berechne)
+        exakt = kern.vereinige_zaehlungen([zaehle("")] + [zaehle(stichprobe.lies_text(d)) for d in dateien])
+        for datei in dateien:
+            fenster = [probe.lies_fenster(datei, anfang) for anfang in range(0, os.path.getsize(datei),
+                                                                              stichprobe.FENSTER)]
+            zeilen.extend(("Fenster " + os.path.basename(datei), k, a, b)
+                          for k, a, b in vergleiche(zaehle(stichprobe.lies_text(datei)),
+                                                    kern.vereinige_zaehlungen([zaehle("")] +
+                                                                              list(map(zaehle, fenster)))))
+        ergebnis, _ = stichprobe.schaetze(dateien, zaehle, berechne, genauigkeit=0,
+                                          stichproben=SCHAETZUNG_ZUEGE, konfidenz=SCHAETZUNG_KONFIDENZ,
+                                          seed=SCHAETZUNG_SEED)
+    # Indizes sind auf zwei Stellen gerundet
+    for k, wert in {**exakt, **berechne(exakt)}.items():
+        if k in ergebnis:
+            _, unten, oben = ergebnis[k]
+            if not unten - 0.005 <= wert <= oben + 0.005:
+                zeilen.append(("Schätzung", k, wert, f"[{unten:.2f}; {oben:.2f}]"))
+    return [{"Sprache": sprache.KUERZEL, "Fall": "Stichprobe" + zusatz, "Weg": weg, "Wert": k,
+             "Referenz": a, "Ergebnis": b} for weg, k, a, b in zeilen]
+
+# erzeugte Texte aller Sprachen prüfen
+def pruefe_erzeugte(sprachen, anzahl, seed=None):
+    zeilen, faelle = pruefe_formeln()
+    for kuerzel in sprachen:
+        sprache = kern.lade_sprache(kuerzel)
+        for zusatz, optionen in varianten_optionen(sprache):
+            for fall, text in erzeuge_faelle(sprache, anzahl, seed):
+                zeilen.extend(pruefe_text(sprache, fall + zusatz, text, optionen))
+                faelle += 1
+            zeilen.extend(pruefe_schaetzung(sprache, zusatz, optionen))
+            faelle += 1
+    return zeilen, faelle
+
+# ===========================
+# Goldkorpus: {Sprache: {Datei: {"Zählungen": …, "Indizes": …}}}. Dateien
+# werden über ihren Namen relativ zum angegebenen Ordner zugeordnet.
+def gold_ergebnisse(sprache, text, optionen):
+    zaehlungen = berechne(ganz, sprache, text, optionen, set(kern.ZAEHLUNGEN))
+    return {"Zählungen": zaehlungen, "Indizes": berechne(lambda: sprache.berechne_statistik(text, **optionen))}
+
+def gold_dateien(pfade):
+    for pfad in pfade:
+        basis = pfad if os.path.isdir(pfad) else os.path.dirname(pfad)
+        for datei in kern.sammle_dateien([pfad]):
+            yield os.path.relpath(datei, basis), datei
+
+def erstelle_gold(sprachen, pfade):
+    gold = {}
+    for kuerzel in sprachen:
+        sprache = kern.lade_sprache(kuerzel)
+        alphabet = sprache.K_VOKALE + sprache.K_KONSONANTEN
+        for name, datei in gold_dateien(pfade):
+            text = kern.lies_datei(datei, alphabet)
+            for zusatz, optionen in varianten_optionen(sprache):
+                gold.setdefault(kuerzel, {})[name + zusatz] = gold_ergebnisse(sprache, text, optionen)
+    return gold
+
+def speichere_gold(pfad, gold):
+    with open(pfad, "w", encoding="utf-8") as f:
+        json.dump(gold, f, ensure_ascii=False, indent=1, default=lambda x: x.item())
+
+# heutige Ergebnisse gegen die gespeicherten; neue oder fehlende Dateien
+# werden als Abweichung gemeldet
+def pruefe_gold(pfad, sprachen, pfade):
+    with open(pfad, encoding="utf-8") as f:
+        gespeichert = json.load(f)
+    heute = erstelle_gold(sprachen, pfade)
+    zeilen, faelle = [], 0
+    for kuerzel in sprachen:
+        alt, neu = gespeichert.get(kuerzel, {}), heute.get(kuerzel, {})
+        for fall in sorted(set(alt) | set(neu)):
+            faelle += 1
+            for art in ("Zählungen", "Indizes"):
+                erwartet = alt.get(fall, {}).get(art, {"Datei": "fehlt"})
+                erhalten = neu.get(fall, {}).get(art, {"Datei": "fehlt"})
+                zeilen.extend({"Sprache": kuerzel, "Fall": fall, "Weg": f"Gold ({art})", "Wert": k,
+                               "Referenz": a, "Ergebnis": b} for k, a, b in vergleiche(erwartet, erhalten))
+    return zeilen, faelle
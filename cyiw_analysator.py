@@ -0,0 +1,79 @@
+import collections
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import cyiw_kern as kern
+
+# ===========================
+# Auswertung zum Einbetten in andere Programme. Ein Analysator wird pro
+# Sprache einmal angelegt: Sprachversion (deren Wortmuster, Vokaltabellen
+# und Satzgrenzen beim Laden kompiliert werden), Indexliste, benötigte
+# Rohzählungen und Zähloptionen. Danach ändert er sich nicht mehr und kann
+# von beliebig vielen Threads gleichzeitig benutzt werden.
+#   analysator = Analysator("de")
+#   analysator.analysiere(text)
+#   for indizes in analysator.analysiere_viele(texte, prozesse=4): …
+# Viele Texte gehen stapelweise in den Prozesspool: pro Auftrag wird ein
+# Stapel übertragen und nur der Analysator selbst (Kürzel, Indizes,
+# Optionen) mitgeschickt, nicht die Sprachversion.
+STAPEL = 64   # Texte pro Auftrag
+STAPEL_PRO_PROZESS = 2   # so viele Stapel pro Prozess gleichzeitig unterwegs
+
+class Analysator:
+    # optionen: zusätzliche Argumente für zaehle_text (Polnisch: {"digraphs": …})
+    def __init__(self, kuerzel, indizes=None, optionen=None):
+        self.kuerzel = kuerzel.lower()
+        self.sprache = kern.lade_sprache(self.kuerzel)
+        self.indizes = tuple(self.sprache.INDEX_LISTE if indizes is None else indizes)
+        unbekannt = [name for name in self.indizes if name not in kern.INDIZES]
+        if unbekannt:
+            raise ValueError(f"Unbekannte Indizes: {', '.join(unbekannt)}")
+        self.benoetigt = frozenset(kern.benoetigte_zaehlungen(self.indizes))
+        self.optionen = dict(optionen or {})
+
+    # im Prozesspool wird der Analysator aus seinen Angaben neu gebaut
+    def __reduce__(self):
+        return Analysator, (self.kuerzel, self.indizes, self.optionen)
+
+    def zaehle(self, text):
+        return kern.zaehle_in_scheiben(text, self.sprache.zaehle_text, self.kuerzel,
+                                       benoetigt=self.benoetigt, **self.optionen)
+
+    def analysiere(self, text):
+        return kern.berechne_indizes(self.zaehle(text), self.indizes)
+
+    def analysiere_stapel(self, texte):
+        return [self.analysiere(text) for text in texte]
+
+    # Generator: Indizes in der Reihenfolge der Texte; texte darf selbst
+    # ein Generator sein, gelesen wird nur so weit wie nötig
+    def analysiere_viele(self, texte, prozesse=1, stapel=STAPEL):
+        texte = iter(texte)
+        stapelfolge = iter(lambda: list(itertools.islice(texte, stapel)), [])
+        if prozesse < 2:
+            for teil in stapelfolge:
+                yield from self.analysiere_stapel(teil)
+            return
+        unterwegs = collections.deque()
+        try:
+            with ProcessPoolExecutor(max_workers=prozesse) as pool:
+                for teil in stapelfolge:
+                    if len(unterwegs) >= prozesse * STAPEL_PRO_PROZESS:
+                        yield from hole(unterwegs)
+                    unterwegs.append((pool.submit(kern.mit_messwerten, self.analysiere_stapel, teil), len(teil)))
+                    kern.MESSWERTE.warteschlange += len(teil)
+                while unterwegs:
+                    yield from hole(unterwegs)
+        finally:
+            # vorzeitig beendet: nicht abgeholte Stapel aus der Warteschlange nehmen
+            kern.MESSWERTE.warteschlange -= sum(anzahl for _, anzahl in unterwegs)
+
+# ältesten Stapel abwarten
+def hole(unterwegs):
+    zukunft, anzahl = unterwegs.popleft()
+    try:
+        ergebnisse, messwerte = zukunft.result()
+    finally:
+        kern.MESSWERTE.warteschlange -= anzahl
+    kern.MESSWERTE.uebernehme(messwerte)
+    return ergebnisse
@@ -0,0 +1,118 @@
+import os
+import re
+
+import numpy as np
+
+import cyiw_kern as kern
+
+# ===========================
+# Eigene Formeln an ein Korpus mit bekannten Stufen (Klassenstufe,
+# Niveau …) anpassen. Jeder Prozess zählt ein Paket von Dateien, daraus
+# entsteht in einem Schritt die Merkmalsmatrix (ASL, ASW, MS, IW, ES …).
+# Angepasst wird mit kleinsten Quadraten, wahlweise mit Ridge-Strafe;
+# Güte und Strafstärke bestimmt eine k-fache Kreuzvalidierung.
+MERKMALE = ("ASL", "ASW", "MS", "IW", "ES")
+FALTEN = 5
+STRAFEN = np.logspace(-3, 3, 13)   # Kandidaten für die Ridge-Strafe
+
+def zaehle_dateien(aufgabe):
+    kuerzel, dateien = aufgabe
+    sprache = kern.lade_sprache(kuerzel)
+    alphabet = sprache.K_VOKALE + sprache.K_KONSONANTEN
+    return [(datei, kern.zaehle_in_scheiben(kern.lies_datei(datei, alphabet), sprache.zaehle_text, kuerzel,
+                                            benoetigt=set(kern.ZAEHLUNGEN)))
+            for datei in dateien]
+
+# Stufe aus dem Ordnernamen ("klasse_5/text.txt" -> 5), wenn keine
+# Etikettendatei angegeben ist
+def stufe_aus_ordner(datei):
+    treffer = re.search(r"\d+(?:[.,]\d+)?", os.path.basename(os.path.dirname(os.path.abspath(datei))))
+    return float(treffer.group().replace(",", ".")) if treffer else None
+
+# Etikettendatei: Datei<TAB>Stufe pro Zeile (Pfade relativ zur Etikettendatei)
+def lies_etiketten(pfad):
+    etiketten = {}
+    ordner = os.path.dirname(os.path.abspath(pfad))
+    with open(pfad, encoding="utf-8") as f:
+        for zeile in f:
+            teile = zeile.rstrip("\n").split("\t")
+            if len(teile) < 2:
+                continue
+            try:
+                wert = float(teile[1].replace(",", "."))
+            except ValueError:
+                continue   # Kopfzeile
+            etiketten[os.path.normpath(os.path.join(ordner, teile[0]))] = wert
+    return etiketten
+
+# Merkmalsmatrix (Texte × Merkmale) aus den Rohzählungen aller Texte
+def merkmalsmatrix(zaehlungen, merkmale=MERKMALE):
+    z = {k: np.array([t[k] for t in zaehlungen], dtype=float) for k in kern.ZAEHLUNGEN}
+    return np.column_stack([kern.FORMEL_MERKMALE[m][1](z) for m in merkmale]).reshape(len(zaehlungen), len(merkmale))
+
+# ===========================
+# Kleinste Quadrate auf standardisierten Merkmalen; die Konstante wird
+# nicht bestraft. Liefert (Konstante, Gewichte) für die Originalskala.
+def passe_an(x, y, strafe=0.0):
+    mittel, streuung = x.mean(0), x.std(0)
+    streuung = np.where(streuung > 0, streuung, 1.0)
+    xs = (x - mittel) / streuung
+    yc = y - y.mean()
+    if strafe:
+        gewichte = np.linalg.solve(xs.T @ xs + strafe * np.eye(x.shape[1]), xs.T @ yc)
+    else:
+        gewichte = np.linalg.lstsq(xs, yc, rcond=None)[0]
+    gewichte = gewichte / streuung
+    return y.mean() - mittel @ gewichte, gewichte
+
+# mittlerer quadratischer Fehler (Wurzel) der k-fachen Kreuzvalidierung
+def kreuzvalidierung(x, y, strafe=0.0, falten=FALTEN, seed=0):
+    falte = np.random.default_rng(seed).permutation(len(y)) % falten
+    fehler = np.empty(len(y))
+    for f in range(falten):
+        test = falte == f
+        konstante, gewichte = passe_an(x[~test], y[~test], strafe)
+        fehler[test] = konstante + x[test] @ gewichte - y[test]
+    return float(np.sqrt(np.mean(fehler ** 2)))
+
+def bestimmtheit(x, y, konstante, gewichte):
+    rest = y - konstante - x @ gewichte
+    gesamt = ((y - y.mean()) ** 2).sum()
+    return float(1 - (rest ** 2).sum() / gesamt) if gesamt else 0.0
+
+# ===========================
+# ridge: None = nur kleinste Quadrate, "kv" = Strafe per Kreuzvalidierung
+# wählen, sonst die angegebene Strafe
+def passe_formel_an(kuerzel, dateien, etiketten=None, merkmale=MERKMALE, ridge=None, prozesse=None,
+                    falten=FALTEN):
+    zaehlungen, stufen = [], []
+    for paket in kern.berechne_pakete(zaehle_dateien, kuerzel, dateien, prozesse):
+        for datei, z in paket:
+            stufe = etiketten.get(os.path.normpath(os.path.abspath(datei))) if etiketten else stufe_aus_ordner(datei)
+            # leere Texte und Texte ohne Stufe tragen nichts bei
+            if stufe is not None and z["Wörter"] and z["Sätze"]:
+                zaehlungen.append(z)
+                stufen.append(stufe)
+    falten = min(falten, len(stufen))
+    if len(stufen) < len(merkmale) + 2 or falten < 2:
+        raise ValueError("Zu wenige auswertbare Texte mit Stufe für eine Anpassung")
+    x, y = merkmalsmatrix(zaehlungen, merkmale), np.array(stufen)
+
+    strafe = 0.0
+    kv_fehler = {0.0: kreuzvalidierung(x, y, 0.0, falten)}
+    if ridge == "kv":
+        kv_fehler.update((float(s), kreuzvalidierung(x, y, s, falten)) for s in STRAFEN)
+        strafe = min(kv_fehler, key=kv_fehler.get)
+    elif ridge is not None:
+        strafe = float(ridge)
+        kv_fehler[strafe] = kreuzvalidierung(x, y, strafe, falten)
+    konstante, gewichte = passe_an(x, y, strafe)
+    return {
+        "Texte": len(y),
+        "Konstante": float(konstante),
+        "Gewichte": dict(zip(merkmale, gewichte.tolist())),
+        "Strafe": strafe,
+        "KV-Fehler": kv_fehler[strafe],
+        "KV-Fehler KQ": kv_fehler[0.0],
+        "R2": bestimmtheit(x, y, konstante, gewichte)
+    }
@@ -0,0 +1,206 @@
+import re
+import time
+import tkinter as tk
+from tkinter import filedialog, scrolledtext, simpledialog
+
+import cyiw_kern as kern
+from cyiw_kern import BlockZaehler
+
+# ===========================
+# Gemeinsame Fenster für alle Sprachversionen
+WORTMUSTER = re.compile(r"\b\w+(?:['’]\w+)?\b")
+
+# ===========================
+# Gruppenregel für "Gruppen bilden" erfragen: (Regel, Beschreibung) oder
+# None bei Abbruch; ungültige Muster und Metadaten lösen ValueError,
+# re.error oder OSError aus
+def frage_gruppenregel(root):
+    art = simpledialog.askstring("Gruppen", "Gruppieren nach: ordner, muster oder metadaten",
+                                 initialvalue="ordner", parent=root)
+    art = (art or "").strip().lower()
+    if art == "ordner":
+        return kern.gruppe_nach_ordner, "Ordner"
+    if art == "muster":
+        muster = simpledialog.askstring("Gruppen", "Regulärer Ausdruck über den Dateinamen (erste Klammer = Gruppe):",
+                                        parent=root)
+        return (kern.gruppe_nach_muster(muster), f"Muster {muster}") if muster else None
+    if art == "metadaten":
+        pfad = filedialog.askopenfilename(filetypes=[("CSV", "*.csv"), ("Alle Dateien", "*.*")])
+        if not pfad:
+            return None
+        spalten, metadaten = kern.lies_metadaten(pfad)
+        if not spalten:
+            raise ValueError(f"'{pfad}' hat keine Spalten außer dem Dateinamen")
+        spalte = simpledialog.askstring("Gruppen", "Spalte: " + ", ".join(spalten), initialvalue=spalten[0],
+                                        parent=root)
+        if not spalte:
+            return None
+        if spalte not in spalten:
+            raise ValueError(f"Spalte '{spalte}' fehlt")
+        return kern.gruppe_nach_metadaten(metadaten, spalte), spalte
+    if art:
+        raise ValueError(f"Unbekannte Gruppierung '{art}'")
+    return None
+
+# ===========================
+# Markierung schwieriger Stellen (nur sichtbarer Bereich)
+class MarkierungsFenster:
+    # Zeilen, die über den sichtbaren Bereich hinaus mitmarkiert werden
+    VORLAUF = 20
+    # maximale Suche nach Satzanfang/-ende in Zeilen
+    SATZ_SUCHE = 200
+
+    # satzgrenzen: Satzenden der Sprachversion (Abkürzungen, Zahlen, Daten)
+    def __init__(self, root, kapitel, text, asl, silben, satzgrenzen=kern.SATZGRENZEN):
+        self.asl = asl
+        self.silben = silben
+        self.satzgrenzen = satzgrenzen
+        self.markiert = set()
+        self.geplant = None
+
+        self.fenster = tk.Toplevel(root)
+        self.fenster.title(f"Markierung ⋅ {kapitel}")
+
+        legende = tk.Frame(self.fenster)
+        legende.pack(fill="x", padx=10, pady=(8, 0))
+        tk.Label(legende, text=f"Satz > ASL ({asl})", background="#fff3b0").pack(side="left", padx=4)
+        tk.Label(legende, text="Satz > 2 × ASL", background="#ffc98b").pack(side="left", padx=4)
+        tk.Label(legende, text="Lix: > 6 Buchstaben", font=("Arial", 10, "underline")).pack(side="left", padx=4)
+        tk.Label(legende, text="Gunning-Fog: ≥ 3 Silben", foreground="#b00020").pack(side="left", padx=4)
+
+        self.textfeld = scrolledtext.ScrolledText(self.fenster, width=100, height=35, wrap="word")
+        self.textfeld.pack(padx=10, pady=10, fill="both", expand=True)
+        self.textfeld.tag_configure("satz_lang", background="#fff3b0")
+        self.textfeld.tag_configure("satz_sehr_lang", background="#ffc98b")
+        self.textfeld.tag_configure("wort_lang", underline=True)
+        self.textfeld.tag_configure("wort_mehrsilbig", foreground="#b00020")
+        self.textfeld.tag_raise("satz_sehr_lang", "satz_lang")
+
+        self.textfeld.insert("1.0", text)
+        self.textfeld.configure(state="disabled")
+
+        # Scrollbar weiterhin bedienen, aber bei jeder Bewegung nachmarkieren
+        self.textfeld.configure(yscrollcommand=self.gescrollt)
+        self.textfeld.bind("<Configure>", lambda event: self.plane())
+
+    def gescrollt(self, erstes, letztes):
+        self.textfeld.vbar.set(erstes, letztes)
+        self.plane()
+
+    def plane(self):
+        # mehrere Scroll-Ereignisse zu einem Durchlauf zusammenfassen
+        if self.geplant is None:
+            self.geplant = self.textfeld.after_idle(self.markiere_sichtbar)
+
+    def markiere_sichtbar(self):
+        self.geplant = None
+        oben = int(self.textfeld.index("@0,0").split(".")[0])
+        unten = int(self.textfeld.index(f"@0,{self.textfeld.winfo_height()}").split(".")[0])
+        letzte = int(self.textfeld.index("end-1c").split(".")[0])
+        offen = [z for z in range(max(1, oben - self.VORLAUF), min(letzte, unten + self.VORLAUF) + 1)
+                 if z not in self.markiert]
+        if not offen:
+            return
+        von, bis = offen[0], offen[-1]
+        self.markiere_woerter(von, bis)
+        self.markiere_saetze(von, bis)
+        self.markiert.update(range(von, bis + 1))
+
+    def markiere_woerter(self, von, bis):
+        abschnitt = self.textfeld.get(f"{von}.0", f"{bis}.end")
+        for m in WORTMUSTER.finditer(abschnitt):
+            wort = m.group()
+            tags = []
+            if len(wort) > 6:
+                tags.append("wort_lang")
+            if self.silben(wort) >= 3:
+                tags.append("wort_mehrsilbig")
+            if tags:
+                start = f"{von}.0 + {m.start()} chars"
+                ende = f"{von}.0 + {m.end()} chars"
+                for tag in tags:
+                    self.textfeld.tag_add(tag, start, ende)
+
+    def markiere_saetze(self, von, bis):
+        # Abschnitt bis zum vorigen und nächsten Satzende erweitern
+        start = f"{max(1, von - self.SATZ_SUCHE)}.0"
+        umfeld = self.textfeld.get(start, f"{bis + self.SATZ_SUCHE}.end")
+        oben = len(self.textfeld.get(start, f"{von}.0"))
+        unten = len(self.textfeld.get(start, f"{bis}.end"))
+        enden = list(self.satzgrenzen.enden(umfeld))
+        anfang = max([b for a, b in enden if b <= oben], default=0)
+        schluss = min([b for a, b in enden if b > unten], default=len(umfeld))
+
+        pos = anfang
+        for satz_ende, naechster in [(a, b) for a, b in enden if anfang < b <= schluss] + [(schluss, schluss)]:
+            satz = umfeld[pos:satz_ende]
+            woerter = len(WORTMUSTER.findall(satz))
+            if woerter > self.asl:
+                links = len(satz) - len(satz.lstrip())
+                rechts = len(satz.rstrip())
+                tag = "satz_sehr_lang" if woerter > 2 * self.asl else "satz_lang"
+                self.textfeld.tag_add(tag, f"{start} + {pos + links} chars",
+                                      f"{start} + {pos + rechts} chars")
+            pos = naechster
+
+# ===========================
+# Editor mit laufender Neuberechnung beim Tippen
+class EditorFenster:
+    # Wartezeit nach dem letzten Tastendruck (ms)
+    VERZOEGERUNG = 150
+
+    def __init__(self, root, kapitel, text, zaehle, berechne, uebernehmen=None):
+        self.kapitel = kapitel
+        self.berechne = berechne
+        self.uebernehmen = uebernehmen
+        self.geplant = None
+        self.zaehler = BlockZaehler(zaehle, text)
+
+        self.fenster = tk.Toplevel(root)
+        self.fenster.title(f"Editor ⋅ {kapitel}")
+
+        leiste = tk.Frame(self.fenster)
+        leiste.pack(fill="x", padx=10, pady=(8, 0))
+        self.status = tk.Label(leiste, text="", anchor="w")
+        self.status.pack(side="left", fill="x", expand=True)
+        if uebernehmen:
+            tk.Button(leiste, text="Übernehmen", command=self.uebernimm).pack(side="right")
+
+        bereich = tk.PanedWindow(self.fenster, orient="horizontal")
+        bereich.pack(padx=10, pady=10, fill="both", expand=True)
+        self.editor = scrolledtext.ScrolledText(bereich, width=80, height=35, wrap="word", undo=True)
+        self.anzeige = tk.Text(bereich, width=28, height=35, state="disabled")
+        bereich.add(self.editor, stretch="always")
+        bereich.add(self.anzeige)
+
+        self.editor.insert("1.0", text)
+        self.editor.edit_modified(False)
+        self.editor.bind("<<Modified>>", self.geaendert)
+        self.zeige()
+
+    def geaendert(self, event=None):
+        if not self.editor.edit_modified():
+            return
+        self.editor.edit_modified(False)
+        if self.geplant is not None:
+            self.editor.after_cancel(self.geplant)
+        self.geplant = self.editor.after(self.VERZOEGERUNG, self.neu_berechnen)
+
+    def neu_berechnen(self):
+        self.geplant = None
+        start = time.perf_counter()
+        neu = self.zaehler.aktualisiere(self.editor.get("1.0", "end-1c"))
+        self.zeige()
+        dauer = (time.perf_counter() - start) * 1000
+        self.status.config(text=f"{neu} Satzblöcke neu gezählt ⋅ {dauer:.0f} ms")
+
+    def zeige(self):
+        ergebnisse = self.berechne(self.zaehler.summe)
+        self.anzeige.config(state="normal")
+        self.anzeige.delete("1.0", tk.END)
+        for k, v in ergebnisse.items():
+            self.anzeige.insert(tk.END, f"{k}: {v}\n")
+        self.anzeige.config(state="disabled")
+
+    def uebernimm(self):
+        self.uebernehmen(self.kapitel, self.editor.get("1.0", "end-1c"))
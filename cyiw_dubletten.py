@@ -0,0 +1,109 @@
+import hashlib
+import json
+import re
+import sqlite3
+import zlib
+
+import numpy as np
+
+import cyiw_kern as kern
+
+# ===========================
+# Dubletten in großen Korpora. Exakte Kopien erkennt die Prüfsumme des
+# Textes, ähnliche Texte (Nachdrucke, Spiegel) eine MinHash-Signatur über
+# Schindeln aus SCHINDEL Wörtern. Für LSH wird die Signatur in BAENDER
+# Bänder geteilt; nur Texte mit mindestens einem gleichen Band werden
+# verglichen. Index und zwischengespeicherte Zählungen liegen in SQLite,
+# als Datei hängt der Speicherbedarf nicht von der Korpusgröße ab.
+SCHINDEL = 5
+BAENDER = 16
+ZEILEN = 8            # Signaturwerte pro Band
+SCHWELLE = 0.8        # geschätzte Jaccard-Ähnlichkeit, ab der ein Text als Dublette gilt
+PRIMZAHL = 4294967291   # größte Primzahl unter 2**32, a*x+b bleibt so in uint64 exakt
+WORT = re.compile(r"\w+")
+BLOCK = 4096          # Schindeln pro Rechenschritt der Signatur
+
+# feste Hash-Funktionen (a*x + b) mod PRIMZAHL, damit gespeicherte
+# Signaturen über Läufe hinweg vergleichbar bleiben
+FAKTOREN, SUMMANDEN = np.random.default_rng(20250601).integers(1, PRIMZAHL, (2, BAENDER * ZEILEN), dtype=np.uint64)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS texte (dok TEXT PRIMARY KEY, pruefsumme TEXT, signatur BLOB,
+                                  art TEXT, original TEXT, aehnlichkeit REAL);
+CREATE INDEX IF NOT EXISTS texte_pruefsumme ON texte (pruefsumme);
+CREATE TABLE IF NOT EXISTS baender (schluessel INTEGER, dok TEXT);
+CREATE INDEX IF NOT EXISTS baender_schluessel ON baender (schluessel);
+CREATE INDEX IF NOT EXISTS baender_dok ON baender (dok);
+CREATE TABLE IF NOT EXISTS zaehlungen (pruefsumme TEXT PRIMARY KEY, daten TEXT);
+"""
+
+# None für Texte ohne Wörter
+def signatur(text):
+    woerter = WORT.findall(text.lower())
+    if not woerter:
+        return None
+    schindeln = {" ".join(woerter[i:i + SCHINDEL]) for i in range(max(len(woerter) - SCHINDEL + 1, 1))}
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in schindeln), dtype=np.uint64, count=len(schindeln))
+    # blockweise, damit die Zwischenmatrix (Hashfunktionen × Schindeln) klein bleibt
+    sig = np.full(len(FAKTOREN), PRIMZAHL, dtype=np.uint64)
+    for i in range(0, len(x), BLOCK):
+        np.minimum(sig, ((np.outer(FAKTOREN, x[i:i + BLOCK]) + SUMMANDEN[:, None]) % PRIMZAHL).min(axis=1), out=sig)
+    return sig.astype(np.uint32)
+
+def bandschluessel(sig):
+    return [int.from_bytes(hashlib.blake2b(bytes([b]) + sig[b * ZEILEN:(b + 1) * ZEILEN].tobytes(),
+                                           digest_size=8).digest(), "big", signed=True)
+            for b in range(BAENDER)]
+
+class Dublettenindex:
+    def __init__(self, pfad=":memory:", schwelle=SCHWELLE):
+        self.db = sqlite3.connect(pfad)
+        self.db.executescript(SCHEMA)
+        self.schwelle = schwelle
+
+    # (Art, Original, Ähnlichkeit) mit Art "neu", "gleich" oder "ähnlich";
+    # neue und ähnliche Texte werden mit ihrem Befund in den Index
+    # aufgenommen, ein späterer Lauf liefert für sie denselben Befund
+    def pruefe(self, dok, text, summe=None):
+        summe = summe or kern.pruefsumme(text)
+        bisher = self.db.execute("SELECT pruefsumme, art, original, aehnlichkeit FROM texte WHERE dok = ?",
+                                 (dok,)).fetchone()
+        if bisher and bisher[0] == summe:
+            return bisher[1:]
+        if bisher:
+            # Datei hat sich seit dem letzten Lauf geändert
+            self.db.execute("DELETE FROM texte WHERE dok = ?", (dok,))
+            self.db.execute("DELETE FROM baender WHERE dok = ?", (dok,))
+        gleich = self.db.execute("SELECT dok FROM texte WHERE pruefsumme = ?", (summe,)).fetchone()
+        if gleich:
+            return "gleich", gleich[0], 1.0
+
+        sig = signatur(text)
+        schluessel = bandschluessel(sig) if sig is not None else []
+        original, aehnlichkeit = None, 0.0
+        if schluessel:
+            platzhalter = ",".join("?" * len(schluessel))
+            for kandidat, blob in self.db.execute(
+                    f"SELECT dok, signatur FROM texte WHERE dok IN "
+                    f"(SELECT dok FROM baender WHERE schluessel IN ({platzhalter}))", schluessel):
+                wert = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == sig))
+                if wert > aehnlichkeit:
+                    original, aehnlichkeit = kandidat, wert
+        befund = ("ähnlich", original, round(aehnlichkeit, 3)) if aehnlichkeit >= self.schwelle else ("neu", None, 0.0)
+        self.db.execute("INSERT INTO texte VALUES (?, ?, ?, ?, ?, ?)",
+                        (dok, summe, sig.tobytes() if sig is not None else None, *befund))
+        self.db.executemany("INSERT INTO baender VALUES (?, ?)", [(s, dok) for s in schluessel])
+        return befund
+
+    # Zählungen bereits ausgewerteter Texte (über die Prüfsumme)
+    def zaehlungen(self, summe):
+        zeile = self.db.execute("SELECT daten FROM zaehlungen WHERE pruefsumme = ?", (summe,)).fetchone()
+        return json.loads(zeile[0]) if zeile else None
+
+    def merke_zaehlungen(self, summe, daten):
+        self.db.execute("INSERT OR REPLACE INTO zaehlungen VALUES (?, ?)",
+                        (summe, json.dumps(daten, ensure_ascii=False, default=lambda x: x.item())))
+
+    def schliesse(self):
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,38 @@
+import cyiw_kern as kern
+
+# ===========================
+# Flesch-Kalibrierung an einem Referenzkorpus: Flesch pro Text wird im
+# Durchlauf gemittelt (kern.Momente), jeder Prozess bearbeitet ein Paket
+# von Dateien und liefert nur seine Momente zurück. Im Speicher liegt so
+# immer nur der gerade gelesene Text.
+
+def flesch_momente(aufgabe):
+    kuerzel, dateien = aufgabe
+    sprache = kern.lade_sprache(kuerzel)
+    alphabet = sprache.K_VOKALE + sprache.K_KONSONANTEN
+    benoetigt = kern.benoetigte_zaehlungen(["Flesch"])
+    momente = kern.Momente()
+    for datei in dateien:
+        z = kern.zaehle_in_scheiben(kern.lies_datei(datei, alphabet), sprache.zaehle_text, kuerzel, benoetigt=benoetigt)
+        # leere Texte (Flesch = 0) würden das Mittel verfälschen
+        if z["Wörter"] and z["Sätze"]:
+            momente.hinzu(float(kern.flesch(z)))
+    return momente
+
+def kalibriere(kuerzel, dateien, prozesse=None, mu_ref=kern.MU_REF, sigma_ref=kern.SIGMA_REF):
+    momente = kern.Momente()
+    for m in kern.berechne_pakete(flesch_momente, kuerzel, dateien, prozesse):
+        momente.vereinige(m)
+    if momente.n < 2 or momente.streuung() == 0:
+        raise ValueError("Zu wenige auswertbare Texte für eine Kalibrierung")
+    c_neu, k_asl, k_asw = kern.flesch_konstanten(momente.mittel, momente.streuung(), mu_ref, sigma_ref)
+    return {
+        "Texte": momente.n,
+        "MU": momente.mittel,
+        "SIGMA": momente.streuung(),
+        "MU_REF": mu_ref,
+        "SIGMA_REF": sigma_ref,
+        "C_NEU": c_neu,
+        "K_ASL": k_asl,
+        "K_ASW": k_asw
+    }
@@ -0,0 +1,1062 @@
+import bisect
+import codecs
+import collections
+import csv
+import difflib
+import functools
+import glob
+import hashlib
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# ===========================
+# Gemeinsamer Rechenkern für alle Sprachversionen
+ORDNER = os.path.dirname(os.path.abspath(__file__))
+
+# Sprachversion (CYIW_<KÜRZEL>_<Version>.py) als Modul laden, z.B. "ru".
+# Threads laden nacheinander; in sys.modules steht ein Modul erst, wenn es
+# vollständig ausgeführt ist, ein fehlgeschlagenes gar nicht
+SPRACH_SPERRE = threading.RLock()
+
+def lade_sprache(kuerzel):
+    name = f"cyiw_{kuerzel.lower()}"
+    with SPRACH_SPERRE:
+        if name in sys.modules:
+            return sys.modules[name]
+        pfade = sorted(glob.glob(os.path.join(ORDNER, f"CYIW_{kuerzel.upper()}_*.py")))
+        if not pfade:
+            raise ValueError(f"Keine Sprachversion für '{kuerzel}' gefunden")
+        spec = importlib.util.spec_from_file_location(name, pfade[-1])
+        modul = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modul)
+        sys.modules[name] = modul
+        return modul
+
+# Dateien und Ordner (rekursiv, nur .txt) zu einer Dateiliste auflösen
+def sammle_dateien(pfade):
+    dateien = []
+    for pfad in pfade:
+        if os.path.isdir(pfad):
+            dateien.extend(sorted(glob.glob(os.path.join(pfad, "**", "*.txt"), recursive=True)))
+        else:
+            dateien.append(pfad)
+    return dateien
+
+# ===========================
+# Kodierung einer Textdatei erkennen. Gültiges UTF-8 hat Vorrang, sonst
+# gewinnt die Altkodierung, in der die meisten Zeichen der Probe zum
+# Kleinbuchstaben-Alphabet der Sprache gehören (Fließtext ist überwiegend
+# klein geschrieben, daran unterscheiden sich cp1251 und KOI8-R).
+PROBE = 4096   # Bytes vom Dateianfang
+KODIERUNGEN = ("cp1251", "koi8_r", "cp1252", "cp1250", "iso8859_2")
+
+def erkenne_kodierung(roh, alphabet):
+    if roh.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # ein am Probenende abgeschnittenes Zeichen ist kein Fehler
+        codecs.getincrementaldecoder("utf-8")().decode(roh, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    beste, treffer = "utf-8", -1
+    for kodierung in KODIERUNGEN:
+        n = zaehle_treffer(roh.decode(kodierung, errors="ignore"), alphabet)
+        if n > treffer:
+            beste, treffer = kodierung, n
+    return beste
+
+# Anzahl der Zeichen, die (klein geschrieben) im Alphabet vorkommen
+def zaehle_treffer(text, alphabet):
+    buchstaben = set(alphabet.lower())
+    return sum(1 for c in text if c in buchstaben)
+
+def erkenne_datei(pfad, alphabet):
+    with open(pfad, "rb") as f:
+        return erkenne_kodierung(f.read(PROBE), alphabet)
+
+# Datei mit erkannter Kodierung zum Lesen öffnen (wird beim Lesen
+# stückweise dekodiert)
+def oeffne_text(pfad, alphabet):
+    return open(pfad, "r", encoding=erkenne_datei(pfad, alphabet), errors="replace")
+
+def lies_datei(pfad, alphabet):
+    with oeffne_text(pfad, alphabet) as f:
+        return f.read()
+
+# ===========================
+# Mehrere Texte auswerten, bei großen Mengen in einem Prozesspool.
+# Die Reihenfolge der Ergebnisse entspricht der der Texte.
+PARALLEL_AB = 2_000_000   # Zeichen insgesamt
+# tatsächlich nutzbare Kerne (cpu_count zählt in Containern alle des Rechners)
+PROZESSE = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+def berechne_parallel(funktion, texte, prozesse=None, laenge=len):
+    prozesse = min(prozesse or PROZESSE, len(texte))
+    if prozesse < 2 or sum(laenge(t) for t in texte) < PARALLEL_AB:
+        return abarbeiten(funktion, texte, [1] * len(texte))
+    with ProcessPoolExecutor(max_workers=prozesse) as pool:
+        return abarbeiten(funktion, texte, [1] * len(texte), pool)
+
+# Dateien eines Korpus paketweise auswerten: funktion((kuerzel, dateien))
+# liefert ein Teilergebnis pro Paket, nur diese gehen zwischen den
+# Prozessen hin und her
+PAKETE_PRO_PROZESS = 4
+
+def berechne_pakete(funktion, kuerzel, dateien, prozesse=None):
+    prozesse = min(prozesse or PROZESSE, max(len(dateien), 1))
+    anzahl = prozesse * PAKETE_PRO_PROZESS if prozesse > 1 else 1
+    pakete = [(kuerzel, dateien[i::anzahl]) for i in range(anzahl) if dateien[i::anzahl]]
+    umfang = [len(p[1]) for p in pakete]
+    if prozesse < 2:
+        return abarbeiten(funktion, pakete, umfang)
+    with ProcessPoolExecutor(max_workers=prozesse) as pool:
+        return abarbeiten(funktion, pakete, umfang, pool)
+
+# Aufgaben der Reihe nach oder im Pool erledigen und dabei die
+# Warteschlange der Messwerte führen; umfang = Dokumente pro Aufgabe
+def abarbeiten(funktion, aufgaben, umfang, pool=None):
+    if pool is None:
+        laeufe = ((funktion(a), None) for a in aufgaben)
+    else:
+        laeufe = pool.map(functools.partial(mit_messwerten, funktion), aufgaben)
+    ergebnisse = []
+    offen = sum(umfang)
+    MESSWERTE.warteschlange += offen
+    try:
+        for (ergebnis, messwerte), n in zip(laeufe, umfang):
+            if messwerte:
+                MESSWERTE.uebernehme(messwerte)
+            MESSWERTE.warteschlange -= n
+            offen -= n
+            ergebnisse.append(ergebnis)
+    finally:
+        MESSWERTE.warteschlange -= offen
+    return ergebnisse
+
+# läuft im Pool: die Messwerte des Prozesses gehen mit dem Ergebnis zurück
+def mit_messwerten(funktion, aufgabe):
+    ergebnis = funktion(aufgabe)
+    return ergebnis, MESSWERTE.abgeben()
+
+# ===========================
+# Einen einzelnen sehr großen Text parallel zählen: der Text liegt einmal
+# als UTF-8 in einem SharedMemory-Block, geschnitten wird nur hinter einem
+# Satzende (SATZGRENZEN, also an Satzblockgrenzen). Jeder
+# Prozess dekodiert und zählt seine Scheibe; da sich die Rohzählungen über
+# Satzblöcke aufsummieren, ist das Ergebnis dasselbe wie in einem Stück.
+SCHEIBEN_AB = 8_000_000   # Zeichen
+SCHEIBEN_PRO_PROZESS = 2
+SATZENDEN_BYTES = re.compile("(?:[.!?|]|…)+".encode("utf-8"))
+
+def scheibengrenzen(roh, anzahl):
+    grenzen = [0]
+    for i in range(1, anzahl):
+        m = SATZENDEN_BYTES.search(roh, max(len(roh) * i // anzahl, grenzen[-1]))
+        while m and not ist_satzende_roh(roh, m.start(), m.end()):
+            m = SATZENDEN_BYTES.search(roh, m.end())
+        if not m:
+            break
+        grenzen.append(m.end())
+    grenzen.append(len(roh))
+    return [(von, bis) for von, bis in zip(grenzen, grenzen[1:]) if von < bis]
+
+# Satzgrenzen im Umfeld der Zeichenfolge roh[von:bis] entscheiden (UMFELD
+# Bytes davor und dahinter)
+UMFELD = 128
+
+def ist_satzende_roh(roh, von, bis, kodierung="utf-8"):
+    davor = roh[max(von - UMFELD, 0):von].decode(kodierung, "ignore")
+    lauf = roh[von:bis].decode(kodierung)
+    text = davor + lauf + roh[bis:bis + UMFELD].decode(kodierung, "ignore")
+    anfang = len(davor.rstrip(SATZENDE_ZEICHEN))
+    return SATZGRENZEN.ist_ende(text, anfang, len(davor) + len(lauf))
+
+def zaehle_scheibe(auftrag):
+    name, kuerzel, von, bis, optionen = auftrag
+    speicher = shared_memory.SharedMemory(name=name)
+    try:
+        text = bytes(speicher.buf[von:bis]).decode("utf-8")
+    finally:
+        speicher.close()
+    return lade_sprache(kuerzel).zaehle_text(text, **optionen)
+
+# Zählungen der Scheiben in Textreihenfolge zusammenführen (Wortfolgen
+# werden aneinandergehängt, alles andere addiert)
+def vereinige_zaehlungen(teile):
+    summe = {}
+    for zaehlungen in teile:
+        for k, v in zaehlungen.items():
+            if isinstance(v, list):
+                summe.setdefault(k, []).extend(v)
+            else:
+                summe[k] = summe.get(k, 0) + v
+    return summe
+
+# kleine Texte (und Aufrufe, die selbst schon in einem Pool laufen) zählt
+# "zaehle" direkt; jeder Aufruf geht in die Messwerte ein
+def zaehle_in_scheiben(text, zaehle, kuerzel, prozesse=None, **optionen):
+    beginn = time.perf_counter()
+    prozesse = prozesse or PROZESSE
+    if len(text) < SCHEIBEN_AB or prozesse < 2 or multiprocessing.parent_process() is not None:
+        zaehlungen = zaehle(text, **optionen)
+    else:
+        zaehlungen = vereinige_zaehlungen(zaehle_scheiben(text, kuerzel, prozesse, optionen))
+    MESSWERTE.erfasse(kuerzel, len(text), zaehlungen.get("Wörter", 0), time.perf_counter() - beginn)
+    return zaehlungen
+
+def zaehle_scheiben(text, kuerzel, prozesse, optionen):
+    roh = text.encode("utf-8")
+    scheiben = scheibengrenzen(roh, prozesse * SCHEIBEN_PRO_PROZESS)
+    speicher = shared_memory.SharedMemory(create=True, size=len(roh))
+    try:
+        speicher.buf[:len(roh)] = roh
+        del roh
+        auftraege = [(speicher.name, kuerzel, von, bis, optionen) for von, bis in scheiben]
+        with ProcessPoolExecutor(max_workers=min(prozesse, len(auftraege))) as pool:
+            return list(pool.map(zaehle_scheibe, auftraege))
+    finally:
+        speicher.close()
+        speicher.unlink()
+
+# ===========================
+# Durchsatz und Latenz: jede Zählung eines ganzen Textes wird pro Sprache
+# mit Zeichen, Wörtern und Dauer erfasst (Dauer als Histogramm mit festen
+# Grenzen in Sekunden). Prozesse im Pool geben ihre Messwerte mit dem
+# Ergebnis zurück. Ausgabe als JSON oder im Prometheus-Textformat.
+LATENZ_GRENZEN = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class Messwerte:
+    def __init__(self):
+        self.sperre = threading.Lock()
+        self.beginn = time.time()
+        self.warteschlange = 0
+        self.sprachen = {}
+
+    def sprache(self, kuerzel):
+        return self.sprachen.setdefault(kuerzel, {"Dokumente": 0, "Zeichen": 0, "Wörter": 0, "Sekunden": 0.0,
+                                                  "Histogramm": [0] * (len(LATENZ_GRENZEN) + 1)})
+
+    def erfasse(self, kuerzel, zeichen, woerter, dauer):
+        with self.sperre:
+            werte = self.sprache(kuerzel)
+            werte["Dokumente"] += 1
+            werte["Zeichen"] += zeichen
+            werte["Wörter"] += int(woerter)
+            werte["Sekunden"] += dauer
+            werte["Histogramm"][bisect.bisect_left(LATENZ_GRENZEN, dauer)] += 1
+
+    # Werte seit der letzten Abgabe (für den Rückweg aus dem Pool)
+    def abgeben(self):
+        with self.sperre:
+            sprachen, self.sprachen = self.sprachen, {}
+        return sprachen
+
+    def uebernehme(self, sprachen):
+        with self.sperre:
+            for kuerzel, andere in sprachen.items():
+                werte = self.sprache(kuerzel)
+                for k, v in andere.items():
+                    werte[k] = [a + b for a, b in zip(werte[k], v)] if k == "Histogramm" else werte[k] + v
+
+    def als_dict(self):
+        with self.sperre:
+            laufzeit = time.time() - self.beginn
+            return {"Laufzeit": laufzeit, "Warteschlange": self.warteschlange,
+                    "Sprachen": {kz: {**w, "Dokumente/s": w["Dokumente"] / laufzeit, "Wörter/s": w["Wörter"] / laufzeit,
+                                      "Histogramm": dict(zip([*map(str, LATENZ_GRENZEN), "+Inf"], w["Histogramm"]))}
+                                 for kz, w in self.sprachen.items()}}
+
+    def als_prometheus(self):
+        daten = self.als_dict()
+        zeilen = ["# TYPE cyiw_laufzeit_sekunden gauge", f"cyiw_laufzeit_sekunden {daten['Laufzeit']:.3f}",
+                  "# TYPE cyiw_warteschlange gauge", f"cyiw_warteschlange {daten['Warteschlange']}"]
+        for name, schluessel in (("dokumente", "Dokumente"), ("zeichen", "Zeichen"), ("woerter", "Wörter")):
+            zeilen.append(f"# TYPE cyiw_{name}_total counter")
+            zeilen += [f'cyiw_{name}_total{{sprache="{kz}"}} {w[schluessel]}' for kz, w in daten["Sprachen"].items()]
+        zeilen.append("# TYPE cyiw_dokument_sekunden histogram")
+        for kz, w in daten["Sprachen"].items():
+            kumuliert = 0
+            for grenze, n in w["Histogramm"].items():
+                kumuliert += n
+                zeilen.append(f'cyiw_dokument_sekunden_bucket{{sprache="{kz}",le="{grenze}"}} {kumuliert}')
+            zeilen.append(f'cyiw_dokument_sekunden_sum{{sprache="{kz}"}} {w["Sekunden"]:.6f}')
+            zeilen.append(f'cyiw_dokument_sekunden_count{{sprache="{kz}"}} {w["Dokumente"]}')
+        return "\n".join(zeilen) + "\n"
+
+    # .json als JSON, sonst Prometheus; erst eine Hilfsdatei schreiben, damit
+    # ein Leser nie eine halbe Datei sieht
+    def schreibe(self, pfad):
+        if pfad.endswith(".json"):
+            inhalt = json.dumps(self.als_dict(), ensure_ascii=False, indent=1)
+        else:
+            inhalt = self.als_prometheus()
+        with open(pfad + ".tmp", "w", encoding="utf-8") as f:
+            f.write(inhalt)
+        os.replace(pfad + ".tmp", pfad)
+
+MESSWERTE = Messwerte()
+# ein geforkter Prozess beginnt mit leeren Messwerten (und freier Sperre)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MESSWERTE.__init__)
+
+# schreibt die Messwerte alle "intervall" Sekunden; set() auf dem
+# Rückgabewert beendet das
+def schreibe_messwerte(pfad, intervall):
+    halt = threading.Event()
+
+    def schleife():
+        while not halt.wait(intervall):
+            MESSWERTE.schreibe(pfad)
+
+    threading.Thread(target=schleife, daemon=True).start()
+    return halt
+
+# ===========================
+# Buch an Kapitelüberschriften (ganze Zeilen) oder Seitenvorschüben teilen.
+# Liefert (Titel, Text) in Buchreihenfolge, die Überschrift selbst wird
+# nicht mitgezählt. kapitel_positionen liefert statt des Textes den
+# Zeichenbereich (Titel, von, bis).
+def kapitel_positionen(text, muster):
+    treffer = list(re.finditer(muster, text, flags=re.MULTILINE))
+    if not treffer:
+        return [("ganzer Text", 0, len(text))]
+    kapitel = []
+    if text[:treffer[0].start()].strip():
+        kapitel.append(("Vorspann", 0, treffer[0].start()))
+    for i, m in enumerate(treffer):
+        ende = treffer[i + 1].start() if i + 1 < len(treffer) else len(text)
+        if not text[m.end():ende].strip():
+            continue
+        titel = m.group().strip() or f"Teil {len(kapitel) + 1}"
+        kapitel.append((titel, m.end(), ende))
+    return [(f"{i:02d} {titel}", von, bis) for i, (titel, von, bis) in enumerate(kapitel, 1)]
+
+def teile_kapitel(text, muster):
+    return [(titel, text[von:bis]) for titel, von, bis in kapitel_positionen(text, muster)]
+
+# ===========================
+# Die geladenen Texte der Oberfläche. Mit nur_ergebnisse bleibt von Texten
+# aus einer Datei nur die Fundstelle (Pfad, Zeichenbereich, Prüfsumme) im
+# Speicher; braucht eine Ansicht den Text doch, wird er neu gelesen und
+# gegen die Prüfsumme geprüft. Texte ohne Datei (Editor) bleiben erhalten.
+def pruefsumme(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class Textablage:
+    def __init__(self, alphabet, nur_ergebnisse=False):
+        self.alphabet = alphabet
+        self.nur_ergebnisse = nur_ergebnisse
+        self.kapitel = {}     # Kapitel -> Fundstelle (Pfad, von, bis, Prüfsumme) oder None
+        self.texte = {}       # Kapitel -> Text, soweit behalten
+
+    def ablegen(self, kapitel, text, pfad=None, von=0):
+        self.kapitel[kapitel] = (pfad, von, von + len(text), pruefsumme(text)) if pfad else None
+        if self.nur_ergebnisse and pfad:
+            self.texte.pop(kapitel, None)
+        else:
+            self.texte[kapitel] = text
+
+    def setze_modus(self, nur_ergebnisse):
+        self.nur_ergebnisse = nur_ergebnisse
+        if nur_ergebnisse:
+            for kapitel, fundstelle in self.kapitel.items():
+                if fundstelle:
+                    self.texte.pop(kapitel, None)
+
+    def __getitem__(self, kapitel):
+        if kapitel in self.texte:
+            return self.texte[kapitel]
+        pfad, von, bis, summe = self.kapitel[kapitel]
+        text = lies_datei(pfad, self.alphabet)[von:bis]
+        if pruefsumme(text) != summe:
+            raise ValueError(f"'{pfad}' wurde seit dem Laden verändert")
+        return text
+
+    def get(self, kapitel, vorgabe=None):
+        return self[kapitel] if kapitel in self.kapitel else vorgabe
+
+    def __contains__(self, kapitel):
+        return kapitel in self.kapitel
+
+    # Datei des Textes, None für Texte ohne Datei (Editor)
+    def pfad(self, kapitel):
+        fundstelle = self.kapitel[kapitel]
+        return fundstelle[0] if fundstelle else None
+
+    def __iter__(self):
+        return iter(self.kapitel)
+
+    def __len__(self):
+        return len(self.kapitel)
+
+    def keys(self):
+        return self.kapitel.keys()
+
+    def clear(self):
+        self.kapitel.clear()
+        self.texte.clear()
+
+    # [(Kapitel, Fundstelle, Text), ...]; Texte mit Fundstelle nur auf Wunsch
+    def als_liste(self, mit_texten=False):
+        return [(k, f, self[k] if mit_texten or f is None else None) for k, f in self.kapitel.items()]
+
+    def aus_liste(self, eintraege):
+        self.clear()
+        for kapitel, fundstelle, text in eintraege:
+            self.kapitel[kapitel] = tuple(fundstelle) if fundstelle else None
+            if text is not None:
+                self.texte[kapitel] = text
+        self.setze_modus(self.nur_ergebnisse)
+
+# ===========================
+# Sitzung: Textablage, Ergebnisse, Konfidenzintervalle und die additiven
+# Rohzählungen (für Gruppen) als komprimiertes JSON hinter einer Kennung.
+# Beim Laden wird nichts neu berechnet.
+SITZUNG_KENNUNG = b"CYIW-Sitzung 1\n"
+
+def speichere_sitzung(pfad, kuerzel, ablage, ergebnisse, intervalle, mit_texten=False, zaehlungen=None):
+    daten = {"Sprache": kuerzel, "Ablage": ablage.als_liste(mit_texten),
+             "Ergebnisse": ergebnisse, "Intervalle": intervalle,
+             "Zählungen": {kapitel: {k: v for k, v in z.items() if k != "Wortfolge"}
+                           for kapitel, z in (zaehlungen or {}).items()}}
+    # numpy-Zahlen (np.int64 …) als gewöhnliche Zahlen schreiben
+    roh = json.dumps(daten, ensure_ascii=False, separators=(",", ":"), default=lambda x: x.item())
+    with open(pfad, "wb") as f:
+        f.write(SITZUNG_KENNUNG + zlib.compress(roh.encode("utf-8")))
+
+# füllt die Ablage und liefert (Ergebnisse, Intervalle, Zählungen); ältere
+# Sitzungen haben keine Zählungen
+def lade_sitzung(pfad, kuerzel, ablage):
+    with open(pfad, "rb") as f:
+        roh = f.read()
+    if not roh.startswith(SITZUNG_KENNUNG):
+        raise ValueError(f"'{pfad}' ist keine CYIW-Sitzung")
+    try:
+        daten = json.loads(zlib.decompress(roh[len(SITZUNG_KENNUNG):]).decode("utf-8"))
+    except zlib.error as e:
+        raise ValueError(f"'{pfad}' ist beschädigt: {e}")
+    if daten["Sprache"] != kuerzel:
+        raise ValueError(f"Die Sitzung gehört zur Sprache '{daten['Sprache']}'")
+    ablage.aus_liste(daten["Ablage"])
+    intervalle = {kapitel: {k: tuple(grenzen) for k, grenzen in werte.items()}
+                  for kapitel, werte in daten["Intervalle"].items()}
+    return daten["Ergebnisse"], intervalle, daten.get("Zählungen", {})
+
+# ===========================
+# Satzgrenzen in einem Durchlauf: jede Folge von Satzzeichen beendet einen
+# Satz, ein einzelner Punkt aber nicht
+#   - zwischen zwei Ziffern (3.5, 12.03.2024),
+#   - vor einem Kleinbuchstaben (ca. fünf, и т. д. и),
+#   - hinter einer Abkürzung der Sprache (z. B., т. е., np.),
+#   - hinter einer Initiale vor einem Großbuchstaben (A. Puschkin),
+#   - hinter einer Zahl vor einem Monatsnamen (3. Mai).
+# Die Regeln werden mit der Abkürzungstabelle zu einem regulären Ausdruck
+# übersetzt, der nur die tatsächlichen Satzenden findet; entschieden wird
+# nur aus wenigen Zeichen vor und hinter dem Punkt.
+SATZENDE_ZEICHEN = ".!?…|"
+KLEIN = "[" + "".join(c for c in map(chr, range(0x3000)) if c.islower()) + "]"
+GROSS = "[" + "".join(c for c in map(chr, range(0x3000)) if c.isupper()) + "]"
+NICHTLEER = re.compile(r'\S')
+
+class Satzgrenzen:
+    def __init__(self, abkuerzungen=(), monate=()):
+        self.abkuerzungen = set()
+        self.monate = set()
+        self.ergaenze(abkuerzungen, monate)
+
+    def ergaenze(self, abkuerzungen=(), monate=()):
+        self.abkuerzungen.update(a.lower() for a in abkuerzungen)
+        self.monate.update(m.lower() for m in monate)
+        punkt = [r'(?!(?<=\d\.)\d)', r'(?!\s{0,16}%s)' % KLEIN,
+                 r'(?!(?<=\b%s\.)\s{0,16}%s)' % (GROSS, GROSS)]
+        # Lookbehinds brauchen eine feste Länge: eine Alternative je Wortlänge
+        laengen = sorted({len(a) for a in self.abkuerzungen})
+        punkt += [r'(?i:(?<!\b(?:%s)\.))' % "|".join(re.escape(a) for a in sorted(self.abkuerzungen) if len(a) == n)
+                  for n in laengen]
+        if self.monate:
+            punkt.append(r'(?!(?<=\d\.)\s{0,16}(?i:%s)\b)' % "|".join(map(re.escape, sorted(self.monate))))
+        # beginnt mit der Zeichenklasse, damit die Suche schnell vorspringen kann
+        self.ende = re.compile(r'[.!?…|](?:(?<=[!?…|])[.!?…|]*|[.!?…|]+|' + "".join(punkt) + ")")
+
+    def ist_ende(self, text, von, bis):
+        m = self.ende.match(text, von)
+        return m is not None and m.end() == bis
+
+    # (von, bis) jeder satzbeendenden Zeichenfolge
+    def enden(self, text):
+        for m in self.ende.finditer(text):
+            yield m.span()
+
+    # Sätze = nicht leere Abschnitte zwischen den Satzenden
+    def zaehle(self, text):
+        saetze, anfang = 0, 0
+        suche = NICHTLEER.search
+        for m in self.ende.finditer(text):
+            von = m.start()
+            # meist steht das Satzzeichen direkt hinter einem Wort
+            if von > anfang and not text[von - 1].isspace() or suche(text, anfang, von):
+                saetze += 1
+            anfang = m.end()
+        return saetze + (suche(text, anfang) is not None)
+
+# Satzgrenzen für Satzblöcke und Scheiben: vereinigt die Abkürzungen aller
+# geladenen Sprachen. Sie schneiden so nur an Stellen, die auch für jede
+# einzelne Sprache Satzenden sind.
+SATZGRENZEN = Satzgrenzen()
+
+def satzgrenzen(abkuerzungen, monate=()):
+    SATZGRENZEN.ergaenze(abkuerzungen, monate)
+    return Satzgrenzen(abkuerzungen, monate)
+
+# ===========================
+# Trennmuster nach Liang (TeX): ein Muster wie "e2i" oder ".be3e" legt
+# Zahlen zwischen Buchstaben fest ("." = Wortgrenze), an jeder Stelle gilt
+# die größte Zahl aller passenden Muster, ungerade heißt Trennstelle. Die
+# Muster werden zu einem Präfixbaum übersetzt; ein Wort wird von jeder
+# Position aus nur so weit durchlaufen, wie noch ein Muster passt.
+class Trennmuster:
+    def __init__(self, muster):
+        self.baum = {}
+        for m in muster:
+            buchstaben = re.sub(r'\d', '', m)
+            werte = [0] * (len(buchstaben) + 1)
+            i = 0
+            for c in m:
+                if c.isdigit():
+                    werte[i] = int(c)
+                else:
+                    i += 1
+            knoten = self.baum
+            for c in buchstaben:
+                knoten = knoten.setdefault(c, {})
+            knoten[None] = werte
+
+    # Zahl vor jedem Buchstaben des (klein geschriebenen) Wortes
+    def punkte(self, wort):
+        zeichen = "." + wort + "."
+        punkte = [0] * (len(zeichen) + 1)
+        for anfang in range(len(zeichen)):
+            knoten = self.baum
+            for c in zeichen[anfang:]:
+                knoten = knoten.get(c)
+                if knoten is None:
+                    break
+                werte = knoten.get(None)
+                if werte:
+                    for j, w in enumerate(werte, anfang):
+                        if w > punkte[j]:
+                            punkte[j] = w
+        return punkte[1:len(wort) + 1]
+
+# ===========================
+# Satzblock: Text bis einschließlich des nächsten Satzendes.
+# Die Rohzählungen (zaehle_text) der Blöcke ergeben aufsummiert genau
+# die Zählungen des ganzen Textes.
+def satzbloecke(text):
+    bloecke, anfang = [], 0
+    for von, bis in SATZGRENZEN.enden(text):
+        bloecke.append(text[anfang:bis])
+        anfang = bis
+    if anfang < len(text):
+        bloecke.append(text[anfang:])
+    return bloecke
+
+def addiere(summe, zaehlungen, faktor=1):
+    for k, v in zaehlungen.items():
+        summe[k] = summe.get(k, 0) + faktor * v
+    return summe
+
+# Länge des gemeinsamen Anfangs und Endes zweier Blockfolgen
+def gleiche_raender(alt, neu):
+    grenze = min(len(alt), len(neu))
+    anfang = 0
+    while anfang < grenze and alt[anfang] == neu[anfang]:
+        anfang += 1
+    ende = 0
+    while ende < grenze - anfang and alt[-1 - ende] == neu[-1 - ende]:
+        ende += 1
+    return anfang, ende
+
+# ===========================
+# Hält die Zählungen pro Satzblock und zählt nach einer Änderung nur
+# die Blöcke neu, die sich tatsächlich geändert haben.
+class BlockZaehler:
+    def __init__(self, zaehle, text=""):
+        self.zaehle = zaehle
+        self.bloecke = []
+        self.zaehlungen = []
+        self.summe = dict(zaehle(""))
+        self.aktualisiere(text)
+
+    def aktualisiere(self, text):
+        alt = self.bloecke
+        neu = satzbloecke(text)
+        anfang, ende = gleiche_raender(alt, neu)
+
+        for z in self.zaehlungen[anfang:len(alt) - ende]:
+            addiere(self.summe, z, -1)
+        geaendert = [self.zaehle(b) for b in neu[anfang:len(neu) - ende]]
+        for z in geaendert:
+            addiere(self.summe, z)
+
+        self.zaehlungen[anfang:len(alt) - ende] = geaendert
+        self.bloecke = neu
+        return len(geaendert)
+
+# ===========================
+# Neue Fassung eines Textes: die Satzblöcke beider Fassungen abgleichen
+# und nur die geänderten zählen. Die Rohzählungen der alten Fassung
+# werden fortgeschrieben, die Wortfolge (nicht additiv) neu gebildet.
+# Liefert die Zählungen der neuen Fassung und die Zahl neu gezählter Blöcke.
+def ueberarbeite(alt, neu, zaehle, zaehlungen, benoetigt):
+    additiv = set(benoetigt) - {"Wortfolge"}
+    summe = {k: zaehlungen[k] for k in additiv}
+    alt_bloecke, neu_bloecke = satzbloecke(alt), satzbloecke(neu)
+    # gleicher Anfang und gleiches Ende brauchen keinen Abgleich
+    anfang, ende = gleiche_raender(alt_bloecke, neu_bloecke)
+    alt_bloecke = alt_bloecke[anfang:len(alt_bloecke) - ende]
+    neu_bloecke = neu_bloecke[anfang:len(neu_bloecke) - ende]
+    geaendert = 0
+    for art, a1, a2, n1, n2 in difflib.SequenceMatcher(None, alt_bloecke, neu_bloecke).get_opcodes():
+        if art == "equal":
+            continue
+        # zusammenhängende Blöcke lassen sich in einem Aufruf zählen
+        addiere(summe, zaehle("".join(alt_bloecke[a1:a2]), benoetigt=additiv), -1)
+        addiere(summe, zaehle("".join(neu_bloecke[n1:n2]), benoetigt=additiv))
+        geaendert += n2 - n1
+    if "Wortfolge" in benoetigt:
+        summe["Wortfolge"] = zaehle(neu, benoetigt={"Wortfolge"})["Wortfolge"]
+    return summe, geaendert
+
+# {Index: (alt, neu, Differenz)} für alle Werte, die sich geändert haben
+def unterschiede(vorher, nachher):
+    return {k: (vorher[k], v, round(v - vorher[k], 2)) for k, v in nachher.items()
+            if k in vorher and v != vorher[k]}
+
+# ===========================
+# Register der Indizes: Name -> (benötigte Rohzählungen, Formel).
+# Die Formeln rechnen mit einzelnen Zählungen ebenso wie mit Arrays
+# (z.B. Bootstrap-Replikate), Nenner 0 ergibt 0. Es werden nur die
+# Rohzählungen ermittelt, die die angeforderten Indizes brauchen.
+ZAEHLUNGEN = ("Sätze", "Wörter", "Silben", "Grapheme", "LangeWörter",
+              "Mehrsilber", "Einsilber", "WörterÜber3")
+SILBENZAEHLUNGEN = {"Silben", "Mehrsilber", "Einsilber"}
+INDIZES = {}
+
+def index(name, *zaehlungen):
+    def registriere(formel):
+        INDIZES[name] = (zaehlungen, formel)
+        return formel
+    return registriere
+
+# Rohzählungen selbst lassen sich ebenfalls anfordern
+for name in ZAEHLUNGEN:
+    INDIZES[name] = ((name,), lambda z, name=name: z[name])
+
+def benoetigte_zaehlungen(indizes):
+    return {z for name in indizes for z in INDIZES[name][0]}
+
+# Indizes, deren Rohzählungen fehlen (z.B. die Wortfolge bei
+# aufsummierten Satzblöcken), werden übersprungen
+def berechenbar(zaehlungen, indizes):
+    return [name for name in indizes if all(z in zaehlungen for z in INDIZES[name][0])]
+
+def berechne_indizes(zaehlungen, indizes):
+    ergebnis = {}
+    for name in berechenbar(zaehlungen, indizes):
+        wert = INDIZES[name][1](zaehlungen)
+        ergebnis[name] = wert if isinstance(wert, int) else round(float(wert), 2)
+    return ergebnis
+
+def teile(a, b):
+    # Division, die bei Nenner 0 den Wert 0 liefert
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    return np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b != 0)
+
+def gueltig(z):
+    return (np.asarray(z["Wörter"]) > 0) & (np.asarray(z["Sätze"]) > 0)
+
+def asw(z):
+    return teile(z["Silben"], z["Wörter"])
+
+# Anteil an allen Wörtern in Prozent (MS, IW, ES, PCW)
+def prozent(z, schluessel):
+    return teile(z[schluessel], z["Wörter"]) * 100
+
+@index("ASL", "Sätze", "Wörter")
+def asl(z):
+    return teile(z["Wörter"], z["Sätze"])
+
+@index("AWL", "Wörter", "Grapheme")
+def awl(z):
+    return teile(z["Grapheme"], z["Wörter"])
+
+@index("Flesch", "Sätze", "Wörter", "Silben")
+def flesch(z):
+    return np.where(gueltig(z), 206.835 - 1.015 * asl(z) - 84.6 * asw(z), 0.0)
+
+@index("Amstad", "Sätze", "Wörter", "Silben")
+def amstad(z):
+    return np.where(gueltig(z), 180 - asl(z) - 58.5 * asw(z), 0.0)
+
+@index("Tuldava", "Sätze", "Wörter", "Silben")
+def tuldava(z):
+    j = asl(z)
+    return asw(z) * np.log(np.where(j > 0, j, 1.0))
+
+@index("Lix", "Sätze", "Wörter", "LangeWörter")
+def lix(z):
+    return np.where(gueltig(z), asl(z) + prozent(z, "LangeWörter"), 0.0)
+
+@index("WSTF1", "Sätze", "Wörter", "LangeWörter", "Mehrsilber", "Einsilber")
+def wstf1(z):
+    return (0.1935 * prozent(z, "Mehrsilber") + 0.1672 * asl(z) + 0.1297 * prozent(z, "LangeWörter")
+            - 0.0327 * prozent(z, "Einsilber") - 0.875)
+
+@index("WSTF2", "Sätze", "Wörter", "LangeWörter", "Mehrsilber")
+def wstf2(z):
+    return 0.2007 * prozent(z, "Mehrsilber") + 0.1682 * asl(z) + 0.1373 * prozent(z, "LangeWörter") - 2.779
+
+@index("WSTF3", "Sätze", "Wörter", "Mehrsilber")
+def wstf3(z):
+    return 0.2963 * prozent(z, "Mehrsilber") + 0.1905 * asl(z) - 1.1144
+
+@index("WSTF4", "Sätze", "Wörter", "Mehrsilber")
+def wstf4(z):
+    return 0.2656 * asl(z) + 0.2744 * prozent(z, "Mehrsilber") - 1.693
+
+@index("NRE", "Sätze", "Wörter", "Einsilber")
+def nre(z):
+    return 1.599 * prozent(z, "Einsilber") - 1.015 * asl(z) - 31.517
+
+@index("GunningFog", "Sätze", "Wörter", "Mehrsilber")
+def gunning_fog(z):
+    return np.where(np.asarray(z["Wörter"]) > 0, 0.4 * (asl(z) + prozent(z, "Mehrsilber")), 0.0)
+
+# Pisarek, wie in "Formeln & Legende" angegeben (PCW: Wörter mit mehr als drei Graphemen)
+@index("PisarekLinear", "Sätze", "Wörter", "WörterÜber3")
+def pisarek_linear(z):
+    return (1 / 3 * asl(z)) * (1 / 3 * prozent(z, "WörterÜber3")) + 1
+
+@index("PisarekNichtlinear", "Sätze", "Wörter", "WörterÜber3")
+def pisarek_nichtlinear(z):
+    return 1 / 2 * ((asl(z) ** 2 + prozent(z, "WörterÜber3") ** 2) ** 0.5)
+
+# ===========================
+# Wortschatz: brauchen die (klein geschriebene) Wortfolge des Textes, die
+# anders als die übrigen Rohzählungen nicht über Satzblöcke summierbar ist
+# und daher nur auf Anfrage gezählt wird
+MTLD_SCHWELLE = 0.72
+
+@index("TTR", "Wortfolge")
+def ttr(z):
+    woerter = z["Wortfolge"]
+    return len(set(woerter)) / len(woerter) if woerter else 0.0
+
+# Anteil der Wortformen, die genau einmal vorkommen
+@index("Hapax", "Wortfolge")
+def hapax(z):
+    haeufigkeit = collections.Counter(z["Wortfolge"])
+    return sum(1 for n in haeufigkeit.values() if n == 1) / len(haeufigkeit) if haeufigkeit else 0.0
+
+# MTLD (McCarthy & Jarvis 2010): mittlere Länge der Abschnitte, deren TTR
+# nicht unter MTLD_SCHWELLE fällt, vorwärts und rückwärts gemittelt
+def mtld_richtung(woerter):
+    faktoren = 0.0
+    typen = set()
+    n = 0
+    for w in woerter:
+        typen.add(w)
+        n += 1
+        if len(typen) / n <= MTLD_SCHWELLE:
+            faktoren += 1
+            typen = set()
+            n = 0
+    if n:
+        faktoren += (1 - len(typen) / n) / (1 - MTLD_SCHWELLE)
+    # lauter verschiedene Wörter: kein Abschnitt fällt unter die Schwelle,
+    # der ganze Text zählt als ein (noch offener) Abschnitt
+    return len(woerter) / faktoren if faktoren else float(len(woerter))
+
+@index("MTLD", "Wortfolge")
+def mtld(z):
+    woerter = z["Wortfolge"]
+    return (mtld_richtung(woerter) + mtld_richtung(woerter[::-1])) / 2
+
+# Frequenzbänder nach der Wortliste aus "cyiw_korpus.py wortschatz":
+# Anteil der Wörter (in %) unter den häufigsten 1000, den nächsten 1000
+# und den übrigen Wortformen. Jede Sprache hat ihre eigene Liste, die
+# Indizes heißen daher Band1000<KÜRZEL>, Band2000<KÜRZEL>, BandRest<KÜRZEL>
+FREQUENZLISTE = os.path.join(ORDNER, "cyiw_frequenzen_{}.tsv")
+BAENDER = (1000, 2000)
+
+def band_namen(kuerzel):
+    return [f"Band{bis}{kuerzel.upper()}" for bis in BAENDER] + [f"BandRest{kuerzel.upper()}"]
+
+def frequenzbaender(kuerzel, indizes):
+    pfad = FREQUENZLISTE.format(kuerzel.lower())
+    if not os.path.exists(pfad):
+        return
+    with open(pfad, encoding="utf-8") as f:
+        raenge = {zeile.split("\t", 1)[0]: rang for rang, zeile in enumerate(f, 1)}
+
+    def anteil(z, von, bis):
+        woerter = z["Wortfolge"]
+        treffer = sum(1 for w in woerter if von < raenge.get(w, math.inf) <= bis)
+        return treffer / len(woerter) * 100 if woerter else 0.0
+
+    grenzen = (0,) + BAENDER + (math.inf,)
+    for von, bis, name in zip(grenzen, grenzen[1:], band_namen(kuerzel)):
+        index(name, "Wortfolge")(lambda z, von=von, bis=bis: anteil(z, von, bis))
+        if name not in indizes:
+            indizes.append(name)
+
+# ===========================
+# Flesch auf eine Sprache kalibrieren: Mittel MU und Streuung SIGMA der
+# Flesch-Werte eines Referenzkorpus werden auf MU_REF und SIGMA_REF abgebildet
+# (so entstand FleschRUS). Kalibrierungen aus "cyiw_korpus.py kalibrieren"
+# liegen in KALIBRIERUNG und ergeben den Index Flesch<KÜRZEL>.
+MU_REF = 60
+SIGMA_REF = 7.02
+KALIBRIERUNG = os.path.join(ORDNER, "cyiw_kalibrierung.json")
+
+def flesch_konstanten(mu, sigma, mu_ref=MU_REF, sigma_ref=SIGMA_REF):
+    c_neu = (206.835 - mu) / sigma * sigma_ref + mu_ref
+    return c_neu, 1.015 * sigma_ref / sigma, 84.6 * sigma_ref / sigma
+
+def registriere_flesch(name, c_neu, k_asl, k_asw):
+    @index(name, "Sätze", "Wörter", "Silben")
+    def flesch_kalibriert(z):
+        return c_neu - k_asl * asl(z) - k_asw * asw(z)
+    return flesch_kalibriert
+
+def lade_kalibrierungen():
+    if not os.path.exists(KALIBRIERUNG):
+        return {}
+    with open(KALIBRIERUNG, encoding="utf-8") as f:
+        return json.load(f)
+
+def speichere_kalibrierung(kuerzel, werte):
+    kalibrierungen = lade_kalibrierungen()
+    kalibrierungen[kuerzel.lower()] = werte
+    with open(KALIBRIERUNG, "w", encoding="utf-8") as f:
+        json.dump(kalibrierungen, f, ensure_ascii=False, indent=2)
+
+# gespeicherte Kalibrierung als Flesch<KÜRZEL> hinter "Flesch" einreihen
+def kalibrierter_flesch(kuerzel, indizes):
+    werte = lade_kalibrierungen().get(kuerzel.lower())
+    if not werte:
+        return
+    name = f"Flesch{kuerzel.upper()}"
+    registriere_flesch(name, werte["C_NEU"], werte["K_ASL"], werte["K_ASW"])
+    if name not in indizes:
+        indizes.insert(indizes.index("Flesch") + 1, name)
+
+# ===========================
+# Eigene Formeln: lineare Formeln wert = Konstante + Σ Gewicht · Merkmal,
+# an ein Korpus mit bekannten Stufen angepasst ("cyiw_korpus.py anpassen").
+# Sie liegen in FORMELN ({Sprache: {Name: {...}}}) und werden wie die
+# eingebauten Indizes registriert und berechnet.
+FORMELN = os.path.join(ORDNER, "cyiw_formeln.json")
+
+# Merkmal -> (benötigte Rohzählungen, Funktion der Zählungen)
+FORMEL_MERKMALE = {
+    "ASL": (("Sätze", "Wörter"), asl),
+    "ASW": (("Wörter", "Silben"), asw),
+    "AWL": (("Wörter", "Grapheme"), awl),
+    "MS": (("Wörter", "Mehrsilber"), lambda z: prozent(z, "Mehrsilber")),
+    "IW": (("Wörter", "LangeWörter"), lambda z: prozent(z, "LangeWörter")),
+    "ES": (("Wörter", "Einsilber"), lambda z: prozent(z, "Einsilber")),
+    "PCW": (("Wörter", "WörterÜber3"), lambda z: prozent(z, "WörterÜber3")),
+}
+
+def registriere_formel(name, konstante, gewichte):
+    benoetigt = sorted({z for m in gewichte for z in FORMEL_MERKMALE[m][0]})
+
+    @index(name, *benoetigt)
+    def formel(z):
+        return konstante + sum(b * FORMEL_MERKMALE[m][1](z) for m, b in gewichte.items())
+    return formel
+
+def lade_formeln():
+    if not os.path.exists(FORMELN):
+        return {}
+    with open(FORMELN, encoding="utf-8") as f:
+        return json.load(f)
+
+def speichere_formel(kuerzel, name, werte):
+    formeln = lade_formeln()
+    formeln.setdefault(kuerzel.lower(), {})[name] = werte
+    with open(FORMELN, "w", encoding="utf-8") as f:
+        json.dump(formeln, f, ensure_ascii=False, indent=2)
+
+# gespeicherte Formeln der Sprache hinten an die Indexliste anhängen
+def eigene_formeln(kuerzel, indizes):
+    for name, werte in lade_formeln().get(kuerzel.lower(), {}).items():
+        registriere_formel(name, werte["Konstante"], werte["Gewichte"])
+        if name not in indizes:
+            indizes.append(name)
+
+# ===========================
+# Mittelwert und Varianz im Durchlauf (Welford); Teilergebnisse mehrerer
+# Prozesse lassen sich exakt zusammenführen (Chan et al.)
+class Momente:
+    def __init__(self):
+        self.n = 0
+        self.mittel = 0.0
+        self.m2 = 0.0
+
+    def hinzu(self, x):
+        self.n += 1
+        d = x - self.mittel
+        self.mittel += d / self.n
+        self.m2 += d * (x - self.mittel)
+
+    def vereinige(self, andere):
+        if andere.n == 0:
+            return self
+        n = self.n + andere.n
+        d = andere.mittel - self.mittel
+        self.mittel += d * andere.n / n
+        self.m2 += andere.m2 + d * d * self.n * andere.n / n
+        self.n = n
+        return self
+
+    def varianz(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def streuung(self):
+        return self.varianz() ** 0.5
+
+# ===========================
+# alle angeforderten Indizes als Arrays (ungerundet)
+def indizes_matrix(zaehlungen, indizes):
+    return {name: np.asarray(INDIZES[name][1](zaehlungen), dtype=float) for name in indizes}
+
+# ===========================
+# Bootstrap über Sätze: Zählungen pro Satz als Matrix, Replikate als
+# Ziehungshäufigkeiten, Summen aller Replikate in einer Matrixmultiplikation
+
+# höchstens so viele Einträge (Replikate × Sätze) auf einmal im Speicher
+BOOTSTRAP_BLOCK = 4_000_000
+
+def satz_matrix(text, zaehle):
+    schluessel = list(zaehle("").keys())
+    zeilen = []
+    rest = np.zeros(len(schluessel))
+    for block in satzbloecke(text):
+        z = zaehle(block)
+        v = np.array([z[k] for k in schluessel], dtype=float)
+        if z["Sätze"]:
+            zeilen.append(v + rest)
+            rest = np.zeros(len(schluessel))
+        else:
+            # Reste ohne eigenen Satz (z.B. nur Leerraum) dem nächsten Satz zuschlagen
+            rest += v
+    if zeilen:
+        zeilen[-1] = zeilen[-1] + rest
+    elif rest.any():
+        zeilen.append(rest)
+    return schluessel, np.array(zeilen).reshape(-1, len(schluessel))
+
+def bootstrap_intervalle(text, zaehle, indizes, wiederholungen=2000, konfidenz=0.95, seed=None):
+    schluessel, matrix = satz_matrix(text, zaehle)
+    n = len(matrix)
+    if n == 0:
+        return {}
+    rng = np.random.default_rng(seed)
+    pro_block = max(1, BOOTSTRAP_BLOCK // n)
+    summen = []
+    for start in range(0, wiederholungen, pro_block):
+        b = min(pro_block, wiederholungen - start)
+        # wie oft jeder Satz in jedem Replikat gezogen wird
+        wahl = rng.integers(0, n, size=(b, n)) + np.arange(b)[:, None] * n
+        gewichte = np.bincount(wahl.ravel(), minlength=b * n).reshape(b, n)
+        summen.append(gewichte @ matrix)
+    summen = np.vstack(summen)
+    # Intervalle nur für Indizes, nicht für die Rohzählungen selbst
+    zaehlungen = dict(zip(schluessel, summen.T))
+    werte = indizes_matrix(zaehlungen, [n for n in berechenbar(zaehlungen, indizes) if n not in ZAEHLUNGEN])
+    alpha = (1 - konfidenz) / 2 * 100
+    return {k: tuple(round(float(x), 2) for x in np.percentile(v, [alpha, 100 - alpha]))
+            for k, v in werte.items()}
+
+# ===========================
+# Gruppen (Autor, Verlag, Schuljahr …): Texte werden nach ihrem Ordner,
+# einem regulären Ausdruck über den Dateinamen oder einer Spalte einer
+# Metadaten-CSV zusammengefasst. Die Indizes einer Gruppe sind die ihrer
+# summierten Rohzählungen, als wären alle Texte der Gruppe ein Text; ein
+# Mittel der Indizes pro Text würde kurze Texte zu stark gewichten. Die
+# Wortschatz-Indizes fehlen, die Wortfolge lässt sich nicht summieren.
+OHNE_GRUPPE = "(ohne Gruppe)"
+
+# Regeln: (Name, Pfad) -> Gruppe; Pfad ist None für Texte ohne Datei
+def gruppe_nach_ordner(name, pfad):
+    return os.path.basename(os.path.dirname(os.path.abspath(pfad))) if pfad else OHNE_GRUPPE
+
+# erste Klammergruppe des Ausdrucks, ohne Klammern der ganze Treffer
+def gruppe_nach_muster(muster):
+    ausdruck = re.compile(muster)
+
+    def gruppe(name, pfad):
+        m = ausdruck.search(os.path.basename(pfad) if pfad else name)
+        if m is None:
+            return OHNE_GRUPPE
+        return (m.group(1) if ausdruck.groups else m.group()) or OHNE_GRUPPE
+    return gruppe
+
+# Metadaten-CSV (Trennzeichen , ; oder Tab): erste Spalte Dateiname, dann
+# beliebige Spalten wie Autor, Verlag, Schuljahr -> (Spalten, {Datei: {Spalte: Wert}})
+def lies_metadaten(pfad):
+    with open(pfad, encoding="utf-8-sig", newline="") as f:
+        probe = f.read(PROBE)
+        f.seek(0)
+        try:
+            dialekt = csv.Sniffer().sniff(probe, delimiters=",;\t")
+        except csv.Error:
+            dialekt = csv.excel
+        zeilen = [z for z in csv.reader(f, dialekt) if z]
+    if not zeilen:
+        return [], {}
+    kopf = [k.strip() for k in zeilen[0]]
+    return kopf[1:], {os.path.basename(z[0].strip()): dict(zip(kopf[1:], (w.strip() for w in z[1:])))
+                      for z in zeilen[1:]}
+
+def gruppe_nach_metadaten(metadaten, spalte):
+    def gruppe(name, pfad):
+        eintrag = metadaten.get(os.path.basename(pfad) if pfad else name) or metadaten.get(name) or {}
+        return eintrag.get(spalte) or OHNE_GRUPPE
+    return gruppe
+
+# zaehlungen: {Text: Rohzählungen}, gruppen: {Text: Gruppe}
+# -> {Gruppe: {"Texte": Anzahl, Zählung/Index: Wert}}, nach Gruppen sortiert
+def gruppen_indizes(zaehlungen, gruppen, indizes):
+    texte = list(zaehlungen)
+    if not texte:
+        return {}
+    namen, welche = np.unique([str(gruppen[t]) for t in texte], return_inverse=True)
+    summen = {k: np.bincount(welche, weights=[zaehlungen[t][k] for t in texte], minlength=len(namen))
+              for k in ZAEHLUNGEN if all(k in zaehlungen[t] for t in texte)}
+    werte = indizes_matrix(summen, berechenbar(summen, indizes))
+    anzahl = np.bincount(welche, minlength=len(namen))
+    ergebnis = {}
+    for i, name in enumerate(namen.tolist()):
+        zeile = {"Texte": int(anzahl[i])}
+        for k, v in werte.items():
+            zeile[k] = int(round(v[i])) if k in ZAEHLUNGEN else round(float(v[i]), 2)
+        ergebnis[name] = zeile
+    return ergebnis
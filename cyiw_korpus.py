@@ -0,0 +1,408 @@
+import argparse
+import csv
+import os
+import re
+import sys
+
+import cyiw_kern as kern
+
+# ===========================
+# Kommandozeile für die Auswertung ganzer Korpora
+#   python cyiw_korpus.py schaetzen --sprache ru korpus/ --zeit 60
+#   python cyiw_korpus.py auswerten --absaetze gemischt/ > ergebnisse.tsv
+#   python cyiw_korpus.py auswerten --gruppen metadaten --metadaten texte.csv --spalte Autor korpus/ > autoren.tsv
+#   python cyiw_korpus.py kalibrieren --sprache de referenz/ --speichern
+#   python cyiw_korpus.py anpassen --sprache de klassen/ --ridge kv --speichern KlasseDE
+#   python cyiw_korpus.py profil --sprache de referenz/ --profil de.json
+#   python cyiw_korpus.py einordnen --profil de.json neu.txt
+#   python cyiw_korpus.py wortschatz --sprache pl korpus/ --speichern
+#   python cyiw_korpus.py strom --ohne-text < texte.jsonl > indizes.jsonl
+#   python cyiw_korpus.py abgleich --gold gold.json goldkorpus/ > abweichungen.tsv
+#   python cyiw_korpus.py stufen ergebnisse.tsv --stufen 5 --index profile.npz > stufen.tsv
+#   python cyiw_korpus.py aehnliche --index profile.npz --sprache de neu.txt
+#   python cyiw_korpus.py --messwerte cyiw.prom profil --sprache de referenz/ --profil de.json
+
+def befehl_schaetzen(args):
+    from cyiw_stichprobe import schaetze
+    sprache = kern.lade_sprache(args.sprache)
+    dateien = kern.sammle_dateien(args.pfade)
+    ergebnis, info = schaetze(dateien, sprache.zaehle_text, sprache.berechne_indizes,
+                              modus=args.modus, genauigkeit=args.genauigkeit, zeit=args.zeit,
+                              stichproben=args.stichproben, konfidenz=args.konfidenz,
+                              seed=args.seed, alphabet=sprache.K_VOKALE + sprache.K_KONSONANTEN)
+    # gelesene Bytes statt Anteil: Fenster überlappen und werden wiederholt gezogen
+    print(f"Züge: {info['Züge']} ⋅ gelesen: {info['Gelesen'] / 1e6:.2f} MB (Korpus: {info['Korpus'] / 1e6:.2f} MB)"
+          f" ⋅ Dauer: {info['Dauer']:.1f} s")
+    print(f"Index\tSchätzung\t{args.konfidenz:.0%}-Intervall")
+    for k, (wert, unten, oben) in ergebnis.items():
+        print(f"{k}\t{wert:.2f}\t[{unten:.2f}; {oben:.2f}]")
+
+def befehl_auswerten(args):
+    from cyiw_sprachwahl import werte_aus
+    sprachen = tuple(s.strip().lower() for s in args.sprachen.split(","))
+    dubletten = None
+    if args.dubletten or args.dublettenindex:
+        from cyiw_dubletten import Dublettenindex
+        dubletten = Dublettenindex(args.dublettenindex or ":memory:", args.aehnlichkeit)
+    try:
+        gruppe = gruppenregel(args)
+    except (OSError, ValueError, re.error) as e:
+        print(f"Gruppen: {e}", file=sys.stderr)
+        return 1
+    try:
+        zeilen = werte_aus(kern.sammle_dateien(args.pfade), sprachen, args.absaetze, args.prozesse,
+                           dubletten, args.dubletten == "verwerfen", gruppe)
+    finally:
+        if dubletten is not None:
+            dubletten.schliesse()
+    spalten = list(dict.fromkeys(k for z in zeilen for k in z))
+    schreiber = csv.DictWriter(sys.stdout, fieldnames=spalten, delimiter="\t", lineterminator="\n")
+    schreiber.writeheader()
+    schreiber.writerows(zeilen)
+
+# Regel für "auswerten --gruppen" (None ohne Gruppen)
+def gruppenregel(args):
+    if args.gruppen == "ordner":
+        return kern.gruppe_nach_ordner
+    if args.gruppen == "muster":
+        if not args.muster:
+            raise ValueError("--gruppen muster braucht --muster")
+        return kern.gruppe_nach_muster(args.muster)
+    if args.gruppen == "metadaten":
+        if not args.metadaten:
+            raise ValueError("--gruppen metadaten braucht --metadaten")
+        spalten, metadaten = kern.lies_metadaten(args.metadaten)
+        spalte = args.spalte or (spalten[0] if spalten else None)
+        if spalte not in spalten:
+            raise ValueError(f"Spalte '{spalte}' fehlt in {args.metadaten} (vorhanden: {', '.join(spalten)})")
+        return kern.gruppe_nach_metadaten(metadaten, spalte)
+    return None
+
+def befehl_kalibrieren(args):
+    from cyiw_kalibrierung import kalibriere
+    try:
+        werte = kalibriere(args.sprache, kern.sammle_dateien(args.pfade), args.prozesse,
+                           args.mu_ref, args.sigma_ref)
+    except ValueError as e:
+        print(f"Kalibrierung: {e}", file=sys.stderr)
+        return 1
+    for k, v in werte.items():
+        print(f"{k}\t{v}")
+    if args.speichern:
+        kern.speichere_kalibrierung(args.sprache, werte)
+        print(f"Gespeichert in {kern.KALIBRIERUNG}: Index Flesch{args.sprache.upper()}")
+
+# --ridge: "kv" oder eine Strafe >= 0
+def ridge_wert(wert):
+    if wert.lower() == "kv":
+        return "kv"
+    try:
+        strafe = float(wert)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{wert}' ist weder 'kv' noch eine Zahl")
+    if not strafe >= 0:
+        raise argparse.ArgumentTypeError(f"Die Strafe muss >= 0 sein, nicht {wert}")
+    return strafe
+
+def befehl_anpassen(args):
+    from cyiw_anpassung import MERKMALE, lies_etiketten, passe_formel_an
+    from cyiw_sprachwahl import SPRACHEN
+    kuerzel = args.sprache.lower()
+    if args.speichern:
+        # Indizes sind für alle Sprachen gemeinsam registriert: ein Name
+        # darf weder eingebaut noch Formel einer anderen Sprache sein.
+        # Erst alle Sprachversionen laden, denn sie registrieren eigene
+        # Indizes (FleschRUS …); Flesch<KÜRZEL> und Band…<KÜRZEL> bleiben
+        # frei für spätere Kalibrierungen und Wortlisten
+        for kz in SPRACHEN:
+            kern.lade_sprache(kz)
+        fremde = {n for kz, f in kern.lade_formeln().items() if kz != kuerzel for n in f}
+        fremde |= {n for kz in SPRACHEN for n in [f"Flesch{kz.upper()}"] + kern.band_namen(kz)}
+        eigene = kern.lade_formeln().get(kuerzel, {})
+        if args.speichern in fremde or args.speichern in kern.INDIZES and args.speichern not in eigene:
+            print(f"Der Name {args.speichern} ist bereits vergeben", file=sys.stderr)
+            return 1
+    merkmale = tuple(m.strip() for m in args.merkmale.split(",")) if args.merkmale else MERKMALE
+    unbekannt = [m for m in merkmale if m not in kern.FORMEL_MERKMALE]
+    if unbekannt:
+        print(f"Unbekannte Merkmale: {', '.join(unbekannt)} (möglich: {', '.join(kern.FORMEL_MERKMALE)})",
+              file=sys.stderr)
+        return 1
+    etiketten = lies_etiketten(args.etiketten) if args.etiketten else None
+    try:
+        werte = passe_formel_an(kuerzel, kern.sammle_dateien(args.pfade), etiketten, merkmale, args.ridge,
+                                args.prozesse, args.falten)
+    except ValueError as e:
+        print(f"Anpassung: {e}", file=sys.stderr)
+        return 1
+    for k, v in werte.items():
+        if k == "Gewichte":
+            for m, b in v.items():
+                print(f"{m}\t{b}")
+        else:
+            print(f"{k}\t{v}")
+    if args.speichern:
+        kern.speichere_formel(kuerzel, args.speichern, werte)
+        print(f"Gespeichert in {kern.FORMELN}: Index {args.speichern}")
+
+def befehl_profil(args):
+    from cyiw_verteilung import erstelle_profil
+    profil = erstelle_profil(args.sprache, kern.sammle_dateien(args.pfade), args.prozesse)
+    if not profil.texte():
+        raise SystemExit("Keine auswertbaren Texte gefunden")
+    profil.speichere(args.profil)
+    print(f"Texte: {profil.texte()} ⋅ gespeichert in {args.profil}")
+    uebersicht = profil.uebersicht()
+    spalten = list(next(iter(uebersicht.values())))
+    print("Index\t" + "\t".join(spalten))
+    for k, werte in uebersicht.items():
+        print(k + "\t" + "\t".join(f"{werte[s]:.2f}" for s in spalten))
+
+def befehl_einordnen(args):
+    from cyiw_verteilung import Korpusprofil
+    profil = Korpusprofil.lade(args.profil)
+    sprache = kern.lade_sprache(profil.sprache)
+    print("Datei\tIndex\tWert\tPerzentil\tz")
+    for datei in kern.sammle_dateien(args.pfade):
+        ergebnisse = sprache.berechne_statistik(kern.lies_datei(datei, sprache.K_VOKALE + sprache.K_KONSONANTEN))
+        for k, (wert, perzentil, z) in profil.einordnen(ergebnisse).items():
+            print(f"{datei}\t{k}\t{wert}\t{perzentil}\t{z}")
+
+def befehl_wortschatz(args):
+    from cyiw_wortschatz import erstelle_wortschatz, speichere_frequenzliste
+    kennzahlen, haeufigste = erstelle_wortschatz(args.sprache, kern.sammle_dateien(args.pfade),
+                                                 args.prozesse, args.woerter)
+    for k, v in kennzahlen.items():
+        print(f"{k}\t{v:.4f}" if isinstance(v, float) else f"{k}\t{v}")
+    print("Häufigste Wörter: " + ", ".join(f"{w} ({n})" for w, n in haeufigste[:20]))
+    if args.speichern:
+        pfad = speichere_frequenzliste(args.sprache, haeufigste)
+        kz = args.sprache.upper()
+        print(f"Gespeichert in {pfad}: Indizes Band1000{kz}, Band2000{kz}, BandRest{kz}")
+
+def befehl_strom(args):
+    from cyiw_strom import stroeme
+    sys.stdin.reconfigure(encoding="utf-8", errors="replace")
+    sys.stdout.reconfigure(encoding="utf-8")
+    sprachen = tuple(s.strip().lower() for s in args.sprachen.split(","))
+    try:
+        stroeme(sys.stdin, sys.stdout, args.prozesse, args.fenster, not args.ungeordnet, sprachen, not args.ohne_text)
+    except BrokenPipeError:
+        # der Leser (z.B. head) hat aufgehört; keine weitere Ausgabe beim Beenden
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+def befehl_abgleich(args):
+    from cyiw_abgleich import erstelle_gold, pruefe_erzeugte, pruefe_gold, speichere_gold
+    sprachen = tuple(s.strip().lower() for s in args.sprachen.split(","))
+    if args.speichern:
+        if not args.gold or not args.pfade:
+            sys.exit("--speichern braucht --gold DATEI und das Goldkorpus")
+        speichere_gold(args.gold, erstelle_gold(sprachen, args.pfade))
+        print(f"Gespeichert in {args.gold}")
+        return 0
+    zeilen, faelle = pruefe_erzeugte(sprachen, args.faelle, args.seed)
+    if args.gold:
+        gold, n = pruefe_gold(args.gold, sprachen, args.pfade)
+        zeilen += gold
+        faelle += n
+    schreiber = csv.DictWriter(sys.stdout, fieldnames=["Sprache", "Fall", "Weg", "Wert", "Referenz", "Ergebnis"],
+                               delimiter="\t", lineterminator="\n")
+    schreiber.writeheader()
+    schreiber.writerows(zeilen)
+    print(f"Fälle: {faelle} ⋅ Abweichungen: {len(zeilen)}", file=sys.stderr)
+    return 1 if zeilen else 0
+
+# Ergebniszeilen (aus "auswerten") mit Namen; Summenzeilen und Zeilen
+# mit fehlenden Werten bekommen keine Stufe
+def lies_ergebnisse(tabellen, merkmale):
+    from cyiw_sprachwahl import GESAMT
+    zeilen = []
+    for tabelle in tabellen:
+        with open(tabelle, encoding="utf-8", newline="") as f:
+            zeilen += list(csv.DictReader(f, delimiter="\t"))
+    sprachen = {}
+    for z in zeilen:
+        sprachen.setdefault(z.get("Datei"), set()).add(z.get("Sprache"))
+    namen, werte = {}, {}
+    for i, z in enumerate(zeilen):
+        if z.get("Datei") in (None, GESAMT):
+            continue
+        try:
+            werte[i] = {m: float(z[m]) for m in merkmale}
+        except (KeyError, TypeError, ValueError):
+            continue
+        namen[i] = z["Datei"] if len(sprachen[z["Datei"]]) == 1 else f"{z['Datei']} [{z.get('Sprache')}]"
+    return zeilen, namen, werte
+
+def befehl_stufen(args):
+    from cyiw_stufen import MERKMALE, Profilraum
+    merkmale = [m.strip() for m in args.merkmale.split(",")] if args.merkmale else MERKMALE
+    zeilen, namen, werte = lies_ergebnisse(args.tabellen, merkmale)
+    if not werte:
+        sys.exit("Keine vollständigen Ergebniszeilen gefunden")
+    raum = Profilraum(namen.values(), werte.values(), merkmale)
+    stufen = raum.bilde_stufen(args.stufen, args.stapel, args.seed)
+    for i, z in enumerate(zeilen):
+        z["Stufe"] = stufen[namen[i]] if i in namen else ""
+    schreiber = csv.DictWriter(sys.stdout, fieldnames=list(dict.fromkeys(k for z in zeilen for k in z)),
+                               delimiter="\t", lineterminator="\n")
+    schreiber.writeheader()
+    schreiber.writerows(zeilen)
+    for stufe in range(1, len(raum.zentren) + 1):
+        anzahl = int((raum.stufen == stufe).sum())
+        zentrum = ", ".join(f"{k} {v}" for k, v in raum.zentrum(stufe).items())
+        print(f"Stufe {stufe}: {anzahl} Texte ⋅ {zentrum}", file=sys.stderr)
+    if args.index:
+        raum.speichere(args.index)
+        print(f"Gespeichert in {args.index}", file=sys.stderr)
+
+def befehl_aehnliche(args):
+    from cyiw_stufen import lade_profilraum
+    raum = lade_profilraum(args.index)
+    stufen = dict(zip(raum.namen, raum.stufen.tolist())) if raum.stufen is not None else {}
+    abfragen = [(name, raum.vektoren[raum.namen.index(name)], name) for name in args.name or []
+                if name in raum.namen]
+    for name in set(args.name or []) - set(raum.namen):
+        print(f"'{name}' ist nicht im Index", file=sys.stderr)
+    if args.pfade:
+        if not args.sprache:
+            sys.exit("Für Textdateien wird --sprache gebraucht")
+        sprache = kern.lade_sprache(args.sprache)
+        for datei in kern.sammle_dateien(args.pfade):
+            text = kern.lies_datei(datei, sprache.K_VOKALE + sprache.K_KONSONANTEN)
+            abfragen.append((datei, raum.vektor(sprache.berechne_statistik(text)), None))
+    print("Abfrage\tRang\tText\tAbstand\tStufe")
+    for abfrage, vektor, ohne in abfragen:
+        for rang, (name, abstand) in enumerate(raum.nachbarn(vektor, args.anzahl, ohne), 1):
+            print(f"{abfrage}\t{rang}\t{name}\t{abstand:.3f}\t{stufen.get(name, '')}")
+
+# ===========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cyiw_korpus", description="CYIW ⋅ Korpusauswertung")
+    parser.add_argument("--messwerte", metavar="DATEI",
+                        help="Durchsatz und Latenz regelmäßig schreiben (.json, sonst Prometheus-Textformat)")
+    parser.add_argument("--messintervall", type=float, default=30, help="Sekunden zwischen zwei Messwert-Dateien")
+    befehle = parser.add_subparsers(dest="befehl", required=True)
+
+    p = befehle.add_parser("schaetzen", help="Indizes aus Zufallsstichproben mit Konfidenzintervallen schätzen")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner")
+    p.add_argument("--sprache", required=True, help="Sprachkürzel, z.B. de, pl, ru, ua")
+    p.add_argument("--modus", choices=["saetze", "dokumente"], default="saetze",
+                   help="Sätze aus allen Dateien oder ganze Dateien ziehen")
+    p.add_argument("--genauigkeit", type=float, default=0.5,
+                   help="Abbruch, sobald alle Intervalle höchstens ± diesen Wert breit sind")
+    p.add_argument("--zeit", type=float, help="Zeitbudget in Sekunden")
+    p.add_argument("--stichproben", type=int, help="höchstens so viele Züge")
+    p.add_argument("--konfidenz", type=float, default=0.95)
+    p.add_argument("--seed", type=int)
+    p.set_defaults(funktion=befehl_schaetzen)
+
+    p = befehle.add_parser("auswerten", help="Texte gemischter Sprachen vollständig auswerten (Sprache wird erkannt)")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner")
+    p.add_argument("--sprachen", default="de,pl,ru,ua", help="in Frage kommende Sprachen, z.B. ru,ua")
+    p.add_argument("--absaetze", action="store_true",
+                   help="Sprache pro Absatz statt pro Datei erkennen (für Texte mit Sprachwechseln)")
+    p.add_argument("--prozesse", type=int, help="Anzahl paralleler Prozesse")
+    p.add_argument("--dubletten", choices=["markieren", "verwerfen"],
+                   help="Kopien und ähnliche Texte (MinHash/LSH) markieren oder weglassen")
+    p.add_argument("--dublettenindex", metavar="DATEI",
+                   help="Index und Zählungen in dieser SQLite-Datei über Läufe hinweg aufheben")
+    p.add_argument("--aehnlichkeit", type=float, default=0.8,
+                   help="geschätzte Jaccard-Ähnlichkeit, ab der ein Text als Dublette gilt")
+    p.add_argument("--gruppen", choices=["ordner", "muster", "metadaten"],
+                   help="Texte gruppieren; jede Gruppe bekommt eine Zeile aus ihren summierten Zählungen")
+    p.add_argument("--muster", help="regulärer Ausdruck über den Dateinamen (erste Klammer = Gruppe)")
+    p.add_argument("--metadaten", metavar="DATEI", help="CSV: Dateiname, dann Spalten wie Autor, Verlag, Schuljahr")
+    p.add_argument("--spalte", help="Spalte der Metadaten, nach der gruppiert wird (Standard: die erste)")
+    p.set_defaults(funktion=befehl_auswerten)
+
+    p = befehle.add_parser("kalibrieren", help="Flesch an einem Referenzkorpus auf eine Sprache kalibrieren")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner")
+    p.add_argument("--sprache", required=True, help="Sprachkürzel, z.B. de, pl, ru, ua")
+    p.add_argument("--mu-ref", type=float, default=kern.MU_REF, help="Zielmittelwert")
+    p.add_argument("--sigma-ref", type=float, default=kern.SIGMA_REF, help="Zielstreuung")
+    p.add_argument("--prozesse", type=int, help="Anzahl paralleler Prozesse")
+    p.add_argument("--speichern", action="store_true",
+                   help="als Index Flesch<SPRACHE> für alle Programme übernehmen")
+    p.set_defaults(funktion=befehl_kalibrieren)
+
+    p = befehle.add_parser("anpassen", help="eigene Formel an ein Korpus mit bekannten Stufen anpassen")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner (Stufe im Ordnernamen, z.B. klasse_5/)")
+    p.add_argument("--sprache", required=True, help="Sprachkürzel, z.B. de, pl, ru, ua")
+    p.add_argument("--etiketten", metavar="DATEI", help="Stufen aus dieser Datei (Datei<TAB>Stufe pro Zeile)")
+    p.add_argument("--merkmale", help="Merkmale der Formel (kommagetrennt, Standard: ASL,ASW,MS,IW,ES)")
+    p.add_argument("--ridge", type=ridge_wert, help="Ridge-Strafe; 'kv' wählt sie per Kreuzvalidierung")
+    p.add_argument("--falten", type=int, default=5, help="Falten der Kreuzvalidierung")
+    p.add_argument("--prozesse", type=int, help="Anzahl paralleler Prozesse")
+    p.add_argument("--speichern", metavar="NAME", help="als Index NAME für alle Programme übernehmen")
+    p.set_defaults(funktion=befehl_anpassen)
+
+    p = befehle.add_parser("profil", help="Verteilung aller Indizes über ein Referenzkorpus speichern")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner")
+    p.add_argument("--sprache", required=True, help="Sprachkürzel, z.B. de, pl, ru, ua")
+    p.add_argument("--profil", required=True, help="Zieldatei (JSON)")
+    p.add_argument("--prozesse", type=int, help="Anzahl paralleler Prozesse")
+    p.set_defaults(funktion=befehl_profil)
+
+    p = befehle.add_parser("einordnen", help="Texte mit einem gespeicherten Profil vergleichen (Perzentil, z-Wert)")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner")
+    p.add_argument("--profil", required=True, help="mit 'profil' erstellte Datei")
+    p.set_defaults(funktion=befehl_einordnen)
+
+    p = befehle.add_parser("wortschatz", help="Wortschatz eines Korpus zählen (Frequenzliste für Frequenzbänder)")
+    p.add_argument("pfade", nargs="+", help="Textdateien oder Ordner")
+    p.add_argument("--sprache", required=True, help="Sprachkürzel, z.B. de, pl, ru, ua")
+    p.add_argument("--woerter", type=int, default=5000, help="Länge der Frequenzliste")
+    p.add_argument("--prozesse", type=int, help="Anzahl paralleler Prozesse")
+    p.add_argument("--speichern", action="store_true",
+                   help="Frequenzliste für die Indizes Band1000/Band2000/BandRest<SPRACHE> übernehmen")
+    p.set_defaults(funktion=befehl_wortschatz)
+
+    p = befehle.add_parser("strom", help="JSON Lines von stdin auswerten und mit Indizes auf stdout schreiben")
+    p.add_argument("--sprachen", default="de,pl,ru,ua", help="erkannte Sprachen für Datensätze ohne \"lang\"")
+    p.add_argument("--prozesse", type=int, help="Anzahl paralleler Prozesse")
+    p.add_argument("--fenster", type=int, help="höchstens so viele Datensätze gleichzeitig in Arbeit")
+    p.add_argument("--ungeordnet", action="store_true",
+                   help="Datensätze ausgeben, sobald sie fertig sind (sonst in Eingabereihenfolge)")
+    p.add_argument("--ohne-text", action="store_true", help="das Feld \"text\" nicht mit ausgeben")
+    p.set_defaults(funktion=befehl_strom)
+
+    p = befehle.add_parser("abgleich", help="schnelle Zählwege gegen die Referenz und ein Goldkorpus prüfen")
+    p.add_argument("pfade", nargs="*", help="Goldkorpus: Textdateien oder Ordner")
+    p.add_argument("--sprachen", default="de,pl,ru,ua", help="zu prüfende Sprachversionen")
+    p.add_argument("--gold", metavar="DATEI", help="gespeicherte Ergebnisse des Goldkorpus (JSON)")
+    p.add_argument("--speichern", action="store_true",
+                   help="heutige Ergebnisse des Goldkorpus in --gold speichern statt zu vergleichen")
+    p.add_argument("--faelle", type=int, default=200, help="Anzahl zufällig erzeugter Texte pro Sprache")
+    p.add_argument("--seed", type=int)
+    p.set_defaults(funktion=befehl_abgleich)
+
+    p = befehle.add_parser("stufen", help="Texte nach ihren Indizes in Schwierigkeitsstufen gruppieren (k-Means)")
+    p.add_argument("tabellen", nargs="+", help="Ergebnisse von 'auswerten' (TSV)")
+    p.add_argument("--stufen", type=int, default=4, help="Anzahl der Stufen")
+    p.add_argument("--merkmale", help="Indizes, aus denen die Profile gebildet werden (kommagetrennt)")
+    p.add_argument("--stapel", type=int,
+                   help="Mini-Batch-k-Means mit Stapeln dieser Größe (Standard ab 20 000 Texten: 1024)")
+    p.add_argument("--index", metavar="DATEI", help="Profile und Stufen für 'aehnliche' speichern (.npz)")
+    p.add_argument("--seed", type=int)
+    p.set_defaults(funktion=befehl_stufen)
+
+    p = befehle.add_parser("aehnliche", help="die ähnlichsten Texte eines mit 'stufen' gespeicherten Index finden")
+    p.add_argument("pfade", nargs="*", help="neue Textdateien oder Ordner")
+    p.add_argument("--index", required=True, help="mit 'stufen --index' gespeicherte Datei")
+    p.add_argument("--name", action="append", help="Text aus dem Index als Abfrage (mehrfach möglich)")
+    p.add_argument("--sprache", help="Sprachkürzel für neue Textdateien, z.B. de, pl, ru, ua")
+    p.add_argument("--anzahl", type=int, default=20, help="so viele Nachbarn pro Abfrage")
+    p.set_defaults(funktion=befehl_aehnliche)
+
+    args = parser.parse_args(argv)
+    halt = kern.schreibe_messwerte(args.messwerte, args.messintervall) if args.messwerte else None
+    try:
+        return args.funktion(args)
+    finally:
+        if halt:
+            halt.set()
+            kern.MESSWERTE.schreibe(args.messwerte)
+
+if __name__ == "__main__":
+    sys.exit(main())
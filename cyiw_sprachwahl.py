@@ -0,0 +1,143 @@
+import collections
+import os
+import re
+
+import cyiw_kern as kern
+
+# ===========================
+# Gemischte Korpora: Sprache pro Dokument (oder pro Absatz) aus der
+# Buchstabenverteilung erkennen und jeden Abschnitt mit der passenden
+# Sprachversion zählen. Gewonnen hat die Sprache, zu deren Alphabet
+# (K_VOKALE + K_KONSONANTEN) die meisten Buchstaben gehören; RU und UA
+# unterscheiden sich dabei an ы/э/ъ/ё bzw. і/ї/є/ґ, DE und PL an ä/ö/ü/ß/q/v/x
+# bzw. ą/ę/ł/ń/ś/ź/ż.
+SPRACHEN = ("de", "pl", "ru", "ua")
+ERKENNUNG = 20000   # so viele Zeichen vom Anfang reichen für die Erkennung
+MINDESTENS = 20     # kürzere Absätze (in Buchstaben) übernehmen die Sprache davor
+ABSATZ = re.compile(r'\n[ \t]*\n\s*')
+
+ALPHABETE = {}
+
+def alphabet(kuerzel):
+    if kuerzel not in ALPHABETE:
+        sprache = kern.lade_sprache(kuerzel)
+        ALPHABETE[kuerzel] = (sprache.K_VOKALE + sprache.K_KONSONANTEN).lower()
+    return ALPHABETE[kuerzel]
+
+# liefert None, wenn der Text zu kurz ist oder zwei Sprachen gleichauf liegen
+def erkenne_sprache(text, sprachen=SPRACHEN, mindestens=1):
+    haeufigkeit = collections.Counter(text[:ERKENNUNG].lower())
+    punkte = {kz: sum(n for c, n in haeufigkeit.items() if c in alphabet(kz)) for kz in sprachen}
+    rangfolge = sorted(sprachen, key=punkte.get, reverse=True)
+    if punkte[rangfolge[0]] < mindestens:
+        return None
+    if len(rangfolge) > 1 and punkte[rangfolge[0]] == punkte[rangfolge[1]]:
+        return None
+    return rangfolge[0]
+
+# Text in (Sprache, Abschnitt) zerlegen; aufeinanderfolgende Absätze
+# derselben Sprache bleiben ein Abschnitt
+def teile_nach_sprache(text, sprachen=SPRACHEN, absatzweise=False):
+    dokument = erkenne_sprache(text, sprachen) or sprachen[0]
+    if not absatzweise:
+        return [(dokument, text)]
+    abschnitte = []
+    pos = 0
+    for m in list(ABSATZ.finditer(text)) + [None]:
+        ende = m.end() if m else len(text)
+        absatz = text[pos:ende]
+        pos = ende
+        if not absatz:
+            continue
+        kz = erkenne_sprache(absatz, sprachen, MINDESTENS)
+        kz = kz or (abschnitte[-1][0] if abschnitte else dokument)
+        if abschnitte and abschnitte[-1][0] == kz:
+            abschnitte[-1] = (kz, abschnitte[-1][1] + absatz)
+        else:
+            abschnitte.append((kz, absatz))
+    return abschnitte
+
+# Kodierung und Sprache hängen zusammen: es gewinnt das Paar mit den
+# meisten Alphabet-Treffern in der Probe
+def lies_datei(pfad, sprachen=SPRACHEN):
+    with open(pfad, "rb") as f:
+        roh = f.read(kern.PROBE)
+    paare = [(kern.erkenne_kodierung(roh, alphabet(kz)), kz) for kz in sprachen]
+    kodierung, _ = max(paare, key=lambda p: kern.zaehle_treffer(roh.decode(p[0], errors="ignore"), alphabet(p[1])))
+    with open(pfad, "r", encoding=kodierung, errors="replace") as f:
+        return f.read()
+
+def zaehle_abschnitt(abschnitt):
+    kz, text = abschnitt
+    return kern.zaehle_in_scheiben(text, kern.lade_sprache(kz).zaehle_text, kz)
+
+# ===========================
+# Ein Ergebnis pro Datei und Sprache, dazu Summenzeilen pro Sprache.
+# Gleiche Texte werden nur einmal gezählt. Mit einem Dublettenindex
+# (cyiw_dubletten) kommen Zählungen früherer Läufe aus dem Index, und
+# Kopien bzw. ähnliche Texte werden markiert oder verworfen.
+GESAMT = "(gesamt)"
+PAKET = 50_000_000   # Zeichen, die höchstens auf einmal gelesen und gezählt werden
+
+# Abschnitte [(Prüfsumme, Sprache, Text)] zählen -> {Prüfsumme: {Sprache: Zählungen}}
+def zaehle_paket(abschnitte, prozesse=None, dubletten=None):
+    zaehlungen = kern.berechne_parallel(zaehle_abschnitt, [(kz, t) for _, kz, t in abschnitte],
+                                        prozesse, laenge=lambda a: len(a[1]))
+    neu = {}
+    for (summe, kz, _), z in zip(abschnitte, zaehlungen):
+        kern.addiere(neu.setdefault(summe, {}).setdefault(kz, {}), z)
+    if dubletten is not None:
+        for summe, daten in neu.items():
+            dubletten.merke_zaehlungen(summe, daten)
+    return neu
+
+# gruppe: Regel (Name, Pfad) -> Gruppe aus cyiw_kern; dann hat jede Zeile eine
+# Spalte "Gruppe" und jede Gruppe eine Gesamtzeile aus ihren summierten Zählungen
+def werte_aus(dateien, sprachen=SPRACHEN, absatzweise=False, prozesse=None, dubletten=None, verwerfen=False,
+              gruppe=None):
+    abschnitte, umfang = [], 0   # Abschnitte des laufenden Pakets und ihre Zeichen
+    pruefsummen = {}
+    hinweise = {}
+    bekannt = {}   # Prüfsumme -> {Sprache: Zählungen}, None = wird in diesem Lauf gezählt
+    for datei in dateien:
+        text = lies_datei(datei, sprachen)
+        summe = kern.pruefsumme(text)
+        if dubletten is not None:
+            art, original, aehnlichkeit = dubletten.pruefe(datei, text, summe)
+            if art != "neu":
+                if verwerfen:
+                    continue
+                hinweise[datei] = f"{art} wie {original} ({aehnlichkeit})"
+        if summe not in bekannt:
+            bekannt[summe] = dubletten.zaehlungen(summe) if dubletten is not None else None
+            if bekannt[summe] is None:
+                abschnitte += [(summe, kz, teil) for kz, teil in teile_nach_sprache(text, sprachen, absatzweise)]
+                umfang += len(text)
+        pruefsummen[datei] = summe
+        # volles Paket zählen; danach bleiben nur Prüfsummen und Zählungen
+        if umfang >= PAKET:
+            bekannt.update(zaehle_paket(abschnitte, prozesse, dubletten))
+            abschnitte, umfang = [], 0
+    bekannt.update(zaehle_paket(abschnitte, prozesse, dubletten))
+
+    zeilen = []
+    gesamt = {}
+    gruppen = {}   # Sprache -> ({Datei: Zählungen}, {Datei: Gruppe})
+    for datei, summe in pruefsummen.items():
+        for kz, z in (bekannt[summe] or {}).items():
+            kern.addiere(gesamt.setdefault(kz, {}), z)
+            zeile = {"Datei": datei, "Sprache": kz}
+            if gruppe is not None:
+                zeile["Gruppe"] = gruppe(os.path.basename(datei), datei)
+                zaehlungen, zuordnung = gruppen.setdefault(kz, ({}, {}))
+                zaehlungen[datei], zuordnung[datei] = z, zeile["Gruppe"]
+            zeile.update(kern.lade_sprache(kz).berechne_indizes(z))
+            if datei in hinweise:
+                zeile["Dublette"] = hinweise[datei]
+            zeilen.append(zeile)
+    for kz, (zaehlungen, zuordnung) in sorted(gruppen.items()):
+        for name, werte in kern.gruppen_indizes(zaehlungen, zuordnung, kern.lade_sprache(kz).INDEX_LISTE).items():
+            zeilen.append({"Datei": GESAMT, "Sprache": kz, "Gruppe": name, **werte})
+    for kz, z in sorted(gesamt.items()):
+        zeilen.append({"Datei": GESAMT, "Sprache": kz, **kern.lade_sprache(kz).berechne_indizes(z)})
+    return zeilen
@@ -0,0 +1,216 @@
+import os
+import re
+import time
+
+import numpy as np
+
+import cyiw_kern as kern
+
+# ===========================
+# Näherungsweise Auswertung großer Korpora über Zufallsstichproben.
+#
+# Modus "saetze": pro Zug wird ein zufälliges Fenster von FENSTER Bytes
+# gewählt, gezählt werden alle Sätze, die im Fenster beginnen. So hat jeder
+# Satz unabhängig von seiner Länge dieselbe Auswahlwahrscheinlichkeit. Die
+# Fenster werden in jeder Runde systematisch über alle Dateien verteilt
+# (Schichtung nach Datei, proportional zur Dateigröße).
+# Modus "dokumente": ganze Dateien in zufälliger Reihenfolge.
+#
+# Geschätzt werden die Rohzählungen des ganzen Korpus, die Indizes daraus
+# mit berechne_indizes. Die Konfidenzintervalle kommen aus einem innerhalb
+# der Dateien geschichteten Bootstrap über die Züge.
+
+FENSTER = 4096           # Bytes, in denen die gezählten Sätze beginnen
+NACHLESEN = 4096         # so viel wird jeweils gelesen, um den letzten Satz abzuschließen
+KLEIN = 4 * FENSTER      # kleinere Dateien werden vollständig gezählt
+ROHZAEHLUNGEN = ("Sätze", "Wörter", "Silben", "Grapheme")
+
+# Satzzeichen als Bytefolgen der jeweiligen Kodierung
+def satzzeichen_bytes(kodierung):
+    if kodierung == "utf-8-sig":
+        kodierung = "utf-8"
+    zeichen = [c.encode(kodierung, errors="ignore") for c in ".!?|…"]
+    return re.compile(b"(?:" + b"|".join(re.escape(z) for z in zeichen if z) + b")+")
+
+def lies_text(datei, start=0, laenge=-1, kodierung="utf-8"):
+    with open(datei, "rb") as f:
+        f.seek(start)
+        roh = f.read(laenge)
+    return roh.decode(kodierung, errors="ignore")
+
+class Stichprobe:
+    def __init__(self, dateien, zaehle, berechne, modus="saetze", seed=None, alphabet=None):
+        if modus not in ("saetze", "dokumente"):
+            raise ValueError(f"Unbekannter Modus: {modus}")
+        self.zaehle = zaehle
+        self.berechne = berechne
+        self.modus = modus
+        self.rng = np.random.default_rng(seed)
+        self.schluessel = list(zaehle("").keys())
+        # ohne Alphabet wird UTF-8 angenommen, sonst pro Datei erkannt
+        self.alphabet = alphabet
+        self.kodierungen = {}
+        self.satzzeichen = {}
+
+        groessen = np.array([os.path.getsize(d) for d in dateien], dtype=float)
+        self.korpus = groessen.sum()   # Bytes aller Dateien
+        # von der Platte gelesene Bytes; überlappende und wiederholte
+        # Fenster zählen mehrfach
+        self.gelesen = 0
+        self.exakt = np.zeros(len(self.schluessel))
+        if modus == "saetze":
+            # kleine Dateien vollständig zählen, große bilden die Schichten
+            for d, g in zip(dateien, groessen):
+                if g <= KLEIN:
+                    self.exakt += self.vektor(zaehle(lies_text(d, kodierung=self.kodierung(d))))
+                    self.gelesen += g
+            gross = groessen > KLEIN
+            self.dateien = [d for d, g in zip(dateien, gross) if g]
+            # Fensteranfänge reichen bis FENSTER - 1 Bytes vor den Dateianfang,
+            # damit auch die ersten Sätze voll erfasst werden
+            self.groessen = groessen[gross] + FENSTER - 1
+        else:
+            self.dateien = list(dateien)
+            self.groessen = groessen
+            self.reihenfolge = list(self.rng.permutation(len(dateien)))
+        self.gesamt = self.groessen.sum()
+        self.grenzen = np.cumsum(self.groessen)
+
+        self.zuege = []        # Zählvektor pro Zug
+        self.zug_bytes = []    # gezählte Bytes pro Zug
+        self.schicht = []      # Datei-Index pro Zug
+
+    def vektor(self, zaehlungen):
+        return np.array([zaehlungen[k] for k in self.schluessel], dtype=float)
+
+    def kodierung(self, datei):
+        if datei not in self.kodierungen:
+            self.kodierungen[datei] = kern.erkenne_datei(datei, self.alphabet) if self.alphabet else "utf-8"
+        return self.kodierungen[datei]
+
+    def fertig(self):
+        return self.modus == "dokumente" and not self.reihenfolge
+
+    # ===========================
+    def ziehe(self, anzahl):
+        if self.gesamt == 0:
+            return
+        if self.modus == "dokumente":
+            for _ in range(min(anzahl, len(self.reihenfolge))):
+                i = self.reihenfolge.pop()
+                text = lies_text(self.dateien[i], kodierung=self.kodierung(self.dateien[i]))
+                self.gelesen += self.groessen[i]
+                self.neuer_zug(i, text, self.groessen[i])
+            return
+        # systematische Positionen: jede Datei erhält ihren Anteil an der Runde
+        positionen = (self.rng.random() + np.arange(anzahl)) * self.gesamt / anzahl
+        for pos in positionen:
+            i = int(np.searchsorted(self.grenzen, pos, side="right"))
+            anfang = int(pos - (self.grenzen[i] - self.groessen[i])) - (FENSTER - 1)
+            self.neuer_zug(i, self.lies_fenster(self.dateien[i], anfang), FENSTER)
+
+    def lies_fenster(self, datei, anfang):
+        # alle Satzblöcke, die in [anfang, anfang + FENSTER) beginnen. Blöcke
+        # enden nur an echten Satzenden (kern.SATZGRENZEN, nicht in "z. B."
+        # oder "3.5"), entschieden aus kern.UMFELD Bytes davor und dahinter.
+        kodierung = self.kodierung(datei)
+        if kodierung not in self.satzzeichen:
+            self.satzzeichen[kodierung] = satzzeichen_bytes(kodierung)
+        start = max(anfang - kern.UMFELD, 0)
+        with open(datei, "rb") as f:
+            f.seek(start)
+            laenge = anfang + FENSTER - start + NACHLESEN
+            roh = f.read(laenge)
+            dateiende = len(roh) < laenge
+            while True:
+                # Satzzeichen ohne genug gelesenes Umfeld erst nach dem Nachlesen entscheiden
+                grenze = len(roh) if dateiende else len(roh) - kern.UMFELD
+                blockanfaenge = [0] if start == 0 else []
+                blockanfaenge += [start + m.end() for m in self.satzzeichen[kodierung].finditer(roh)
+                                  if m.end() <= grenze and kern.ist_satzende_roh(roh, m.start(), m.end(), kodierung)]
+                im_fenster = [a for a in blockanfaenge if anfang <= a < anfang + FENSTER]
+                weiter = [a for a in blockanfaenge if im_fenster and a > im_fenster[-1]]
+                if not im_fenster or weiter or dateiende:
+                    break
+                mehr = f.read(NACHLESEN)
+                dateiende = len(mehr) < NACHLESEN
+                roh += mehr
+        self.gelesen += len(roh)
+        if not im_fenster:
+            return ""
+        ende = weiter[0] if weiter else start + len(roh)
+        return roh[im_fenster[0] - start:ende - start].decode(kodierung, errors="ignore")
+
+    def neuer_zug(self, schicht, text, bytes_):
+        self.zuege.append(self.vektor(self.zaehle(text)))
+        self.zug_bytes.append(bytes_)
+        self.schicht.append(schicht)
+
+    # ===========================
+    def hochrechnung(self, gewichte=None):
+        z = np.array(self.zuege).reshape(-1, len(self.schluessel))
+        b = np.array(self.zug_bytes, dtype=float)
+        if gewichte is None:
+            gewichte = np.ones((1, len(b)))
+        summe = gewichte @ z
+        bytes_ = gewichte @ b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            anteil = np.where(bytes_[:, None] > 0, summe / bytes_[:, None], 0.0)
+        return self.exakt + self.gesamt * anteil
+
+    def indizes(self, summe):
+        return self.berechne(dict(zip(self.schluessel, summe)))
+
+    def bootstrap(self, wiederholungen=500):
+        n = len(self.zuege)
+        gewichte = np.zeros((wiederholungen, n))
+        schicht = np.array(self.schicht)
+        zeilen = np.arange(wiederholungen)[:, None]
+        # Züge nur innerhalb derselben Datei neu ziehen
+        for h in np.unique(schicht):
+            pos = np.flatnonzero(schicht == h)
+            wahl = pos[self.rng.integers(0, len(pos), size=(wiederholungen, len(pos)))]
+            np.add.at(gewichte, (zeilen, wahl), 1)
+        return [self.indizes(s) for s in self.hochrechnung(gewichte)]
+
+    def ergebnis(self, wiederholungen=500, konfidenz=0.95):
+        if not self.zuege:
+            # nur vollständig gezählte Dateien: exakter Wert ohne Streuung
+            return {k: (v, v, v) for k, v in self.indizes(self.exakt).items()}
+        schaetzung = self.indizes(self.hochrechnung()[0])
+        replikate = self.bootstrap(wiederholungen)
+        alpha = (1 - konfidenz) / 2 * 100
+        ergebnis = {}
+        for k, v in schaetzung.items():
+            werte = np.array([r[k] for r in replikate], dtype=float)
+            unten, oben = np.percentile(werte, [alpha, 100 - alpha]) if len(werte) else (np.nan, np.nan)
+            ergebnis[k] = (v, float(unten), float(oben))
+        return ergebnis
+
+# ===========================
+# Runden ziehen, bis die Intervalle eng genug sind oder das Budget erreicht ist
+def schaetze(dateien, zaehle, berechne, modus="saetze", genauigkeit=0.5, zeit=None,
+             stichproben=None, runde=200, konfidenz=0.95, wiederholungen=500, seed=None,
+             alphabet=None):
+    start = time.perf_counter()
+    probe = Stichprobe(dateien, zaehle, berechne, modus, seed, alphabet)
+    ergebnis = {}
+    while True:
+        anzahl = runde if stichproben is None else min(runde, stichproben - len(probe.zuege))
+        if anzahl > 0:
+            probe.ziehe(anzahl)
+        ergebnis = probe.ergebnis(wiederholungen, konfidenz)
+        breiten = [(o - u) / 2 for k, (v, u, o) in ergebnis.items() if k not in ROHZAEHLUNGEN]
+        if probe.fertig() or probe.gesamt == 0 or anzahl <= 0:
+            break
+        if breiten and max(breiten) <= genauigkeit:
+            break
+        if zeit is not None and time.perf_counter() - start >= zeit:
+            break
+    info = {
+        "Züge": len(probe.zuege),
+        "Gelesen": probe.gelesen,
+        "Korpus": probe.korpus,
+        "Dauer": time.perf_counter() - start
+    }
+    return ergebnis, info
@@ -0,0 +1,73 @@
+import collections
+import functools
+import json
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cyiw_kern as kern
+from cyiw_sprachwahl import SPRACHEN, erkenne_sprache
+
+# ===========================
+# JSON-Lines-Filter: pro Zeile ein Datensatz {"id": …, "text": …, "lang": …}
+# von stdin, derselbe Datensatz mit "indizes" auf stdout. Ohne "lang" wird
+# die Sprache erkannt. Ausgewertet wird in einem Prozesspool, höchstens
+# "fenster" Datensätze sind gleichzeitig unterwegs - der Speicherbedarf
+# hängt so nicht von der Länge des Stroms ab. Geordnet kommen die
+# Datensätze in der Reihenfolge der Eingabe heraus, sonst sobald sie fertig sind.
+FENSTER_PRO_PROZESS = 4
+KUERZEL_ALIAS = {"uk": "ua"}   # ISO 639-1 für Ukrainisch
+
+# fehlerhafte Datensätze kommen als {"id": …, "fehler": …} heraus
+def bewerte(zeile, sprachen=SPRACHEN, mit_text=True):
+    satz = {}
+    try:
+        satz = json.loads(zeile)
+        text = satz["text"]
+        kz = str(satz.get("lang") or "").lower()
+        kz = KUERZEL_ALIAS.get(kz, kz) or erkenne_sprache(text, sprachen) or sprachen[0]
+        if kz not in sprachen:
+            raise ValueError(f"Sprache '{kz}' wird nicht unterstützt")
+        satz["lang"] = kz
+        satz["indizes"] = kern.lade_sprache(kz).berechne_statistik(text)
+        if not mit_text:
+            del satz["text"]
+    except Exception as e:
+        satz = {"id": satz.get("id") if isinstance(satz, dict) else None, "fehler": str(e)}
+    return json.dumps(satz, ensure_ascii=False, default=lambda x: x.item())
+
+def stroeme(eingabe, ausgabe, prozesse=None, fenster=None, geordnet=True, sprachen=SPRACHEN, mit_text=True):
+    arbeit = functools.partial(bewerte, sprachen=sprachen, mit_text=mit_text)
+    zeilen = (z for z in eingabe if z.strip())
+    prozesse = prozesse or kern.PROZESSE
+    if prozesse < 2:
+        for zeile in zeilen:
+            ausgabe.write(arbeit(zeile) + "\n")
+            ausgabe.flush()
+        return
+    fenster = fenster or prozesse * FENSTER_PRO_PROZESS
+    unterwegs = collections.deque() if geordnet else set()
+    with ProcessPoolExecutor(max_workers=prozesse) as pool:
+        for zeile in zeilen:
+            if len(unterwegs) >= fenster:
+                hole(unterwegs, ausgabe)
+            zukunft = pool.submit(kern.mit_messwerten, arbeit, zeile)
+            if geordnet:
+                unterwegs.append(zukunft)
+            else:
+                unterwegs.add(zukunft)
+            kern.MESSWERTE.warteschlange = len(unterwegs)
+        while unterwegs:
+            hole(unterwegs, ausgabe)
+
+# geordnet: den ältesten Datensatz abwarten, sonst alle bereits fertigen
+def hole(unterwegs, ausgabe):
+    if isinstance(unterwegs, collections.deque):
+        fertig = [unterwegs.popleft()]
+    else:
+        fertig, _ = wait(unterwegs, return_when=FIRST_COMPLETED)
+        unterwegs -= fertig
+    for zukunft in fertig:
+        zeile, messwerte = zukunft.result()
+        kern.MESSWERTE.uebernehme(messwerte)
+        ausgabe.write(zeile + "\n")
+    ausgabe.flush()
+    kern.MESSWERTE.warteschlange = len(unterwegs)
@@ -0,0 +1,143 @@
+import numpy as np
+
+# ===========================
+# Schwierigkeitsstufen und ähnliche Texte: jeder Text wird durch seine
+# Indizes als Vektor beschrieben, jede Achse auf Mittelwert 0 und
+# Streuung 1 normiert (sonst würde Flesch mit seinem großen Wertebereich
+# alles bestimmen). Stufen bildet k-Means (für große Korpora als
+# Mini-Batch-k-Means), ähnliche Texte findet eine exakte Suche über die
+# ganze Matrix - bei 50 000 Texten eine Matrix-Vektor-Multiplikation.
+MERKMALE = ("ASL", "AWL", "Flesch", "Amstad", "Lix", "WSTF1", "WSTF2", "WSTF3", "WSTF4", "NRE", "GunningFog")
+# Stufe 1 ist die leichteste: Zentren nach dem ersten vorhandenen Index sortiert
+SCHWIERIGKEIT = ("Lix", "ASL")
+ITERATIONEN = 100
+STAPEL_AB = 20_000   # Texte; darüber Mini-Batch-k-Means
+STAPEL = 1024
+
+# quadrierte Abstände aller Zeilen von x zu allen Zeilen von zentren
+def abstaende(x, zentren):
+    return (x * x).sum(1)[:, None] - 2 * x @ zentren.T + (zentren * zentren).sum(1)
+
+def naechstes_zentrum(x, zentren):
+    return abstaende(x, zentren).argmin(1)
+
+# k-means++: Startzentren weit auseinander
+def startzentren(x, anzahl, zufall):
+    zentren = [x[zufall.integers(len(x))]]
+    naechster = ((x - zentren[0]) ** 2).sum(1)
+    for _ in range(1, anzahl):
+        summe = naechster.sum()
+        i = zufall.choice(len(x), p=naechster / summe) if summe > 0 else zufall.integers(len(x))
+        zentren.append(x[i])
+        naechster = np.minimum(naechster, ((x - x[i]) ** 2).sum(1))
+    return np.array(zentren)
+
+def kmeans(x, anzahl, stapel=None, iterationen=ITERATIONEN, seed=None):
+    zufall = np.random.default_rng(seed)
+    zentren = startzentren(x, anzahl, zufall)
+    if stapel:
+        # Mini-Batch (Sculley 2010): jedes Zentrum wandert mit Lernrate
+        # 1/(bisher zugeordnete Texte) zum Mittel seines Stapelanteils
+        gesehen = np.zeros(anzahl)
+        for _ in range(iterationen):
+            teil = x[zufall.integers(len(x), size=stapel)]
+            stufe = naechstes_zentrum(teil, zentren)
+            n = np.bincount(stufe, minlength=anzahl)
+            summen = np.zeros_like(zentren)
+            np.add.at(summen, stufe, teil)
+            gesehen += n
+            belegt = n > 0
+            zentren[belegt] += (summen[belegt] - n[belegt, None] * zentren[belegt]) / gesehen[belegt, None]
+    else:
+        for _ in range(iterationen):
+            stufe = naechstes_zentrum(x, zentren)
+            n = np.bincount(stufe, minlength=anzahl)
+            summen = np.zeros_like(zentren)
+            np.add.at(summen, stufe, x)
+            # leere Stufen behalten ihr Zentrum
+            neu = np.where(n[:, None] > 0, summen / np.maximum(n, 1)[:, None], zentren)
+            if np.allclose(neu, zentren):
+                break
+            zentren = neu
+    return zentren, naechstes_zentrum(x, zentren)
+
+# ===========================
+class Profilraum:
+    # zeilen: Indizes pro Text ({Index: Wert}), namen: Bezeichnung pro Text
+    def __init__(self, namen, zeilen, merkmale=None):
+        if merkmale is None:
+            merkmale = [m for m in MERKMALE if all(m in z for z in zeilen)]
+        self.namen = list(namen)
+        self.merkmale = list(merkmale)
+        werte = np.array([[float(z[m]) for m in self.merkmale] for z in zeilen], dtype=float)
+        werte = werte.reshape(len(self.namen), len(self.merkmale))
+        self.mittel = werte.mean(0) if len(werte) else np.zeros(len(self.merkmale))
+        streuung = werte.std(0) if len(werte) else np.ones(len(self.merkmale))
+        self.streuung = np.where(streuung > 0, streuung, 1.0)
+        self.setze_vektoren(self.normiere(werte))
+        self.zentren = None
+        self.stufen = None
+
+    def setze_vektoren(self, vektoren):
+        self.vektoren = np.ascontiguousarray(vektoren, dtype=np.float32)
+        self.quadrate = (self.vektoren * self.vektoren).sum(1)
+
+    def normiere(self, werte):
+        return (np.asarray(werte, dtype=float) - self.mittel) / self.streuung
+
+    def vektor(self, indizes):
+        return self.normiere([float(indizes[m]) for m in self.merkmale]).astype(np.float32)
+
+    # die "anzahl" nächsten Texte [(Name, Abstand)], ohne den Text selbst
+    # (falls "ohne" seinen Namen angibt)
+    def nachbarn(self, vektor, anzahl=20, ohne=None):
+        abstand = self.quadrate - 2 * (self.vektoren @ vektor) + vektor @ vektor
+        if ohne is not None:
+            abstand[self.namen.index(ohne)] = np.inf
+        anzahl = min(anzahl, len(abstand) - (ohne is not None))
+        if anzahl <= 0:
+            return []
+        auswahl = np.argpartition(abstand, anzahl - 1)[:anzahl]
+        auswahl = auswahl[np.argsort(abstand[auswahl], kind="stable")]
+        return [(self.namen[i], float(np.sqrt(max(abstand[i], 0.0)))) for i in auswahl]
+
+    # Stufen 1..anzahl, 1 = leichteste
+    def bilde_stufen(self, anzahl, stapel=None, seed=None):
+        anzahl = min(anzahl, len(self.namen))
+        if stapel is None and len(self.namen) > STAPEL_AB:
+            stapel = STAPEL
+        zentren, stufe = kmeans(self.vektoren.astype(float), anzahl, stapel, seed=seed)
+        achse = next((self.merkmale.index(m) for m in SCHWIERIGKEIT if m in self.merkmale), 0)
+        reihenfolge = np.argsort(zentren[:, achse], kind="stable")
+        rang = np.empty(anzahl, dtype=int)
+        rang[reihenfolge] = np.arange(1, anzahl + 1)
+        self.zentren = zentren[reihenfolge]
+        self.stufen = rang[stufe]
+        return dict(zip(self.namen, self.stufen.tolist()))
+
+    # Zentrum einer Stufe in Indexwerten
+    def zentrum(self, stufe):
+        return dict(zip(self.merkmale, (self.zentren[stufe - 1] * self.streuung + self.mittel).round(2).tolist()))
+
+    def stufe(self, vektor):
+        return int(naechstes_zentrum(vektor[None, :].astype(float), self.zentren)[0]) + 1
+
+    def speichere(self, pfad):
+        daten = {"namen": np.array(self.namen, dtype=str), "merkmale": np.array(self.merkmale, dtype=str),
+                 "mittel": self.mittel, "streuung": self.streuung, "vektoren": self.vektoren}
+        if self.zentren is not None:
+            daten.update(zentren=self.zentren, stufen=self.stufen)
+        with open(pfad, "wb") as f:
+            np.savez_compressed(f, **daten)
+
+def lade_profilraum(pfad):
+    with np.load(pfad, allow_pickle=False) as daten:
+        raum = Profilraum.__new__(Profilraum)
+        raum.namen = daten["namen"].tolist()
+        raum.merkmale = daten["merkmale"].tolist()
+        raum.mittel = daten["mittel"]
+        raum.streuung = daten["streuung"]
+        raum.setze_vektoren(daten["vektoren"])
+        raum.zentren = daten["zentren"] if "zentren" in daten else None
+        raum.stufen = daten["stufen"] if "stufen" in daten else None
+    return raum
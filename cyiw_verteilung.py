@@ -0,0 +1,187 @@
+import json
+
+import numpy as np
+
+import cyiw_kern as kern
+
+# ===========================
+# Verteilung der Indizes über ein Referenzkorpus: pro Index Momente
+# (kern.Momente) und eine Quantilskizze (t-digest). Beides lässt sich über
+# Prozesse hinweg zusammenführen und als JSON speichern; neue Texte werden
+# dann ohne das Referenzkorpus eingeordnet (Perzentil und z-Wert).
+
+# ===========================
+# t-digest: sortierte Zentroide (Mittelwert, Gewicht), an den Rändern der
+# Verteilung feiner als in der Mitte. Genauigkeit über "kompression".
+class Quantilskizze:
+    PUFFER = 10   # × kompression Werte sammeln, bevor verdichtet wird
+
+    def __init__(self, kompression=100):
+        self.kompression = kompression
+        self.mittel = np.zeros(0)
+        self.gewichte = np.zeros(0)
+        self.puffer = []
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def hinzu(self, x):
+        self.puffer.append(x)
+        self.minimum = min(self.minimum, x)
+        self.maximum = max(self.maximum, x)
+        if len(self.puffer) >= self.PUFFER * self.kompression:
+            self.verdichte()
+
+    def vereinige(self, andere):
+        # die Zentroide der anderen Skizze wie gewichtete Einzelwerte einmischen
+        self.verdichte()
+        andere.verdichte()
+        self.minimum = min(self.minimum, andere.minimum)
+        self.maximum = max(self.maximum, andere.maximum)
+        self.puffer = list(andere.mittel)
+        self.verdichte(andere.gewichte)
+        return self
+
+    def skala(self, q):
+        return self.kompression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0, 1) - 1)
+
+    def verdichte(self, puffer_gewichte=None):
+        if not self.puffer:
+            return
+        gewichte_neu = np.ones(len(self.puffer)) if puffer_gewichte is None else np.asarray(puffer_gewichte, dtype=float)
+        mittel = np.concatenate([self.mittel, np.asarray(self.puffer, dtype=float)])
+        gewichte = np.concatenate([self.gewichte, gewichte_neu])
+        self.puffer = []
+        ordnung = np.argsort(mittel, kind="mergesort")
+        mittel, gewichte = mittel[ordnung], gewichte[ordnung]
+        gesamt = gewichte.sum()
+
+        neue_mittel, neue_gewichte = [], []
+        links = 0.0
+        grenze = self.skala(0.0) + 1
+        m, g = mittel[0], gewichte[0]
+        for m_i, g_i in zip(mittel[1:], gewichte[1:]):
+            if self.skala((links + g + g_i) / gesamt) <= grenze:
+                g += g_i
+                m += (m_i - m) * g_i / g
+            else:
+                neue_mittel.append(m)
+                neue_gewichte.append(g)
+                links += g
+                grenze = self.skala(links / gesamt) + 1
+                m, g = m_i, g_i
+        neue_mittel.append(m)
+        neue_gewichte.append(g)
+        self.mittel = np.array(neue_mittel)
+        self.gewichte = np.array(neue_gewichte)
+
+    def stuetzstellen(self):
+        # kumulierte Gewichte in den Zentroidmitten, ergänzt um Minimum und Maximum
+        self.verdichte()
+        mitten = np.cumsum(self.gewichte) - self.gewichte / 2
+        x = np.concatenate([[self.minimum], self.mittel, [self.maximum]])
+        y = np.concatenate([[0.0], mitten, [self.gewichte.sum()]])
+        return x, y
+
+    def quantil(self, q):
+        x, y = self.stuetzstellen()
+        return float(np.interp(q * y[-1], y, x))
+
+    def rang(self, wert):
+        # Anteil der Referenzwerte unter "wert" (0 … 1)
+        x, y = self.stuetzstellen()
+        return float(np.interp(wert, x, y) / y[-1])
+
+    def als_dict(self):
+        self.verdichte()
+        return {"kompression": self.kompression, "minimum": self.minimum, "maximum": self.maximum,
+                "mittel": self.mittel.tolist(), "gewichte": self.gewichte.tolist()}
+
+    @classmethod
+    def aus_dict(cls, daten):
+        skizze = cls(daten["kompression"])
+        skizze.minimum = daten["minimum"]
+        skizze.maximum = daten["maximum"]
+        skizze.mittel = np.array(daten["mittel"], dtype=float)
+        skizze.gewichte = np.array(daten["gewichte"], dtype=float)
+        return skizze
+
+# ===========================
+class Korpusprofil:
+    def __init__(self, sprache, indizes, kompression=100):
+        self.sprache = sprache
+        self.indizes = list(indizes)
+        self.momente = {k: kern.Momente() for k in self.indizes}
+        self.skizzen = {k: Quantilskizze(kompression) for k in self.indizes}
+
+    def hinzu(self, ergebnisse):
+        for k in self.indizes:
+            self.momente[k].hinzu(float(ergebnisse[k]))
+            self.skizzen[k].hinzu(float(ergebnisse[k]))
+
+    def vereinige(self, anderes):
+        for k in self.indizes:
+            self.momente[k].vereinige(anderes.momente[k])
+            self.skizzen[k].vereinige(anderes.skizzen[k])
+        return self
+
+    def texte(self):
+        return self.momente[self.indizes[0]].n if self.indizes else 0
+
+    # {Index: (Wert, Perzentil, z-Wert)} für einen neuen Text
+    def einordnen(self, ergebnisse):
+        einordnung = {}
+        for k in self.indizes:
+            # Indizes, die für den neuen Text fehlen, werden übergangen
+            if k not in ergebnisse:
+                continue
+            wert = float(ergebnisse[k])
+            streuung = self.momente[k].streuung()
+            z = (wert - self.momente[k].mittel) / streuung if streuung else 0.0
+            einordnung[k] = (wert, round(self.skizzen[k].rang(wert) * 100, 1), round(z, 2))
+        return einordnung
+
+    def uebersicht(self, perzentile=(5, 25, 50, 75, 95)):
+        return {k: {"Mittel": self.momente[k].mittel, "Streuung": self.momente[k].streuung(),
+                    **{f"P{p}": self.skizzen[k].quantil(p / 100) for p in perzentile}}
+                for k in self.indizes}
+
+    def speichere(self, pfad):
+        daten = {
+            "Sprache": self.sprache,
+            "Indizes": {k: {"Momente": vars(self.momente[k]), "Skizze": self.skizzen[k].als_dict()}
+                        for k in self.indizes}
+        }
+        with open(pfad, "w", encoding="utf-8") as f:
+            json.dump(daten, f, ensure_ascii=False)
+
+    @classmethod
+    def lade(cls, pfad):
+        with open(pfad, encoding="utf-8") as f:
+            daten = json.load(f)
+        profil = cls(daten["Sprache"], daten["Indizes"])
+        for k, werte in daten["Indizes"].items():
+            vars(profil.momente[k]).update(werte["Momente"])
+            profil.skizzen[k] = Quantilskizze.aus_dict(werte["Skizze"])
+        return profil
+
+# ===========================
+def profil_der_dateien(aufgabe):
+    kuerzel, dateien = aufgabe
+    sprache = kern.lade_sprache(kuerzel)
+    alphabet = sprache.K_VOKALE + sprache.K_KONSONANTEN
+    profil = Korpusprofil(kuerzel, [k for k in sprache.INDEX_LISTE if k not in kern.ZAEHLUNGEN])
+    for datei in dateien:
+        ergebnisse = sprache.berechne_statistik(kern.lies_datei(datei, alphabet))
+        if ergebnisse["Wörter"]:
+            profil.hinzu(ergebnisse)
+    return profil
+
+def erstelle_profil(kuerzel, dateien, prozesse=None):
+    teile = kern.berechne_pakete(profil_der_dateien, kuerzel, dateien, prozesse)
+    if not teile:
+        # leeres Korpus: Profil ohne Texte
+        return profil_der_dateien((kuerzel, []))
+    profil = teile[0]
+    for t in teile[1:]:
+        profil.vereinige(t)
+    return profil
@@ -0,0 +1,94 @@
+import collections
+import functools
+import heapq
+import os
+import tempfile
+
+import cyiw_kern as kern
+
+# ===========================
+# Wortschatz eines ganzen Korpus mit begrenztem Speicher: jeder Prozess
+# zählt Wortformen, bis GRENZE verschiedene im Speicher liegen, und lagert
+# sie dann alphabetisch sortiert als "Lauf" auf die Platte aus. Am Ende
+# werden alle Läufe gemischt und gleiche Wörter addiert - die Zählung ist
+# exakt, im Speicher liegen nur die häufigsten ANZAHL Wörter.
+GRENZE = 200_000
+ANZAHL = 5000
+
+class Wortzaehler:
+    def __init__(self, ordner):
+        self.ordner = ordner
+        self.zaehler = collections.Counter()
+        self.laeufe = []
+
+    def hinzu(self, woerter):
+        self.zaehler.update(woerter)
+        if len(self.zaehler) >= GRENZE:
+            self.auslagern()
+
+    def auslagern(self):
+        if not self.zaehler:
+            return
+        handle, pfad = tempfile.mkstemp(dir=self.ordner, suffix=".lauf")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            for wort in sorted(self.zaehler):
+                f.write(f"{wort}\t{self.zaehler[wort]}\n")
+        self.laeufe.append(pfad)
+        self.zaehler = collections.Counter()
+
+def lies_lauf(pfad):
+    with open(pfad, encoding="utf-8") as f:
+        for zeile in f:
+            wort, anzahl = zeile.rstrip("\n").split("\t")
+            yield wort, int(anzahl)
+
+# alle Läufe zusammenführen: (Wort, Anzahl) in alphabetischer Reihenfolge
+def mische_laeufe(laeufe):
+    aktuell, summe = None, 0
+    for wort, anzahl in heapq.merge(*(lies_lauf(p) for p in laeufe)):
+        if wort != aktuell:
+            if aktuell is not None:
+                yield aktuell, summe
+            aktuell, summe = wort, 0
+        summe += anzahl
+    if aktuell is not None:
+        yield aktuell, summe
+
+def zaehle_dateien(ordner, aufgabe):
+    kuerzel, dateien = aufgabe
+    sprache = kern.lade_sprache(kuerzel)
+    alphabet = sprache.K_VOKALE + sprache.K_KONSONANTEN
+    zaehler = Wortzaehler(ordner)
+    for datei in dateien:
+        zaehlungen = kern.zaehle_in_scheiben(kern.lies_datei(datei, alphabet), sprache.zaehle_text, kuerzel,
+                                             benoetigt={"Wörter", "Wortfolge"})
+        zaehler.hinzu(zaehlungen["Wortfolge"])
+    zaehler.auslagern()
+    return zaehler.laeufe
+
+# liefert Kennzahlen des Korpus und die häufigsten Wörter [(Wort, Anzahl), ...]
+def erstelle_wortschatz(kuerzel, dateien, prozesse=None, anzahl=ANZAHL):
+    with tempfile.TemporaryDirectory(prefix="cyiw_") as ordner:
+        laeufe = [pfad for teil in kern.berechne_pakete(functools.partial(zaehle_dateien, ordner),
+                                                       kuerzel, dateien, prozesse)
+                  for pfad in teil]
+        kennzahlen = {"Tokens": 0, "Types": 0, "Hapax": 0}
+
+        def mitzaehlen(paare):
+            for wort, n in paare:
+                kennzahlen["Tokens"] += n
+                kennzahlen["Types"] += 1
+                kennzahlen["Hapax"] += n == 1
+                yield wort, n
+
+        haeufigste = heapq.nlargest(anzahl, mitzaehlen(mische_laeufe(laeufe)), key=lambda p: p[1])
+    kennzahlen["TTR"] = kennzahlen["Types"] / kennzahlen["Tokens"] if kennzahlen["Tokens"] else 0.0
+    kennzahlen["Hapax-Anteil"] = kennzahlen["Hapax"] / kennzahlen["Types"] if kennzahlen["Types"] else 0.0
+    return kennzahlen, haeufigste
+
+def speichere_frequenzliste(kuerzel, haeufigste):
+    pfad = kern.FREQUENZLISTE.format(kuerzel.lower())
+    with open(pfad, "w", encoding="utf-8") as f:
+        for wort, n in haeufigste:
+            f.write(f"{wort}\t{n}\n")
+    return pfad